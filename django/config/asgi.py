@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Servi en ASGI : les pages accueil, détail de film et recherche utilisent leurs vues asynchrones
+os.environ.setdefault("CINEEXPLORER_VUES_ASYNC", "1")
 
 application = get_asgi_application()
+
+# Processus serveur : index d'autocomplétion construit en arrière-plan dès le démarrage
+from movies.autocomplete_service import prechauffer  # noqa: E402
+
+prechauffer()
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,10 +86,99 @@ DATABASES = {
     }
 }
 
+# Schéma compact : clés mid/pid stockées en INTEGER (scripts/phase1_sqlite/convert_compact.py).
+# Pour l'activer, pointer DATABASES['imdb']['NAME'] vers imdb_compact.db et passer à True :
+# sqlite_service convertit alors les identifiants 'tt…'/'nm…' à l'entrée et à la sortie.
+IMDB_COMPACT_KEYS = False
+
+# Connexions SQLite du service (movies/sqlite_service.py) : une connexion en lecture seule
+# par thread, réutilisée entre les requêtes. False = une connexion par appel (ancien comportement).
+SQLITE_CONNEXIONS_PERSISTANTES = True
+SQLITE_MMAP_MO = 256              # PRAGMA mmap_size
+SQLITE_CACHE_MO = 64              # PRAGMA cache_size
+SQLITE_CACHED_STATEMENTS = 256    # requêtes préparées gardées par connexion
+# immutable=1 : plus aucun verrou ni contrôle de modification, à n'activer que si imdb.db
+# n'est jamais modifié pendant que le serveur tourne (pas d'import --delta en parallèle)
+SQLITE_IMMUTABLE = False
+
+# Statistiques : largeur par défaut des tranches de l'histogramme des notes (multiple de 0.1),
+# modifiable sur la page /stats/ (?largeur=0.5)
+STATS_LARGEUR_TRANCHE_NOTES = 1.0
+# Les statistiques SQLite viennent de l'instantané calculé à l'import (table stats_snapshot) ;
+# celles de MongoDB sont recalculées au plus toutes les STATS_MONGO_TTL_S secondes
+STATS_MONGO_TTL_S = 300
+
+# Vues accueil et statistiques : appels aux services lancés en parallèle dans un pool de threads
+# (movies/chargement_parallele.py), avec un délai commun au-delà duquel le repli est utilisé ;
+# ce délai borne aussi leurs opérations MongoDB (plus court que serverSelectionTimeoutMS)
+VUES_PARALLELE = True
+VUES_PARALLELE_THREADS = 16
+VUES_PARALLELE_TIMEOUT_S = 2.0
+
+# Vues asynchrones (accueil, détail de film, recherche) : activées par config/asgi.py
+# (serveur ASGI, ex. uvicorn config.asgi:application), vues synchrones en WSGI
+VUES_ASYNC = os.environ.get("CINEEXPLORER_VUES_ASYNC") == "1"
+
+# Recommandations par le contenu (movies/recommandation_service.py) : modèle construit par
+# python manage.py construire_recommandations, fichiers .npy ouverts en mmap par le serveur
+RECOMMANDATIONS_DOSSIER = BASE_DIR.parent / "data" / "recommandations"
+RECOMMANDATIONS_VOTES_MIN = 100   # votes minimum d'un film recommandé
+
+# Graphe des collaborations (movies/graphe_service.py) : construit par python manage.py construire_graphe
+GRAPHE_DOSSIER = BASE_DIR.parent / "data" / "graphe"
+GRAPHE_PERSONNE_REFERENCE = "nm0000102"   # degrés de séparation affichés sur les pages personne (Kevin Bacon)
+
+# Autocomplétion : construire l'index de préfixes en mémoire dès le démarrage du serveur
+# (config/wsgi.py, config/asgi.py ; sinon à la première requête sur /api/autocomplete/)
+AUTOCOMPLETE_PRECHARGEMENT = True
+
+# Détail d'un film : servi par le seul document movies_complete (personnages inclus depuis
+# migrate_structured.py). True : relit aussi les personnages dans SQLite, journalise les écarts
+# et affiche ceux de SQLite (validation d'une migration)
+MONGO_VERIFIER_PERSONNAGES = False
+
+# Cache des documents de films (détail, films similaires) dans chaque processus (movies/mongo_service.py) :
+# LRU borné en octets, entrées gardées CACHE_FILMS_TTL_S secondes, vidé quand une migration MongoDB
+# enregistre une nouvelle génération (relue au plus toutes les CACHE_FILMS_VERIFICATION_S secondes)
+CACHE_FILMS = True
+CACHE_FILMS_MAX_OCTETS = 64 * 1024 * 1024
+CACHE_FILMS_TTL_S = 600
+CACHE_FILMS_VERIFICATION_S = 30
+# Second niveau partagé entre processus : alias d'un cache de CACHES réservé aux films
+# (vidé entièrement par invalider_cache_films()), None pour le cache local seul
+CACHE_FILMS_BACKEND = None
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Exemple de cache partagé par les workers (CACHE_FILMS_BACKEND = "films"),
+    # hors du dépôt : dossier temporaire du système ou CINEEXPLORER_CACHE_FILMS
+    "films": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CINEEXPLORER_CACHE_FILMS",
+                                   os.path.join(tempfile.gettempdir(), "cineexplorer_cache_films")),
+        "TIMEOUT": 600,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
 # Configuration MongoDB
 MONGODB_URI = "mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0"
 MONGODB_NAME = "cineexplorer"
 
+# Client MongoDB unique par processus (movies/mongo_service.py) : options passées à MongoClient
+MONGODB_CLIENT_OPTIONS = {
+    "maxPoolSize": 50,                  # connexions simultanées max par serveur
+    "minPoolSize": 0,
+    "waitQueueTimeoutMS": 2000,         # attente max d'une connexion libre dans le pool
+    "serverSelectionTimeoutMS": 5000,   # replica set injoignable -> erreur après 5 s
+    "connectTimeoutMS": 5000,
+    "socketTimeoutMS": 10000,
+    "readPreference": "primaryPreferred",
+    "appname": "cineexplorer-django",
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
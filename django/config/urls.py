@@ -15,16 +15,29 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from movies import views
 
+# Servi en ASGI (VUES_ASYNC) : versions asynchrones des pages qui lisent MongoDB
+home = views.home_async if settings.VUES_ASYNC else views.home
+movie_detail = views.movie_detail_async if settings.VUES_ASYNC else views.movie_detail
+search = views.search_async if settings.VUES_ASYNC else views.search
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", views.home, name="home"),
+    path("", home, name="home"),
     path("movies/", views.movie_list, name="movie_list"),
-    path("movies/<str:movie_id>/", views.movie_detail, name="movie_detail"),
+    path("movies/<str:movie_id>/", movie_detail, name="movie_detail"),
     path("person/<str:person_id>/", views.person_detail, name="person_detail"),
-    path("search/", views.search, name="search"),
+    path("series/<str:series_id>/", views.series_detail, name="series_detail"),
+    path("search/", search, name="search"),
     path("stats/", views.stats, name="stats"),
+    path("api/autocomplete/", views.autocomplete_api, name="autocomplete"),
+    path("api/recommandations/", views.recommandations_api, name="recommandations"),
+    path("api/graphe/chemin/", views.graphe_chemin_api, name="graphe_chemin"),
+    path("api/graphe/<str:person_id>/", views.graphe_personne_api, name="graphe_personne"),
+    path("api/mongo-pool/", views.mongo_pool_api, name="mongo_pool"),
+    path("api/cache-films/", views.cache_films_api, name="cache_films"),
 ]
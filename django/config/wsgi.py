@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Processus serveur : index d'autocomplétion construit en arrière-plan dès le démarrage
+from movies.autocomplete_service import prechauffer  # noqa: E402
+
+prechauffer()
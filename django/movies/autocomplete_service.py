@@ -0,0 +1,252 @@
+"""
+autocomplete_service.py
+=======================
+Index de préfixes en mémoire pour l'autocomplétion de la barre de recherche.
+
+L'index est construit une fois depuis imdb.db (au démarrage, puis à chaque
+modification du fichier) et interrogé sans accès à SQLite :
+- clés normalisées (minuscules, sans accents) triées dans un tableau numpy de
+  chaînes d'octets de taille fixe : un préfixe = un intervalle trouvé par dichotomie ;
+- top-k pré-calculé pour les préfixes de 1 à 3 caractères (intervalles les plus grands) ;
+- au-delà, sélection des k plus gros poids de l'intervalle (np.argpartition).
+Poids : nombre de votes pour un film, nombre de films pour une personne.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+# Longueur maximale d'une clé en octets (les préfixes plus longs sont tronqués)
+LONGUEUR_CLE = 24
+# Préfixes dont le top-k est pré-calculé, et taille de ce top-k
+LONGUEUR_PRECALCUL = 3
+K_PRECALCUL = 20
+
+FILM, PERSONNE = 0, 1
+
+_index = None
+_verrou = threading.Lock()
+
+
+def normaliser(texte):
+    """Minuscules, sans accents ni ponctuation, espaces simples ('L'Été' -> 'l ete')"""
+    texte = unicodedata.normalize('NFKD', texte or '')
+    texte = ''.join(c for c in texte if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r"\w+", texte))
+
+
+class IndexPrefixes:
+    """Index de préfixes compact (tableaux numpy + libellés concaténés)"""
+
+    def __init__(self, db_path):
+        debut = time.perf_counter()
+        self.db_path = str(db_path)
+        self.mtime = os.path.getmtime(self.db_path)
+
+        libelles, types, numeros, annees, poids, cles, entrees = [], [], [], [], [], [], []
+
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        films = conn.execute("""
+            SELECT m.mid, m.primaryTitle, m.startYear, COALESCE(r.numVotes, 0)
+            FROM movies m
+            LEFT JOIN ratings r ON m.mid = r.mid
+            WHERE m.titleType IS NOT 'tvEpisode' AND m.primaryTitle IS NOT NULL
+        """)
+        personnes = conn.execute("""
+            SELECT p.pid, p.primaryName, p.birthYear, COALESCE(c.nb, 0)
+            FROM persons p
+            LEFT JOIN (SELECT pid, COUNT(*) AS nb FROM principals GROUP BY pid) c ON c.pid = p.pid
+            WHERE p.primaryName IS NOT NULL
+        """)
+        for type_entree, curseur in ((FILM, films), (PERSONNE, personnes)):
+            for identifiant, libelle, annee, nb in curseur:
+                cle = normaliser(libelle)
+                if not cle:
+                    continue
+                entree = len(libelles)
+                libelles.append(libelle)
+                types.append(type_entree)
+                # Partie numérique de l'identifiant (schéma texte 'tt0111161' ou compact 111161)
+                numeros.append(int(identifiant[2:]) if isinstance(identifiant, str) else identifiant)
+                annees.append(annee or 0)
+                poids.append(nb)
+                cles.append(cle)
+                entrees.append(entree)
+                # Une personne se trouve aussi à partir de chaque mot de son nom ('hanks' -> Tom Hanks)
+                if type_entree == PERSONNE:
+                    for position in range(len(cle)):
+                        if cle[position] == ' ':
+                            cles.append(cle[position + 1:])
+                            entrees.append(entree)
+        conn.close()
+
+        # Entrées : libellés concaténés en UTF-8 + décalages, attributs en tableaux typés
+        encodes = [libelle.encode('utf-8') for libelle in libelles]
+        self.libelles = b''.join(encodes)
+        self.decalages = np.zeros(len(encodes) + 1, dtype=np.int32)
+        np.cumsum([len(e) for e in encodes], out=self.decalages[1:])
+        self.types = np.array(types, dtype=np.int8)
+        self.numeros = np.array(numeros, dtype=np.int32)
+        self.annees = np.array(annees, dtype=np.int16)
+        self.poids_entrees = np.array(poids, dtype=np.int32)
+
+        # Clés triées et, pour chaque clé, son entrée et son poids
+        cles_octets = np.array([c.encode('utf-8')[:LONGUEUR_CLE] for c in cles], dtype=f'S{LONGUEUR_CLE}')
+        ordre = np.argsort(cles_octets, kind='stable')
+        self.cles = cles_octets[ordre]
+        self.entrees = np.array(entrees, dtype=np.int32)[ordre]
+        self.poids = self.poids_entrees[self.entrees]
+
+        self.precalcul = self._precalculer()
+        self.duree_construction = time.perf_counter() - debut
+
+    def _intervalle(self, prefixe):
+        """Intervalle [debut, fin) des clés commençant par le préfixe (en octets)"""
+        debut = int(np.searchsorted(self.cles, prefixe, side='left'))
+        fin = int(np.searchsorted(self.cles, prefixe + b'\xff', side='left'))
+        return debut, fin
+
+    def _meilleures(self, debut, fin, k):
+        """Positions des k clés de plus fort poids dans [debut, fin), triées par poids décroissant"""
+        poids = self.poids[debut:fin]
+        if fin - debut > k:
+            positions = np.argpartition(-poids, k)[:k]
+        else:
+            positions = np.arange(fin - debut)
+        positions = positions[np.argsort(-poids[positions], kind='stable')]
+        return positions + debut
+
+    def _precalculer(self):
+        """Top-k des préfixes courts (1 à LONGUEUR_PRECALCUL octets), qui couvrent les plus grands intervalles"""
+        precalcul = {}
+        for longueur in range(1, LONGUEUR_PRECALCUL + 1):
+            prefixes = np.unique(self.cles.astype(f'S{longueur}'))
+            for prefixe in prefixes:
+                if len(prefixe) < longueur:
+                    continue
+                debut, fin = self._intervalle(bytes(prefixe))
+                precalcul[bytes(prefixe)] = self._meilleures(debut, fin, K_PRECALCUL).astype(np.int32)
+        return precalcul
+
+    def rechercher(self, texte, k=10):
+        """
+        Complétions d'un préfixe, par poids décroissant.
+
+        Args:
+            texte: Saisie de l'utilisateur
+            k: Nombre maximum de résultats
+
+        Returns:
+            list: Liste de dicts {type, id, label, year, weight}
+        """
+        prefixe = normaliser(texte).encode('utf-8')[:LONGUEUR_CLE]
+        if not prefixe:
+            return []
+        # Une même entrée peut être atteinte par plusieurs clés (nom complet et mots suivants)
+        marge = 2 * k
+        if len(prefixe) <= LONGUEUR_PRECALCUL and k <= K_PRECALCUL:
+            positions = self.precalcul.get(prefixe, ())
+        else:
+            debut, fin = self._intervalle(prefixe)
+            positions = self._meilleures(debut, fin, marge)
+
+        resultats, vues = [], set()
+        for position in positions:
+            entree = int(self.entrees[position])
+            if entree in vues:
+                continue
+            vues.add(entree)
+            resultats.append(self._entree(entree))
+            if len(resultats) == k:
+                break
+        return resultats
+
+    def _entree(self, entree):
+        """Reconstruit le résultat d'une entrée (identifiant IMDb, libellé, année, poids)"""
+        type_entree = int(self.types[entree])
+        prefixe = 'tt' if type_entree == FILM else 'nm'
+        libelle = self.libelles[self.decalages[entree]:self.decalages[entree + 1]].decode('utf-8')
+        return {
+            'type': 'movie' if type_entree == FILM else 'person',
+            'id': f"{prefixe}{int(self.numeros[entree]):07d}",
+            'label': libelle,
+            'year': int(self.annees[entree]) or None,
+            'weight': int(self.poids_entrees[entree]),
+        }
+
+    def memoire_octets(self):
+        """
+        Mémoire occupée par l'index (tableaux numpy, libellés et top-k pré-calculés).
+
+        Returns:
+            dict: Octets par composant et total
+        """
+        memoire = {
+            'cles': self.cles.nbytes,
+            'entrees': self.entrees.nbytes + self.poids.nbytes,
+            'libelles': len(self.libelles) + self.decalages.nbytes,
+            'attributs': (self.types.nbytes + self.numeros.nbytes + self.annees.nbytes
+                          + self.poids_entrees.nbytes),
+            'precalcul': sum(len(p) + v.nbytes for p, v in self.precalcul.items()),
+        }
+        memoire['total'] = sum(memoire.values())
+        return memoire
+
+
+def get_index():
+    """
+    Index de préfixes du processus, construit au premier appel puis reconstruit
+    si imdb.db a été modifié depuis (nouvel import).
+
+    Returns:
+        IndexPrefixes: Index prêt à être interrogé
+    """
+    global _index
+    from django.conf import settings
+    db_path = str(settings.DATABASES['imdb']['NAME'])
+    index = _index
+    if index is not None and index.db_path == db_path and index.mtime == os.path.getmtime(db_path):
+        return index
+    with _verrou:
+        if _index is None or _index.db_path != db_path or _index.mtime != os.path.getmtime(db_path):
+            _index = IndexPrefixes(db_path)
+        return _index
+
+
+def prechauffer():
+    """
+    Construit l'index en arrière-plan si AUTOCOMPLETE_PRECHARGEMENT est activé.
+    Appelé depuis config/wsgi.py et config/asgi.py, donc seulement par les processus
+    qui servent des requêtes (runserver y compris, mais pas son processus de rechargement
+    ni les commandes manage.py comme migrate ou check).
+    """
+    from django.conf import settings
+    if not getattr(settings, 'AUTOCOMPLETE_PRECHARGEMENT', False):
+        return
+
+    def construire():
+        try:
+            get_index()
+        except (sqlite3.Error, OSError):
+            # Base absente ou pas encore importée : l'index sera construit à la première requête
+            pass
+    threading.Thread(target=construire, name='autocomplete-index', daemon=True).start()
+
+
+def autocomplete(query, k=10):
+    """
+    Complétions (films et personnes) d'une saisie partielle.
+    
+    Args:
+        query: Début de titre ou de nom
+        k: Nombre maximum de résultats
+    
+    Returns:
+        list: Liste de dicts {type, id, label, year, weight}
+    """
+    return get_index().rechercher(query, k)
@@ -0,0 +1,205 @@
+"""
+chargement_parallele.py
+=======================
+Exécution concurrente des appels indépendants d'une vue (services SQLite et MongoDB).
+
+La latence d'une page devient celle de l'appel le plus lent au lieu de la somme des appels :
+- un pool de threads partagé par le processus (recréé après un fork) ;
+- un délai commun à tous les appels de la page (VUES_PARALLELE_TIMEOUT_S), qui borne aussi
+  les opérations MongoDB des appels (pymongo.timeout) ; un appel encore dans la file du pool
+  à l'échéance est annulé ;
+- en cas d'erreur ou de délai dépassé, le repli de l'appel (par exemple la même donnée
+  depuis SQLite) est exécuté, sinon le résultat vaut None ;
+- la durée et le statut de chaque appel sont retournés (en-tête Server-Timing des vues).
+
+Le service SQLite garde une connexion par thread : chaque thread du pool a la sienne.
+charger_async() applique les mêmes règles aux vues asynchrones (asyncio.gather).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pymongo
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executeur = None
+_verrou = threading.Lock()
+
+
+def _oublier_executeur():
+    """Les threads du pool n'existent plus dans un processus enfant : il sera recréé"""
+    global _executeur
+    _executeur = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_oublier_executeur)
+
+
+def get_executeur():
+    """
+    Pool de threads du processus, créé au premier appel (VUES_PARALLELE_THREADS threads).
+
+    Returns:
+        ThreadPoolExecutor: Pool partagé par toutes les vues
+    """
+    global _executeur
+    if _executeur is None:
+        with _verrou:
+            if _executeur is None:
+                _executeur = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'VUES_PARALLELE_THREADS', 16),
+                    thread_name_prefix='vues'
+                )
+    return _executeur
+
+
+def _executer(fonction, echeance=None):
+    """
+    Exécute un appel et mesure sa durée propre (sans l'attente dans la file du pool).
+    Les opérations MongoDB de l'appel échouent à l'échéance (instant perf_counter) au lieu
+    d'attendre serverSelectionTimeoutMS / socketTimeoutMS, plus longs que le délai de la page.
+    """
+    debut = time.perf_counter()
+    try:
+        if echeance is None:
+            return fonction(), None, time.perf_counter() - debut
+        with pymongo.timeout(max(0.0, echeance - debut)):
+            return fonction(), None, time.perf_counter() - debut
+    except Exception as erreur:
+        return None, erreur, time.perf_counter() - debut
+
+
+def charger(appels, timeout=None):
+    """
+    Lance les appels en parallèle et attend leurs résultats.
+
+    Args:
+        appels: {nom: (fonction, repli)} ; fonction et repli sont des callables sans argument,
+                repli peut être None (résultat None en cas d'échec)
+        timeout: Délai maximum en secondes pour l'ensemble des appels
+                 (défaut VUES_PARALLELE_TIMEOUT_S)
+
+    Returns:
+        tuple: ({nom: résultat}, {nom: {'ms': durée, 'statut': 'ok' | 'erreur' | 'delai'}})
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'VUES_PARALLELE_TIMEOUT_S', 2.0)
+    debut = time.perf_counter()
+    echeance = debut + timeout
+
+    if getattr(settings, 'VUES_PARALLELE', True):
+        executeur = get_executeur()
+        futures = {nom: executeur.submit(_executer, fonction, echeance) for nom, (fonction, _) in appels.items()}
+    else:
+        futures = None
+
+    resultats, temps = {}, {}
+    for nom, (fonction, repli) in appels.items():
+        if futures is None:
+            # Exécution séquentielle dans le thread de la requête (VUES_PARALLELE = False)
+            resultat, erreur, duree = _executer(fonction, echeance)
+            statut = 'ok' if erreur is None else 'erreur'
+        else:
+            try:
+                resultat, erreur, duree = futures[nom].result(
+                    timeout=max(0.0, echeance - time.perf_counter()))
+                statut = 'ok' if erreur is None else 'erreur'
+            except TimeoutError:
+                # Encore dans la file : il ne démarrera pas. Déjà lancé : il continue en arrière-plan
+                # (ses lectures MongoDB s'arrêtent à l'échéance), son résultat sera ignoré
+                futures[nom].cancel()
+                resultat, erreur, duree = None, None, time.perf_counter() - debut
+                statut = 'delai'
+
+        if statut != 'ok':
+            if erreur is not None:
+                logger.warning("Appel %s en échec : %s", nom, erreur)
+            else:
+                logger.warning("Appel %s : délai de %.1fs dépassé", nom, timeout)
+            resultat = repli() if repli is not None else None
+        resultats[nom] = resultat
+        temps[nom] = {'ms': round(duree * 1000, 2), 'statut': statut}
+
+    logger.debug("Chargement en %.1f ms : %s", (time.perf_counter() - debut) * 1000, temps)
+    return resultats, temps
+
+
+async def en_thread(fonction, *args):
+    """
+    Exécute une fonction bloquante (service SQLite) dans le pool du processus depuis une vue
+    asynchrone ; comme asyncio.to_thread, mais avec VUES_PARALLELE_THREADS threads au lieu
+    du petit exécuteur par défaut de la boucle.
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_executeur(), lambda: fonction(*args))
+
+
+async def _executer_async(fonction):
+    """Version asynchrone de _executer (fonction retourne une coroutine)"""
+    debut = time.perf_counter()
+    try:
+        return await fonction(), None, time.perf_counter() - debut
+    except Exception as erreur:
+        return None, erreur, time.perf_counter() - debut
+
+
+async def charger_async(appels, timeout=None):
+    """
+    Équivalent de charger() pour les vues asynchrones : les appels sont des coroutines
+    lancées ensemble sur la boucle d'événements, sans thread bloqué pendant les attentes.
+
+    Args:
+        appels: {nom: (fonction, repli)} ; fonction retourne une coroutine, repli est un
+                callable synchrone (exécuté dans un thread, il peut lire SQLite) ou None
+        timeout: Délai maximum en secondes pour l'ensemble des appels
+                 (défaut VUES_PARALLELE_TIMEOUT_S)
+
+    Returns:
+        tuple: ({nom: résultat}, {nom: {'ms': durée, 'statut': 'ok' | 'erreur' | 'delai'}})
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'VUES_PARALLELE_TIMEOUT_S', 2.0)
+    debut = time.perf_counter()
+    taches = {nom: asyncio.ensure_future(_executer_async(fonction)) for nom, (fonction, _) in appels.items()}
+    if taches:
+        await asyncio.wait(taches.values(), timeout=timeout)
+
+    resultats, temps = {}, {}
+    for nom, (fonction, repli) in appels.items():
+        tache = taches[nom]
+        if tache.done():
+            resultat, erreur, duree = tache.result()
+            statut = 'ok' if erreur is None else 'erreur'
+        else:
+            # Contrairement à un thread, une coroutine en retard peut être annulée
+            tache.cancel()
+            resultat, erreur, duree = None, None, time.perf_counter() - debut
+            statut = 'delai'
+
+        if statut != 'ok':
+            if erreur is not None:
+                logger.warning("Appel %s en échec : %s", nom, erreur)
+            else:
+                logger.warning("Appel %s : délai de %.1fs dépassé", nom, timeout)
+            resultat = await en_thread(repli) if repli is not None else None
+        resultats[nom] = resultat
+        temps[nom] = {'ms': round(duree * 1000, 2), 'statut': statut}
+
+    logger.debug("Chargement asynchrone en %.1f ms : %s", (time.perf_counter() - debut) * 1000, temps)
+    return resultats, temps
+
+
+def entete_server_timing(temps):
+    """
+    En-tête HTTP Server-Timing (visible dans l'onglet réseau du navigateur).
+
+    Returns:
+        str: 'nom;dur=12.3;desc="ok", ...'
+    """
+    return ", ".join(f'{nom};dur={t["ms"]};desc="{t["statut"]}"' for nom, t in temps.items())
@@ -0,0 +1,413 @@
+"""
+graphe_service.py
+=================
+Graphe des collaborations : personnes et films reliés par le casting principal,
+la réalisation et le scénario (principals, directors, writers).
+
+Le graphe biparti est construit hors ligne depuis imdb.db (python manage.py construire_graphe)
+et stocké en CSR dans des fichiers .npy ouverts en mmap, dans les deux sens :
+- personne → films (personnes_indptr, personnes_films) ;
+- film → personnes (films_indptr, films_personnes).
+Les indices sont des int32 : 8 octets par lien et par sens, sans objet Python par nœud.
+
+Requêtes (parcours en largeur vectorisés, une frontière entière par étape) :
+- chemin() : degrés de séparation entre deux personnes (« nombre de Bacon »), parcours
+  bidirectionnel qui étend à chaque étape le côté dont la frontière a le moins de liens ;
+- voisinage() : nombre de personnes à 1, 2, ... k collaborations ;
+- collaborateurs() : personnes ayant le plus de films en commun avec une personne.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .recommandation_service import version_designee
+
+# Partie numérique d'un identifiant calculée par SQLite ('tt0111161' ou clé compacte entière)
+NUMERO_SQL = "CASE WHEN typeof({0}) = 'integer' THEN {0} ELSE CAST(substr({0}, 3) AS INTEGER) END"
+
+# Liens personne-film (une personne présente à plusieurs titres sur un film n'a qu'un lien)
+REQUETES_LIENS = tuple(
+    f"SELECT {NUMERO_SQL.format('mid')}, {NUMERO_SQL.format('pid')} FROM {table} WHERE pid IS NOT NULL"
+    for table in ('principals', 'directors', 'writers')
+)
+
+# Tableaux du graphe (un fichier .npy chacun)
+TABLEAUX = (
+    'personnes_numeros', 'personnes_indptr', 'personnes_films', 'noms_decalages', 'noms',
+    'films_numeros', 'films_indptr', 'films_personnes', 'titres_decalages', 'titres', 'annees',
+)
+
+# Degrés de séparation cherchés au plus par chemin()
+MAX_DEGRES = 12
+
+_graphe = None
+_verrou = threading.Lock()
+
+
+def numero_identifiant(identifiant, prefixe):
+    """Partie numérique d'un identifiant IMDb ('nm0000102' ou clé compacte 102), None si invalide"""
+    if isinstance(identifiant, int):
+        return identifiant
+    if isinstance(identifiant, str) and identifiant.startswith(prefixe) and identifiant[2:].isdigit():
+        return int(identifiant[2:])
+    return None
+
+
+def _uniques(valeurs):
+    """Valeurs distinctes triées (tri puis comparaison des voisins, plus rapide que np.unique sur des int64)"""
+    valeurs = np.sort(valeurs)
+    garder = np.ones(len(valeurs), dtype=bool)
+    garder[1:] = valeurs[1:] != valeurs[:-1]
+    return valeurs[garder]
+
+
+def _chaines(textes):
+    """Textes concaténés en UTF-8 : (décalages int64, octets uint8)"""
+    encodes = [(texte or '').encode('utf-8') for texte in textes]
+    decalages = np.zeros(len(encodes) + 1, dtype=np.int64)
+    np.cumsum([len(texte) for texte in encodes], out=decalages[1:])
+    return decalages, np.frombuffer(b''.join(encodes), dtype=np.uint8)
+
+
+def construire_graphe(db_path, dossier):
+    """
+    Construit le graphe depuis la base SQLite et l'écrit dans un sous-dossier de `dossier`,
+    désigné par meta.json (remplacé en dernier) : un serveur ne voit jamais un graphe
+    à moitié écrit, et celui qui a ouvert l'ancien le lit jusqu'à son rechargement.
+
+    Args:
+        db_path: Chemin de imdb.db (schéma texte ou compact)
+        dossier: Dossier des fichiers du graphe
+
+    Returns:
+        dict: Métadonnées du graphe (tailles, durées par phase)
+    """
+    durees = {}
+    debut = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    films = conn.execute(f"SELECT {NUMERO_SQL.format('mid')}, primaryTitle, startYear FROM movies "
+                         "ORDER BY 1").fetchall()
+    liens = np.concatenate([np.array(conn.execute(requete).fetchall(), dtype=np.int64).reshape(-1, 2)
+                            for requete in REQUETES_LIENS])
+    personnes = conn.execute(f"SELECT {NUMERO_SQL.format('pid')}, primaryName FROM persons "
+                           "WHERE pid IS NOT NULL").fetchall()
+    try:
+        # Génération de l'import dont le graphe est issu (table import_meta d'import_data.py)
+        generation = conn.execute("SELECT valeur FROM import_meta WHERE cle = 'generation'").fetchone()
+    except sqlite3.OperationalError:
+        generation = None
+    conn.close()
+    durees['chargement'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    # Films de la table movies ayant au moins un lien
+    numeros_movies = np.array([ligne[0] for ligne in films], dtype=np.int64)
+    positions = np.minimum(np.searchsorted(numeros_movies, liens[:, 0]), max(len(numeros_movies) - 1, 0))
+    liens = liens[numeros_movies[positions] == liens[:, 0]] if len(numeros_movies) else liens[:0]
+    films_numeros = _uniques(liens[:, 0])
+    personnes_numeros = _uniques(liens[:, 1])
+    nb_films, nb_personnes = len(films_numeros), len(personnes_numeros)
+
+    # Liens uniques triés par film puis personne (ordre CSR film → personnes)
+    liens = _uniques(np.searchsorted(films_numeros, liens[:, 0]) * max(nb_personnes, 1)
+                     + np.searchsorted(personnes_numeros, liens[:, 1]))
+    cote_films = liens // max(nb_personnes, 1)
+    cote_personnes = liens % max(nb_personnes, 1)
+
+    tableaux = {'personnes_numeros': personnes_numeros, 'films_numeros': films_numeros}
+    tableaux['films_indptr'] = np.zeros(nb_films + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cote_films, minlength=nb_films), out=tableaux['films_indptr'][1:])
+    tableaux['films_personnes'] = cote_personnes.astype(np.int32)
+
+    # Sens personne → films : tri stable par personne (les films restent triés)
+    ordre = np.argsort(cote_personnes, kind='stable')
+    tableaux['personnes_indptr'] = np.zeros(nb_personnes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cote_personnes, minlength=nb_personnes), out=tableaux['personnes_indptr'][1:])
+    tableaux['personnes_films'] = cote_films[ordre].astype(np.int32)
+    del liens, cote_films, cote_personnes, ordre
+
+    # Noms des personnes du graphe (vides si absentes de persons)
+    noms = [''] * nb_personnes
+    if personnes and nb_personnes:
+        numeros = np.array([numero for numero, _ in personnes], dtype=np.int64)
+        positions = np.minimum(np.searchsorted(personnes_numeros, numeros), nb_personnes - 1)
+        for position, connue, (_, nom) in zip(positions.tolist(),
+                                              (personnes_numeros[positions] == numeros).tolist(), personnes):
+            if connue:
+                noms[position] = nom
+    tableaux['noms_decalages'], tableaux['noms'] = _chaines(noms)
+
+    lignes = np.searchsorted(numeros_movies, films_numeros).tolist()
+    tableaux['titres_decalages'], tableaux['titres'] = _chaines(films[ligne][1] for ligne in lignes)
+    tableaux['annees'] = np.array([films[ligne][2] or 0 for ligne in lignes], dtype=np.int16)
+    durees['calcul'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    version = f"graphe-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    os.makedirs(os.path.join(dossier, version))
+    for nom in TABLEAUX:
+        np.save(os.path.join(dossier, version, f"{nom}.npy"), tableaux[nom])
+    meta = {
+        'version': version,
+        'generation': generation[0] if generation else None,
+        'date_construction': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'personnes': nb_personnes,
+        'films': nb_films,
+        'liens': int(len(tableaux['films_personnes'])),
+        'octets': int(sum(t.nbytes for t in tableaux.values())),
+    }
+    durees['ecriture'] = time.perf_counter() - debut
+    meta['durees_s'] = {phase: round(duree, 3) for phase, duree in durees.items()}
+    precedente = version_designee(dossier)
+    temporaire = os.path.join(dossier, 'meta.tmp.json')
+    with open(temporaire, 'w') as fichier:
+        json.dump(meta, fichier, indent=2)
+    os.replace(temporaire, os.path.join(dossier, 'meta.json'))
+
+    # La version précédente est gardée : un serveur qui a lu l'ancien meta.json peut être
+    # en train d'ouvrir ses fichiers (les fichiers déjà mappés restent lisibles)
+    for nom in os.listdir(dossier):
+        if nom.startswith('graphe-') and nom not in (version, precedente):
+            shutil.rmtree(os.path.join(dossier, nom), ignore_errors=True)
+    return meta
+
+
+def _deplier(indptr, indices, noeuds):
+    """
+    Voisins d'un ensemble de nœuds dans un sens du CSR.
+
+    Returns:
+        tuple: (voisins, nœud d'origine de chaque voisin)
+    """
+    debuts = indptr[noeuds]
+    longueurs = indptr[noeuds + 1] - debuts
+    total = int(longueurs.sum())
+    positions = np.repeat(debuts - (np.cumsum(longueurs) - longueurs), longueurs) + np.arange(total)
+    return indices[positions], np.repeat(noeuds, longueurs)
+
+
+class _Parcours:
+    """État d'un parcours en largeur depuis une personne (profondeurs et parents)"""
+
+    def __init__(self, graphe, depart):
+        self.graphe = graphe
+        self.profondeur = np.full(graphe.nb_personnes, -1, dtype=np.int16)
+        self.film_parent = np.full(graphe.nb_personnes, -1, dtype=np.int32)
+        self.personne_parent = np.full(graphe.nb_films, -1, dtype=np.int32)
+        self.profondeur[depart] = 0
+        self.frontiere = np.array([depart], dtype=np.int32)
+        self.niveau = 0
+
+    def cout(self):
+        """Liens à parcourir pour étendre la frontière"""
+        indptr = self.graphe.personnes_indptr
+        return int((indptr[self.frontiere + 1] - indptr[self.frontiere]).sum())
+
+    def etendre(self):
+        """Passe au niveau suivant : personnes ayant un film en commun avec la frontière"""
+        graphe = self.graphe
+        films, origines = _deplier(graphe.personnes_indptr, graphe.personnes_films, self.frontiere)
+        nouveaux = self.personne_parent[films] < 0
+        films, premiers = np.unique(films[nouveaux], return_index=True)
+        self.personne_parent[films] = origines[nouveaux][premiers]
+
+        personnes, origines = _deplier(graphe.films_indptr, graphe.films_personnes, films)
+        nouvelles = self.profondeur[personnes] < 0
+        personnes, premieres = np.unique(personnes[nouvelles], return_index=True)
+        self.niveau += 1
+        self.profondeur[personnes] = self.niveau
+        self.film_parent[personnes] = origines[nouvelles][premieres]
+        self.frontiere = personnes.astype(np.int32)
+        return self.frontiere
+
+    def remonter(self, personne):
+        """Chaîne [personne, film, personne, ..., départ] de `personne` au départ du parcours"""
+        chaine = [int(personne)]
+        while self.profondeur[personne] > 0:
+            film = int(self.film_parent[personne])
+            personne = int(self.personne_parent[film])
+            chaine += [film, personne]
+        return chaine
+
+
+class GrapheCollaborations:
+    """Graphe chargé depuis son dossier (tableaux en lecture seule, mappés en mémoire)"""
+
+    def __init__(self, dossier):
+        self.dossier = str(dossier)
+        chemin_meta = os.path.join(self.dossier, 'meta.json')
+        self.mtime = os.path.getmtime(chemin_meta)
+        with open(chemin_meta) as fichier:
+            self.meta = json.load(fichier)
+        for nom in TABLEAUX:
+            setattr(self, nom, np.load(os.path.join(self.dossier, self.meta['version'], f"{nom}.npy"),
+                                       mmap_mode='r'))
+        self.nb_personnes = len(self.personnes_numeros)
+        self.nb_films = len(self.films_numeros)
+
+    def indice(self, identifiant):
+        """Nœud de la personne dans le graphe, None si elle n'a aucun film"""
+        numero = numero_identifiant(identifiant, 'nm')
+        if numero is None:
+            return None
+        i = int(np.searchsorted(self.personnes_numeros, numero))
+        return i if i < self.nb_personnes and self.personnes_numeros[i] == numero else None
+
+    def personne(self, i):
+        """Identifiant et nom de la personne du nœud i"""
+        return {
+            'id': f"nm{int(self.personnes_numeros[i]):07d}",
+            'name': bytes(self.noms[self.noms_decalages[i]:self.noms_decalages[i + 1]]).decode('utf-8'),
+        }
+
+    def film(self, j):
+        """Identifiant, titre et année du film du nœud j"""
+        return {
+            'id': f"tt{int(self.films_numeros[j]):07d}",
+            'title': bytes(self.titres[self.titres_decalages[j]:self.titres_decalages[j + 1]]).decode('utf-8'),
+            'year': int(self.annees[j]) or None,
+        }
+
+    def chemin(self, depart, arrivee, max_degres=MAX_DEGRES):
+        """
+        Plus court chemin de collaborations entre deux personnes.
+
+        Args:
+            depart: Nœud de la première personne
+            arrivee: Nœud de la seconde personne
+            max_degres: Degrés de séparation cherchés au plus
+
+        Returns:
+            dict: {'degrees': n, 'path': [personne, film, personne, ...]} ou None si pas de chemin
+        """
+        if depart == arrivee:
+            return {'degrees': 0, 'path': [dict(self.personne(depart), type='person')]}
+        cotes = [_Parcours(self, depart), _Parcours(self, arrivee)]
+        while cotes[0].niveau + cotes[1].niveau < max_degres:
+            if not len(cotes[0].frontiere) or not len(cotes[1].frontiere):
+                return None
+            # Le côté le moins coûteux à étendre avance d'un niveau
+            cote = 0 if cotes[0].cout() <= cotes[1].cout() else 1
+            etendu, autre = cotes[cote], cotes[1 - cote]
+            nouvelles = etendu.etendre()
+            rencontres = nouvelles[autre.profondeur[nouvelles] >= 0]
+            if len(rencontres):
+                # Toutes les rencontres sont au même niveau du côté étendu : la plus proche de l'autre côté
+                milieu = int(rencontres[np.argmin(autre.profondeur[rencontres])])
+                noeuds = cotes[0].remonter(milieu)[::-1] + cotes[1].remonter(milieu)[1:]
+                chemin = [dict(self.personne(n), type='person') if k % 2 == 0 else dict(self.film(n), type='movie')
+                          for k, n in enumerate(noeuds)]
+                return {'degrees': len(noeuds) // 2, 'path': chemin}
+        return None
+
+    def voisinage(self, depart, k=2):
+        """
+        Nombre de personnes à chaque distance de collaboration de 1 à k.
+
+        Returns:
+            list: [personnes à 1 collaboration, à 2, ..., à k]
+        """
+        parcours = _Parcours(self, depart)
+        niveaux = []
+        for _ in range(k):
+            if not len(parcours.frontiere):
+                break
+            niveaux.append(int(len(parcours.etendre())))
+        return niveaux + [0] * (k - len(niveaux))
+
+    def collaborateurs(self, i, n=10):
+        """
+        Personnes ayant le plus de films en commun avec la personne du nœud i.
+
+        Returns:
+            list: Personnes avec leur nombre de films en commun ('films'), par nombre décroissant
+        """
+        films = self.personnes_films[self.personnes_indptr[i]:self.personnes_indptr[i + 1]]
+        personnes, _ = _deplier(self.films_indptr, self.films_personnes, np.asarray(films, dtype=np.int64))
+        personnes, communs = np.unique(personnes[personnes != i], return_counts=True)
+        meilleurs = np.lexsort((personnes, -communs))[:n]
+        return [dict(self.personne(int(personnes[m])), films=int(communs[m])) for m in meilleurs]
+
+
+def get_graphe():
+    """
+    Graphe des collaborations du processus, chargé au premier appel puis rechargé
+    quand construire_graphe a écrit une nouvelle version.
+
+    Returns:
+        GrapheCollaborations: Graphe prêt, ou None si aucun graphe n'a été construit
+    """
+    global _graphe
+    from django.conf import settings
+    dossier = str(settings.GRAPHE_DOSSIER)
+    chemin_meta = os.path.join(dossier, 'meta.json')
+    if not os.path.exists(chemin_meta):
+        return None
+    graphe = _graphe
+    if graphe is not None and graphe.dossier == dossier and graphe.mtime == os.path.getmtime(chemin_meta):
+        return graphe
+    with _verrou:
+        if _graphe is None or _graphe.dossier != dossier or _graphe.mtime != os.path.getmtime(chemin_meta):
+            _graphe = GrapheCollaborations(dossier)
+        return _graphe
+
+
+def degres_separation(de, a, max_degres=MAX_DEGRES):
+    """
+    Degrés de séparation entre deux personnes et chaîne de films qui les relie.
+
+    Args:
+        de: Identifiant IMDb de la première personne (ex: 'nm0000102')
+        a: Identifiant IMDb de la seconde personne
+        max_degres: Degrés de séparation cherchés au plus
+
+    Returns:
+        dict: {'from', 'to', 'degrees', 'path'} ; degrees et path valent None sans chemin,
+              from ou to vaut None pour une personne absente du graphe ; None si le graphe n'est pas construit
+    """
+    graphe = get_graphe()
+    if graphe is None:
+        return None
+    depart, arrivee = graphe.indice(de), graphe.indice(a)
+    resultat = {
+        'from': graphe.personne(depart) if depart is not None else None,
+        'to': graphe.personne(arrivee) if arrivee is not None else None,
+        'degrees': None,
+        'path': None,
+    }
+    if depart is not None and arrivee is not None:
+        resultat.update(graphe.chemin(depart, arrivee, max_degres) or {})
+    return resultat
+
+
+def reseau_personne(person_id, k=2, n=10):
+    """
+    Réseau de collaborations d'une personne (widget de la page personne).
+
+    Args:
+        person_id: Identifiant IMDb de la personne
+        k: Distance maximum du voisinage compté
+        n: Nombre de collaborateurs
+
+    Returns:
+        dict: {'person', 'neighbourhood': [à 1, ..., à k], 'collaborators'} ; 'person' vaut None
+              si la personne n'a aucun film ; None si le graphe n'est pas construit
+    """
+    graphe = get_graphe()
+    if graphe is None:
+        return None
+    i = graphe.indice(person_id)
+    if i is None:
+        return {'person': None, 'neighbourhood': [0] * k, 'collaborators': []}
+    return {
+        'person': graphe.personne(i),
+        'neighbourhood': graphe.voisinage(i, k),
+        'collaborators': graphe.collaborateurs(i, n),
+    }
@@ -0,0 +1,60 @@
+"""
+benchmark_autocomplete
+======================
+Construit l'index d'autocomplétion depuis imdb.db et affiche sa mémoire,
+son temps de construction et les latences p50 / p99 sur des préfixes tirés de l'index.
+
+    python manage.py benchmark_autocomplete --requetes 20000
+"""
+
+import random
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movies.autocomplete_service import IndexPrefixes
+
+# Objectif de latence par requête (ms)
+OBJECTIF_P99_MS = 1.0
+
+
+class Command(BaseCommand):
+    help = "Mesure la mémoire et la latence de l'index d'autocomplétion"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requetes', type=int, default=10000, help='Nombre de requêtes mesurées')
+        parser.add_argument('--k', type=int, default=10, help='Nombre de complétions par requête')
+
+    def handle(self, *args, **options):
+        index = IndexPrefixes(settings.DATABASES['imdb']['NAME'])
+        self.stdout.write(f"Index construit en {index.duree_construction:.2f}s "
+                          f"({len(index.cles):,} clés, {len(index.types):,} entrées)")
+
+        self.stdout.write("\nMémoire de l'index :")
+        for composant, octets in index.memoire_octets().items():
+            self.stdout.write(f"  {composant:<10} : {octets / (1024 * 1024):>8.2f} Mo")
+
+        # Préfixes de 1 à 12 caractères tirés de clés existantes (+ quelques préfixes absents)
+        aleatoire = random.Random(42)
+        prefixes = []
+        for _ in range(options['requetes']):
+            cle = index.cles[aleatoire.randrange(len(index.cles))].decode('utf-8', errors='ignore')
+            prefixes.append(cle[:aleatoire.randint(1, 12)] or 'zzz')
+
+        latences = []
+        for prefixe in prefixes:
+            debut = time.perf_counter()
+            index.rechercher(prefixe, options['k'])
+            latences.append((time.perf_counter() - debut) * 1000)
+
+        p50, p99, maximum = np.percentile(latences, [50, 99, 100])
+        self.stdout.write(f"\nLatence sur {len(latences):,} requêtes (k={options['k']}) :")
+        self.stdout.write(f"  p50 : {p50:.3f} ms")
+        self.stdout.write(f"  p99 : {p99:.3f} ms")
+        self.stdout.write(f"  max : {maximum:.3f} ms")
+        if p99 <= OBJECTIF_P99_MS:
+            self.stdout.write(self.style.SUCCESS(f"Objectif p99 <= {OBJECTIF_P99_MS} ms atteint"))
+        else:
+            self.stdout.write(self.style.WARNING(f"Objectif p99 <= {OBJECTIF_P99_MS} ms non atteint"))
@@ -0,0 +1,326 @@
+"""
+benchmark_charge
+================
+Test de charge de l'application : N clients simultanés parcourent l'accueil (/), la liste
+des films (/movies/ avec genre, années, note, tri et page tirés au hasard), le détail d'un
+film (/movies/<id>/) et d'une personne (/person/<id>/), la recherche (/search/) et les
+statistiques (/stats/), selon un mélange pondéré de pages. Identifiants, genres et termes
+de recherche sont tirés de imdb.db ; --graine rejoue exactement la même suite de requêtes.
+
+Par défaut les requêtes passent par le client de test de Django (dans le processus, un
+client par thread, sans réseau) ; avec --url elles sont envoyées à un serveur déjà lancé
+(asyncio, une connexion par requête, comme benchmark_serveurs). Le rapport donne le débit,
+puis par page les latences p50/p95/p99/max des réponses et le taux d'erreur
+(codes >= 400, exceptions, délais dépassés).
+
+    python manage.py benchmark_charge --requetes 2000 --concurrence 16
+    python manage.py benchmark_charge --url http://127.0.0.1:8000 --concurrence 50 \\
+        --melange accueil=1 liste=3 film=4 personne=2 recherche=2 stats=1 --json charge.json
+"""
+
+import asyncio
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from movies import sqlite_service as service
+from movies.management.commands.benchmark_serveurs import requete_http
+
+PAGES = ('accueil', 'liste', 'film', 'personne', 'recherche', 'stats')
+MELANGE_DEFAUT = ['accueil=1', 'liste=3', 'film=4', 'personne=2', 'recherche=2', 'stats=1']
+
+# Tirage des échantillons : rowids par requête (sous la limite de variables de SQLite),
+# rowids par tirage et nombre de tirages au plus
+LOT_ROWIDS = 30_000
+TIRAGE_MAX = 1_000_000
+TIRAGES_MAX = 20
+
+
+def lire_melange(valeurs):
+    """Mélange de pages 'page=poids' -> {page: poids}"""
+    melange = {}
+    for valeur in valeurs:
+        page, _, poids = valeur.partition('=')
+        if page not in PAGES:
+            raise CommandError(f"Page inconnue : {page} (pages : {', '.join(PAGES)})")
+        try:
+            melange[page] = float(poids or 1)
+        except ValueError:
+            raise CommandError(f"Poids invalide pour {page} : {poids}")
+    if not any(poids > 0 for poids in melange.values()):
+        raise CommandError("Le mélange doit contenir au moins une page de poids positif")
+    return melange
+
+
+def tirer_lignes(conn, sql, table, taille, aleatoire):
+    """
+    Jusqu'à `taille` lignes distinctes de `sql` (filtré par rowid IN (...)) pour des rowids
+    de `table` tirés au hasard entre MIN(rowid) et MAX(rowid).
+    Les rowids peuvent être creux (schéma compact : rowid = numéro IMDb, ~1 % des valeurs
+    utilisées) et `sql` peut écarter des lignes : on retire alors d'après le taux de
+    réussite des tirages précédents jusqu'à avoir assez de lignes.
+    """
+    minimum, maximum = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+    if minimum is None:
+        return []
+    lignes, tires, nombre = {}, set(), taille
+    for _ in range(TIRAGES_MAX):
+        restants = maximum - minimum + 1 - len(tires)
+        if len(lignes) >= taille or restants <= 0:
+            break
+        rowids = [rowid for rowid in aleatoire.sample(range(minimum, maximum + 1), min(nombre, restants))
+                  if rowid not in tires]
+        tires.update(rowids)
+        trouvees = 0
+        for debut in range(0, len(rowids), LOT_ROWIDS):
+            lot = rowids[debut:debut + LOT_ROWIDS]
+            for ligne in conn.execute(sql.format(','.join('?' * len(lot))), lot):
+                trouvees += ligne not in lignes
+                lignes[ligne] = None
+        # Prochain tirage : lignes manquantes / taux de réussite (avec une marge)
+        reussite = max(trouvees, 1) / max(len(rowids), 1)
+        nombre = min(int((taille - len(lignes)) / reussite * 1.2) + 1, TIRAGE_MAX)
+    lignes = list(lignes)
+    aleatoire.shuffle(lignes)
+    return lignes[:taille]
+
+
+def echantillons(db_path, taille, aleatoire):
+    """
+    Données réelles de imdb.db pour construire les requêtes.
+
+    Returns:
+        dict: films et personnes (identifiants), genres, termes de recherche
+              (mots des titres et noms tirés)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        films = tirer_lignes(conn, "SELECT mid, primaryTitle FROM movies WHERE rowid IN ({}) "
+                                   "AND titleType = 'movie'", 'movies', taille, aleatoire)
+        personnes = tirer_lignes(conn, "SELECT DISTINCT pr.pid, pe.primaryName FROM principals pr "
+                                       "JOIN persons pe ON pe.pid = pr.pid WHERE pr.rowid IN ({})",
+                                 'principals', taille, aleatoire)
+        genres = [genre for (genre,) in conn.execute("SELECT DISTINCT genre FROM genres")]
+    finally:
+        conn.close()
+    if not films or not personnes:
+        raise CommandError(f"Pas de films ou de personnes dans {db_path}")
+
+    mots = [mot for _, titre in films for mot in re.findall(r"\w{4,}", titre or "")]
+    noms = [nom.split()[-1] for _, nom in personnes if nom]
+    return {
+        'films': [service.mid_texte(mid) for mid, _ in films],
+        'personnes': [service.pid_texte(pid) for pid, _ in personnes],
+        'genres': genres,
+        'termes': mots + noms or ['love'],
+    }
+
+
+def chemin(page, donnees, aleatoire):
+    """Chemin demandé pour une page, avec des paramètres tirés au hasard"""
+    if page == 'accueil':
+        return '/'
+    if page == 'stats':
+        return '/stats/'
+    if page == 'film':
+        return f"/movies/{aleatoire.choice(donnees['films'])}/"
+    if page == 'personne':
+        return f"/person/{aleatoire.choice(donnees['personnes'])}/"
+    if page == 'recherche':
+        return '/search/?' + urlencode({'q': aleatoire.choice(donnees['termes'])})
+
+    # Liste : filtres, tri et page combinés comme par un visiteur qui navigue
+    parametres = {}
+    if donnees['genres'] and aleatoire.random() < 0.5:
+        parametres['genre'] = aleatoire.choice(donnees['genres'])
+    if aleatoire.random() < 0.4:
+        debut = aleatoire.randrange(1930, 2020, 10)
+        parametres.update(year_min=debut, year_max=debut + aleatoire.choice((9, 19)))
+    if aleatoire.random() < 0.3:
+        parametres['rating_min'] = aleatoire.choice((5, 6, 7, 8))
+    if aleatoire.random() < 0.5:
+        parametres.update(sort=aleatoire.choice(('title', 'year', 'rating')),
+                          order=aleatoire.choice(('asc', 'desc')))
+    if aleatoire.random() < 0.3:
+        parametres['page'] = aleatoire.randint(2, 5)
+    return '/movies/' + ('?' + urlencode(parametres) if parametres else '')
+
+
+def plan_requetes(melange, donnees, requetes, aleatoire):
+    """Suite de (page, chemin) : pages tirées selon les poids du mélange"""
+    pages = aleatoire.choices(list(melange), weights=list(melange.values()), k=requetes)
+    return [(page, chemin(page, donnees, aleatoire)) for page in pages]
+
+
+def hote_autorise():
+    """Hôte accepté par ALLOWED_HOSTS pour le client de test ('localhost' en DEBUG sans liste)"""
+    for hote in settings.ALLOWED_HOSTS:
+        if hote != '*':
+            return hote.lstrip('.')
+    return 'localhost'
+
+
+def charger_client(plan, concurrence):
+    """
+    Exécute le plan dans le processus avec `concurrence` threads (un client de test par thread).
+
+    Returns:
+        tuple: ([(page, statut, latence en ms)], durée totale en s)
+    """
+    clients = threading.local()
+    hote = hote_autorise()
+
+    def executer(requete):
+        page, chemin_page = requete
+        if not hasattr(clients, 'client'):
+            clients.client = Client(raise_request_exception=False, HTTP_HOST=hote)
+        debut = time.perf_counter()
+        try:
+            statut = clients.client.get(chemin_page).status_code
+        except Exception as e:
+            # Toute exception hors de la vue (rendu, middleware...) est une erreur de la page
+            statut = type(e).__name__
+        return page, statut, (time.perf_counter() - debut) * 1000
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrence) as executeur:
+        resultats = list(executeur.map(executer, plan))
+    return resultats, time.perf_counter() - debut
+
+
+async def charger_http(url, plan, concurrence, timeout):
+    """
+    Envoie le plan à un serveur lancé avec `concurrence` clients asyncio simultanés.
+
+    Returns:
+        tuple: ([(page, statut, latence en ms)], durée totale en s)
+    """
+    adresse = urlsplit(url)
+    hote, port = adresse.hostname, adresse.port or 80
+    suite = iter(plan)
+    resultats = []
+
+    async def client():
+        for page, chemin_page in suite:
+            debut = time.perf_counter()
+            try:
+                statut = await requete_http(hote, port, chemin_page, timeout)
+            except asyncio.TimeoutError:
+                statut = 'délai dépassé'
+            except (OSError, ValueError, IndexError) as e:
+                statut = type(e).__name__
+            resultats.append((page, statut, (time.perf_counter() - debut) * 1000))
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrence)))
+    return resultats, time.perf_counter() - debut
+
+
+def en_erreur(statut):
+    """Code >= 400, exception ou délai dépassé"""
+    return not isinstance(statut, int) or statut >= 400
+
+
+def statistiques(resultats, duree):
+    """
+    Débit, latences (réponses sans erreur) et erreurs par page, puis pour l'ensemble (clé 'TOTAL').
+
+    Returns:
+        dict: page -> {requetes, req_s, p50_ms, p95_ms, p99_ms, max_ms, erreurs, taux_erreur, codes}
+    """
+    groupes = {}
+    for page, statut, latence in resultats:
+        groupes.setdefault(page, []).append((statut, latence))
+    groupes = {page: groupes[page] for page in PAGES if page in groupes}
+    groupes['TOTAL'] = [(statut, latence) for _, statut, latence in resultats]
+
+    stats = {}
+    for page, mesures in groupes.items():
+        latences = [latence for statut, latence in mesures if not en_erreur(statut)]
+        codes = Counter(str(statut) for statut, _ in mesures if en_erreur(statut))
+        p50, p95, p99 = np.percentile(latences, [50, 95, 99]) if latences else (float('nan'),) * 3
+        stats[page] = {
+            'requetes': len(mesures),
+            'req_s': len(mesures) / duree if duree else 0.0,
+            'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'max_ms': max(latences) if latences else float('nan'),
+            'erreurs': sum(codes.values()),
+            'taux_erreur': sum(codes.values()) / len(mesures),
+            'codes': dict(codes),
+        }
+    return stats
+
+
+class Command(BaseCommand):
+    help = "Test de charge des pages de l'application (client de test Django ou serveur lancé)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Serveur déjà lancé (ex. http://127.0.0.1:8000) ; '
+                                          'sinon client de test de Django dans le processus')
+        parser.add_argument('--melange', nargs='+', default=MELANGE_DEFAUT,
+                            help=f"Poids des pages 'page=poids' ({', '.join(PAGES)})")
+        parser.add_argument('--requetes', type=int, default=1000, help='Requêtes mesurées')
+        parser.add_argument('--concurrence', type=int, default=8, help='Clients simultanés')
+        parser.add_argument('--echauffement', type=int, default=20,
+                            help='Requêtes envoyées avant la mesure (non comptées)')
+        parser.add_argument('--echantillon', type=int, default=1000,
+                            help='Films et personnes tirés de imdb.db pour construire les requêtes')
+        parser.add_argument('--graine', type=int, default=42, help='Graine aléatoire (même suite de requêtes)')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Délai max par requête en s (--url)')
+        parser.add_argument('--json', help='Fichier JSON des résultats')
+
+    def handle(self, *args, **options):
+        melange = lire_melange(options['melange'])
+        aleatoire = random.Random(options['graine'])
+        donnees = echantillons(str(settings.DATABASES['imdb']['NAME']), options['echantillon'], aleatoire)
+        echauffement = plan_requetes(melange, donnees, options['echauffement'], aleatoire)
+        plan = plan_requetes(melange, donnees, options['requetes'], aleatoire)
+        concurrence = max(options['concurrence'], 1)
+
+        if options['url']:
+            mode = f"serveur {options['url']}"
+            if echauffement:
+                asyncio.run(charger_http(options['url'], echauffement, concurrence, options['timeout']))
+            resultats, duree = asyncio.run(charger_http(options['url'], plan, concurrence, options['timeout']))
+        else:
+            mode = "client de test Django"
+            if echauffement:
+                charger_client(echauffement, concurrence)
+            resultats, duree = charger_client(plan, concurrence)
+
+        stats = statistiques(resultats, duree)
+        total = stats['TOTAL']
+        self.stdout.write(f"\n{total['requetes']} requêtes en {duree:.1f}s, {concurrence} clients ({mode}) : "
+                          f"{total['req_s']:.1f} req/s, {total['taux_erreur']:.1%} d'erreurs")
+        self.stdout.write(f"Mélange : {' '.join(f'{page}={poids:g}' for page, poids in melange.items())}\n")
+        self.stdout.write(f"{'Page':<10} {'Requêtes':>9} {'Req/s':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+                          f"{'p99 (ms)':>10} {'max (ms)':>10} {'Erreurs':>9}")
+        self.stdout.write("-" * 83)
+        for page, ligne in stats.items():
+            if page == 'TOTAL':
+                self.stdout.write("-" * 83)
+            self.stdout.write(f"{page:<10} {ligne['requetes']:>9} {ligne['req_s']:>8.1f} {ligne['p50_ms']:>10.1f} "
+                              f"{ligne['p95_ms']:>10.1f} {ligne['p99_ms']:>10.1f} {ligne['max_ms']:>10.1f} "
+                              f"{ligne['taux_erreur']:>8.1%}")
+
+        erreurs = [(page, code, nombre) for page, ligne in stats.items() if page != 'TOTAL'
+                   for code, nombre in ligne['codes'].items()]
+        if erreurs:
+            self.stdout.write("\nErreurs : " + ", ".join(f"{page} {code} ×{nombre}" for page, code, nombre in erreurs))
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump({'mode': mode, 'concurrence': concurrence, 'graine': options['graine'],
+                           'melange': melange, 'duree_s': duree, 'pages': stats}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"\nRésultats JSON : {options['json']}")
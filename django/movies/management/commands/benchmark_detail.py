@@ -0,0 +1,79 @@
+"""
+benchmark_detail
+================
+Compare la lecture du détail d'un film servie par le seul document movies_complete
+et l'ancienne lecture qui relit aussi les personnages dans SQLite
+(MONGO_VERIFIER_PERSONNAGES), sans cache, puis la lecture à travers le cache
+des films (CACHE_FILMS), sur un échantillon aléatoire de films.
+Compte aussi les films dont les personnages du document diffèrent de SQLite
+(à corriger avec scripts/phase2_mongodb/migrate_structured.py --personnages).
+
+    python manage.py benchmark_detail --films 500
+"""
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from movies import mongo_service
+from movies.sqlite_service import get_movie_characters
+
+
+class Command(BaseCommand):
+    help = "Compare détail de film en une lecture MongoDB et avec relecture des personnages SQLite"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--films', type=int, default=500, help='Films tirés au hasard')
+        parser.add_argument('--repetitions', type=int, default=3,
+                            help='Lectures de chaque film par mode (la première chauffe les caches)')
+
+    def handle(self, *args, **options):
+        db = mongo_service.get_mongo_connection()
+        films = [doc['_id'] for doc in db['movies_complete'].aggregate([
+            {'$match': {'cast.0': {'$exists': True}}},
+            {'$sample': {'size': options['films']}},
+            {'$project': {'_id': 1}},
+        ])]
+        if not films:
+            self.stderr.write("movies_complete est vide : lancer migrate_structured.py")
+            return
+
+        # Validation : films dont les personnages du document diffèrent de SQLite
+        ecarts = 0
+        for movie_id in films:
+            movie = db['movies_complete'].find_one({'_id': movie_id}, {'cast': 1})
+            if mongo_service.comparer_personnages(movie, get_movie_characters(movie_id)):
+                ecarts += 1
+
+        # Mode : (MONGO_VERIFIER_PERSONNAGES, CACHE_FILMS)
+        modes = {
+            'MongoDB + SQLite': (True, False),
+            'MongoDB seul (1 lecture)': (False, False),
+            'Cache des films': (False, True),
+        }
+        resultats = {}
+        for mode, (verifier, cache) in modes.items():
+            with override_settings(MONGO_VERIFIER_PERSONNAGES=verifier, CACHE_FILMS=cache):
+                mongo_service.invalider_cache_films()
+                resultats[mode] = self.mesurer(films, options['repetitions'])
+
+        self.stdout.write(f"\n{len(films)} films, {options['repetitions']} lectures par film et par mode\n")
+        self.stdout.write(f"{'Mode':<28} {'Moy. (ms)':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}")
+        self.stdout.write("-" * 72)
+        for mode, latences in resultats.items():
+            p50, p95, p99 = np.percentile(latences, [50, 95, 99])
+            self.stdout.write(f"{mode:<28} {np.mean(latences):>10.2f} {p50:>10.2f} {p95:>10.2f} {p99:>10.2f}")
+        self.stdout.write(f"\nFilms dont les personnages diffèrent de SQLite : {ecarts}/{len(films)}")
+
+    def mesurer(self, films, repetitions):
+        """Latences en ms de get_movie_detail_mongo (première lecture de chaque film ignorée : elle remplit les caches)"""
+        latences = []
+        for movie_id in films:
+            for repetition in range(repetitions):
+                debut = time.perf_counter()
+                mongo_service.get_movie_detail_mongo(movie_id)
+                if repetition or repetitions == 1:
+                    latences.append((time.perf_counter() - debut) * 1000)
+        return latences
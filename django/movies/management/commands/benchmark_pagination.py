@@ -0,0 +1,77 @@
+"""
+benchmark_pagination
+====================
+Mesure la latence d'une page de la liste des films selon sa profondeur :
+lecture depuis le début de la liste (équivalent OFFSET, lien direct vers la page)
+contre lecture à partir du curseur de la page précédente (pagination par clé),
+ainsi que le comptage des films filtrés avec et sans cache.
+
+    python manage.py benchmark_pagination --profondeurs 1 10 100 1000 5000 --tri rating title
+"""
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from movies import sqlite_service as service
+
+
+class Command(BaseCommand):
+    help = "Compare pagination par OFFSET et par clé sur la liste des films"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profondeurs', type=int, nargs='+', default=[1, 10, 100, 1000, 5000],
+                            help='Numéros de page mesurés')
+        parser.add_argument('--tri', nargs='+', default=['rating', 'title', 'year'],
+                            help='Colonnes de tri (title, year, rating)')
+        parser.add_argument('--ordre', default='desc', choices=['asc', 'desc'])
+        parser.add_argument('--genre', default=None, help='Filtre par genre (optionnel)')
+        parser.add_argument('--iterations', type=int, default=5, help='Exécutions par mesure')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        filtres = {'genre': options['genre'], 'sort_order': options['ordre']}
+
+        # Comptage : sans cache (vidé avant chaque appel) puis avec cache
+        conn = service.get_sqlite_connection()
+
+        def compter_sans_cache():
+            service._cache_comptages.clear()
+            service.compter_films(conn, genre=options['genre'])
+
+        sans_cache = self.mesurer(compter_sans_cache, iterations)
+        avec_cache = self.mesurer(lambda: service.compter_films(conn, genre=options['genre']), iterations)
+        total = service.compter_films(conn, genre=options['genre'])
+        conn.close()
+
+        self.stdout.write(f"\n{total:,} films ({options['genre'] or 'tous genres'}), "
+                          f"tri {options['ordre']}, médiane de {iterations} exécutions\n")
+        self.stdout.write(f"Comptage sans cache : {sans_cache:8.2f} ms")
+        self.stdout.write(f"Comptage en cache   : {avec_cache:8.3f} ms\n")
+
+        self.stdout.write(f"{'Tri':<8} {'Page':>8} {'OFFSET (ms)':>12} {'Clé (ms)':>10} {'Accélération':>13}")
+        self.stdout.write("-" * 56)
+        for tri in options['tri']:
+            for page in options['profondeurs']:
+                if (page - 1) * 20 >= total:
+                    continue
+                # Curseur de la page précédente (non mesuré), comme le porte le lien « Suivant »
+                precedente = service.get_movies_list(page=page - 1, sort_by=tri, **filtres) if page > 1 else None
+                curseur = precedente['last_cursor'] if precedente else None
+
+                offset = self.mesurer(
+                    lambda: service.get_movies_list(page=page, sort_by=tri, **filtres), iterations)
+                cle = self.mesurer(
+                    lambda: service.get_movies_list(page=page, sort_by=tri, after=curseur, **filtres),
+                    iterations)
+                self.stdout.write(f"{tri:<8} {page:>8,} {offset:>12.2f} {cle:>10.2f} {offset / cle:>12.1f}x")
+
+    def mesurer(self, fonction, iterations):
+        """Latence médiane (ms) d'une fonction"""
+        latences = []
+        for _ in range(iterations):
+            debut = time.perf_counter()
+            fonction()
+            latences.append((time.perf_counter() - debut) * 1000)
+        return float(np.median(latences))
@@ -0,0 +1,110 @@
+"""
+benchmark_serveurs
+==================
+Test de charge HTTP comparant plusieurs serveurs de l'application déjà lancés,
+typiquement WSGI (vues synchrones) et ASGI (vues asynchrones) :
+
+    python manage.py runserver 8000 --noreload              # WSGI
+    uvicorn config.asgi:application --port 8001              # ASGI
+    python manage.py benchmark_serveurs --serveurs wsgi=http://127.0.0.1:8000 \\
+        asgi=http://127.0.0.1:8001 --pages / /search/?q=love --concurrence 50
+
+Chaque serveur reçoit le même nombre de requêtes, envoyées par N clients simultanés
+(asyncio, une connexion par requête) ; on compare débit, latences p50/p95/p99 et erreurs.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+
+async def requete_http(hote, port, chemin, timeout):
+    """
+    Envoie un GET HTTP/1.1 et lit la réponse complète.
+
+    Returns:
+        int: Code de statut HTTP
+    """
+    lecteur, ecrivain = await asyncio.wait_for(asyncio.open_connection(hote, port), timeout)
+    try:
+        ecrivain.write(f"GET {chemin} HTTP/1.1\r\nHost: {hote}:{port}\r\nConnection: close\r\n\r\n".encode())
+        await ecrivain.drain()
+        reponse = await asyncio.wait_for(lecteur.read(), timeout)
+    finally:
+        ecrivain.close()
+    return int(reponse.split(b" ", 2)[1])
+
+
+async def charger_serveur(url, pages, requetes, concurrence, timeout):
+    """
+    Envoie `requetes` requêtes (pages en alternance) avec `concurrence` clients simultanés.
+
+    Returns:
+        tuple: (latences en ms des réponses 2xx/3xx, nombre d'erreurs, durée totale en s)
+    """
+    adresse = urlsplit(url)
+    hote, port = adresse.hostname, adresse.port or 80
+    compteur = iter(range(requetes))
+    latences, erreurs = [], [0]
+
+    async def client():
+        for numero in compteur:
+            chemin = pages[numero % len(pages)]
+            debut = time.perf_counter()
+            try:
+                statut = await requete_http(hote, port, chemin, timeout)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                statut = None
+            if statut is not None and statut < 400:
+                latences.append((time.perf_counter() - debut) * 1000)
+            else:
+                erreurs[0] += 1
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrence)))
+    return latences, erreurs[0], time.perf_counter() - debut
+
+
+class Command(BaseCommand):
+    help = "Compare débit et latences de plusieurs serveurs HTTP de l'application (WSGI / ASGI)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--serveurs', nargs='+', required=True,
+                            help='nom=url des serveurs à comparer (ex. wsgi=http://127.0.0.1:8000)')
+        parser.add_argument('--pages', nargs='+', default=['/', '/search/?q=love'],
+                            help='Chemins demandés en alternance')
+        parser.add_argument('--requetes', type=int, default=1000, help='Requêtes par serveur')
+        parser.add_argument('--concurrence', type=int, default=20, help='Clients simultanés')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Délai max par requête (s)')
+        parser.add_argument('--echauffement', type=int, default=20,
+                            help='Requêtes envoyées avant la mesure (non comptées)')
+
+    def handle(self, *args, **options):
+        resultats = {}
+        for serveur in options['serveurs']:
+            nom, _, url = serveur.partition('=')
+            if not url:
+                nom, url = serveur, serveur
+            if options['echauffement']:
+                asyncio.run(charger_serveur(url, options['pages'], options['echauffement'],
+                                            min(options['concurrence'], options['echauffement']),
+                                            options['timeout']))
+            resultats[nom] = asyncio.run(charger_serveur(
+                url, options['pages'], options['requetes'], options['concurrence'], options['timeout']))
+
+        self.stdout.write(f"\n{options['requetes']} requêtes par serveur, {options['concurrence']} clients, "
+                          f"pages : {' '.join(options['pages'])}\n")
+        self.stdout.write(f"{'Serveur':<12} {'Req/s':>9} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+                          f"{'p99 (ms)':>10} {'max (ms)':>10} {'Erreurs':>8}")
+        self.stdout.write("-" * 74)
+        for nom, (latences, erreurs, duree) in resultats.items():
+            if latences:
+                p50, p95, p99 = np.percentile(latences, [50, 95, 99])
+                maximum = max(latences)
+            else:
+                p50 = p95 = p99 = maximum = float('nan')
+            self.stdout.write(f"{nom:<12} {len(latences) / duree:>9.1f} {p50:>10.1f} {p95:>10.1f} "
+                              f"{p99:>10.1f} {maximum:>10.1f} {erreurs:>8}")
@@ -0,0 +1,90 @@
+"""
+benchmark_sqlite
+================
+Charge le service SQLite avec des « pages » (suite d'appels faits par une vue)
+exécutées par plusieurs threads, avec une connexion par appel (ancien comportement)
+puis avec les connexions persistantes en lecture seule, et compare débit et latences.
+
+    python manage.py benchmark_sqlite --pages personne recherche liste --requetes 2000 --threads 8
+"""
+
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movies import sqlite_service as service
+
+
+def pages_disponibles(echantillon_pid, echantillon_mid):
+    """Pages simulées : nom -> fonction exécutant les appels du service de la vue correspondante"""
+    return {
+        'personne': lambda a: (service.get_person_detail(a.choice(echantillon_pid)),
+                               service.get_person_filmography(a.choice(echantillon_pid))),
+        'recherche': lambda a: (service.search_movies(a.choice(['love', 'star', 'night', 'man'])),
+                                service.search_persons(a.choice(['tom', 'john', 'smith']))),
+        'liste': lambda a: service.get_movies_list(page=a.randint(1, 20)),
+        'film': lambda a: service.get_movie_characters(a.choice(echantillon_mid)),
+        'accueil': lambda a: (service.get_global_stats(), service.get_top_rated_movies()),
+        'stats': lambda a: (service.get_genre_stats(), service.get_movie_distributions(),
+                            service.get_top_actors(), service.get_sqlite_stats()),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare connexion par appel et connexions persistantes du service SQLite"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', nargs='+', default=['personne', 'recherche', 'liste', 'film'],
+                            help='Pages simulées (personne, recherche, liste, film, accueil, stats)')
+        parser.add_argument('--requetes', type=int, default=1000, help='Pages exécutées par mode')
+        parser.add_argument('--threads', type=int, default=4, help='Threads concurrents')
+
+    def handle(self, *args, **options):
+        conn = sqlite3.connect(str(settings.DATABASES['imdb']['NAME']))
+        echantillon_pid = [r[0] for r in conn.execute("SELECT pid FROM principals LIMIT 1000")]
+        echantillon_mid = [r[0] for r in conn.execute("SELECT mid FROM movies LIMIT 1000")]
+        conn.close()
+        if settings.IMDB_COMPACT_KEYS:
+            echantillon_pid = [service.pid_texte(p) for p in echantillon_pid]
+            echantillon_mid = [service.mid_texte(m) for m in echantillon_mid]
+
+        pages = pages_disponibles(echantillon_pid, echantillon_mid)
+        selection = [pages[nom] for nom in options['pages']]
+
+        resultats = {}
+        ancien = getattr(settings, 'SQLITE_CONNEXIONS_PERSISTANTES', True)
+        try:
+            for persistant in (False, True):
+                settings.SQLITE_CONNEXIONS_PERSISTANTES = persistant
+                resultats[persistant] = self.mesurer(selection, options['requetes'], options['threads'])
+        finally:
+            settings.SQLITE_CONNEXIONS_PERSISTANTES = ancien
+
+        self.stdout.write(f"\n{options['requetes']} pages ({', '.join(options['pages'])}), "
+                          f"{options['threads']} threads\n")
+        self.stdout.write(f"{'Mode':<26} {'Pages/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+        self.stdout.write("-" * 60)
+        for persistant, (debit, p50, p99) in resultats.items():
+            mode = 'connexions persistantes' if persistant else 'connexion par appel'
+            self.stdout.write(f"{mode:<26} {debit:>10.1f} {p50:>10.2f} {p99:>10.2f}")
+
+    def mesurer(self, selection, requetes, threads):
+        """Exécute les pages en parallèle, retourne (pages/s, p50 ms, p99 ms)"""
+        def executer(numero):
+            aleatoire = random.Random(numero)
+            page = selection[numero % len(selection)]
+            debut = time.perf_counter()
+            page(aleatoire)
+            return (time.perf_counter() - debut) * 1000
+
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executeur:
+            latences = list(executeur.map(executer, range(requetes)))
+        duree = time.perf_counter() - debut
+        p50, p99 = np.percentile(latences, [50, 99])
+        return requetes / duree, p50, p99
@@ -0,0 +1,480 @@
+"""
+conseiller_index
+================
+Conseiller d'index : exécute les requêtes Q1-Q8 de queries.py (suite de benchmark.py)
+et celles du service SQLite en notant leur SQL, puis lit leur plan (EXPLAIN QUERY PLAN)
+pour signaler parcours complets, B-trees temporaires, sous-requêtes corrélées et index
+automatiques. Il propose des index (simples, couvrants ou partiels) pour les tables en
+cause, mesure pour chacun le gain de latence des requêtes qui l'utilisent et sa taille,
+et affiche un rapport classé par gain, avec les index existants redondants.
+
+Chaque index candidat est créé dans une transaction annulée ensuite : la base n'est pas
+modifiée, mais elle doit être accessible en écriture (pas de SQLITE_IMMUTABLE).
+
+    python manage.py conseiller_index --iterations 5 --json conseil_index.json
+"""
+
+import json
+import re
+import sqlite3
+import sys
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from movies import sqlite_service as service
+
+# La suite Q1-Q8 est celle du benchmark de la phase 1
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scripts' / 'phase1_sqlite'))
+from benchmark import SUITE, libelle  # noqa: E402
+
+# Colonnes au plus d'un index couvrant proposé
+MAX_COLONNES_COUVRANT = 6
+# Un index qui rend une requête plus lente de plus de 10 % est signalé
+SEUIL_REGRESSION = 1.1
+# Gain retenu (au-delà du bruit de mesure) : 0,1 ms et 5 % du temps des requêtes concernées
+GAIN_MIN_MS = 0.1
+GAIN_MIN_RELATIF = 0.05
+
+RE_ACCES = re.compile(r"^(SCAN|SEARCH) (\S+)(?: USING (AUTOMATIC )?(?:COVERING )?INDEX ?(\w*)(?: \((.*)\))?)?")
+RE_TABLE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+RE_TRI = re.compile(r"\b(?:ORDER|GROUP|PARTITION)\s+BY\b(.*?)(?=\bLIMIT\b|\bHAVING\b|\bWINDOW\b|\bORDER\b|\)|$)",
+                    re.IGNORECASE | re.DOTALL)
+# Comparaison à une constante écrite dans la requête (pas à une expression)
+RE_LITTERAL = r"\s*(=|<>|!=|<=|>=|<|>)\s*('(?:[^']|'')*'|-?\d+(?:\.\d+)?)(?!\s*[-+*/|.(])"
+MOTS_CLES = {"on", "where", "join", "left", "inner", "cross", "natural", "outer", "group", "order",
+             "limit", "using", "union", "having", "window", "indexed", "not"}
+
+
+class Enregistreur:
+    """Note les requêtes SELECT exécutées (première occurrence de chaque texte SQL)"""
+
+    def __init__(self):
+        self.origine = None
+        self.requetes = {}
+
+    def noter(self, sql, parametres):
+        if not re.match(r"\s*(SELECT|WITH)\b", sql, re.IGNORECASE):
+            return
+        texte = " ".join(sql.split())
+        if texte not in self.requetes:
+            parametres = parametres if isinstance(parametres, dict) else tuple(parametres)
+            self.requetes[texte] = {'origine': self.origine, 'sql': sql, 'parametres': parametres}
+
+    def connexion(self, conn):
+        return _ConnexionEnregistree(conn, self)
+
+
+class _CurseurEnregistre:
+    def __init__(self, curseur, enregistreur):
+        self._curseur, self._enregistreur = curseur, enregistreur
+
+    def execute(self, sql, parametres=()):
+        self._enregistreur.noter(sql, parametres)
+        self._curseur.execute(sql, parametres)
+        return self
+
+    def __iter__(self):
+        return iter(self._curseur)
+
+    def __getattr__(self, nom):
+        return getattr(self._curseur, nom)
+
+
+class _ConnexionEnregistree:
+    """Délègue à une connexion SQLite en notant les requêtes de execute() et des curseurs"""
+
+    def __init__(self, conn, enregistreur):
+        self._conn, self._enregistreur = conn, enregistreur
+
+    def execute(self, sql, parametres=()):
+        self._enregistreur.noter(sql, parametres)
+        return self._conn.execute(sql, parametres)
+
+    def cursor(self):
+        return _CurseurEnregistre(self._conn.cursor(), self._enregistreur)
+
+    def __getattr__(self, nom):
+        return getattr(self._conn, nom)
+
+
+def appels_service(pid, mid, serie):
+    """Appels du service SQLite analysés : (origine, fonction sans argument)"""
+    appels = [
+        ("get_movies_list", lambda: service.get_movies_list()),
+        ("get_movies_list (filtres)", lambda: service.get_movies_list(genre="Drama", year_min=1990,
+                                                                      year_max=2010, rating_min=7)),
+        ("get_movies_list (titre, page 3)", lambda: service.get_movies_list(page=3, sort_by="title",
+                                                                            sort_order="asc")),
+        ("get_movies_list (année, fin)", lambda: service.get_movies_list(sort_by="year", last=True)),
+        ("get_top_rated_movies", service.get_top_rated_movies),
+        ("search_movies", lambda: service.search_movies("star")),
+        ("search_persons", lambda: service.search_persons("tom")),
+        ("get_movie_characters", lambda: service.get_movie_characters(mid)),
+        ("get_person_detail", lambda: service.get_person_detail(pid)),
+        ("get_person_filmography", lambda: service.get_person_filmography(pid)),
+        ("get_global_stats", service.get_global_stats),
+        ("get_all_genres", service.get_all_genres),
+        ("get_genre_stats", service.get_genre_stats),
+        ("get_movie_distributions", service.get_movie_distributions),
+        ("get_top_actors", service.get_top_actors),
+        ("get_sqlite_stats", service.get_sqlite_stats),
+    ]
+    if serie:
+        appels.append(("get_series_detail", lambda: service.get_series_detail(serie)))
+    return appels
+
+
+def alias_tables(sql, tables):
+    """Tables de la base citées par une requête : alias (en minuscules) -> nom de la table"""
+    alias = {}
+    for table, nom in RE_TABLE.findall(sql):
+        if table.lower() in tables:
+            nom = nom if nom and nom.lower() not in MOTS_CLES else table
+            alias[nom.lower()] = tables[table.lower()]
+    return alias
+
+
+def colonnes_citees(sql, alias, colonnes_table, sans_alias):
+    """
+    Colonnes d'une table citées par une requête, selon leur rôle.
+
+    Args:
+        alias: Alias de la table dans la requête
+        colonnes_table: Colonnes de la table
+        sans_alias: True si la requête ne cite que cette table (colonnes écrites sans alias)
+
+    Returns:
+        dict: filtre (= ou IN une valeur), jointure (= une autre colonne), intervalle (<, >, BETWEEN),
+              like, tri (ORDER BY / GROUP BY / PARTITION BY), autres : listes de colonnes dans l'ordre
+              du texte ; litteraux : (colonne, opérateur, littéral) pour les index partiels
+    """
+    noms = {c.lower(): c for c in colonnes_table}
+    motif = (rf"\b(?:{re.escape(alias)}\.)?(\w+)\b" if sans_alias
+             else rf"\b{re.escape(alias)}\.(\w+)\b")
+    roles = {role: [] for role in ('filtre', 'jointure', 'intervalle', 'like', 'tri', 'autres', 'litteraux')}
+    zones_tri = [m.span(1) for m in RE_TRI.finditer(sql)]
+
+    for m in re.finditer(motif, sql, re.IGNORECASE):
+        colonne = noms.get(m.group(1).lower())
+        if colonne is None or (sans_alias and sql[max(m.start() - 1, 0)] == "."):
+            continue
+        avant, apres = sql[:m.start()].rstrip(), sql[m.end():]
+        if any(debut <= m.start() < fin for debut, fin in zones_tri):
+            role = 'tri'
+        elif re.match(r"\s*=\s*\w+\.\w+", apres) or re.search(r"\w+\.\w+\s*=$", avant):
+            role = 'jointure'
+        elif re.match(r"\s*(=|IN\b)", apres, re.IGNORECASE) or re.search(r"(?<![<>!])=$", avant):
+            role = 'filtre'
+        elif re.match(r"\s*(<|>|BETWEEN\b)", apres, re.IGNORECASE) or re.search(r"[<>]=?$", avant):
+            role = 'intervalle'
+        elif re.match(r"\s*(NOT\s+)?LIKE\b", apres, re.IGNORECASE):
+            role = 'like'
+        else:
+            role = 'autres'
+        if colonne not in roles[role]:
+            roles[role].append(colonne)
+        litteral = re.match(RE_LITTERAL, apres)
+        if litteral and role in ('filtre', 'intervalle'):
+            roles['litteraux'].append((colonne, litteral.group(1), litteral.group(2)))
+    return roles
+
+
+def lire_plan(conn, requete):
+    """Lignes (détail) de EXPLAIN QUERY PLAN d'une requête notée"""
+    return [ligne[3] for ligne in conn.execute(f"EXPLAIN QUERY PLAN {requete['sql']}", requete['parametres'])]
+
+
+def problemes_plan(plan, alias, requete):
+    """
+    Problèmes signalés par le plan d'une requête.
+
+    Returns:
+        list: (nature, alias ou None, précision) : parcours complet d'une table, index automatique,
+              B-tree temporaire, sous-requête corrélée, LIKE sans préfixe
+    """
+    problemes = []
+    for detail in plan:
+        acces = RE_ACCES.match(detail)
+        if acces and acces.group(2).lower() in alias:
+            nom = acces.group(2).lower()
+            if acces.group(3):
+                problemes.append(("index automatique", nom, f"{alias[nom]} ({acces.group(5)})"))
+            elif acces.group(1) == "SCAN":
+                index = f", index {acces.group(4)}" if acces.group(4) else ""
+                problemes.append(("parcours complet", nom, f"{alias[nom]}{index}"))
+        elif detail.startswith("USE TEMP B-TREE"):
+            problemes.append(("B-tree temporaire", None, detail[len("USE TEMP B-TREE FOR "):]))
+        elif detail.startswith("CORRELATED"):
+            problemes.append(("sous-requête corrélée", None, detail.lower()))
+    parametres = requete['parametres'].values() if isinstance(requete['parametres'], dict) \
+        else requete['parametres']
+    if re.search(r"\bLIKE\s+'%", requete['sql'], re.IGNORECASE) or (
+            re.search(r"\bLIKE\b", requete['sql'], re.IGNORECASE)
+            and any(isinstance(p, str) and p.startswith("%") for p in parametres)):
+        problemes.append(("LIKE sans préfixe", None, "aucun index utilisable (recherche plein texte FTS5)"))
+    return problemes
+
+
+def index_existants(conn, tables):
+    """Index des tables : nom -> {table, colonnes, unique, partiel}"""
+    index = {}
+    for table in tables.values():
+        for _, nom, unique, _, partiel in conn.execute(f'PRAGMA index_list("{table}")'):
+            colonnes = tuple(ligne[2] for ligne in conn.execute(f'PRAGMA index_info("{nom}")'))
+            index[nom] = {'table': table, 'colonnes': colonnes, 'unique': bool(unique), 'partiel': bool(partiel)}
+    return index
+
+
+def index_redondants(index):
+    """Index non uniques dont les colonnes sont un préfixe d'un autre index : [(nom, nom de l'autre)]"""
+    redondants = []
+    for nom, spec in sorted(index.items()):
+        if spec['unique'] or spec['partiel']:
+            continue
+        for autre, spec_autre in sorted(index.items()):
+            if autre == nom or spec_autre['table'] != spec['table'] or spec_autre['partiel']:
+                continue
+            prefixe = spec_autre['colonnes'][:len(spec['colonnes'])] == spec['colonnes']
+            # Deux index identiques non uniques : on ne signale que le second
+            identique = spec_autre['colonnes'] == spec['colonnes'] and not spec_autre['unique']
+            if prefixe and (not identique or autre < nom):
+                redondants.append((nom, autre))
+                break
+    return redondants
+
+
+def candidats_requete(requete, problemes, alias, colonnes_tables):
+    """
+    Index proposés pour les tables d'une requête dont le plan a un problème
+    (tables en cause d'abord : parcourues ou servies par un index automatique).
+
+    Returns:
+        list: (table, colonnes, condition WHERE ou None, raison)
+    """
+    propositions = []
+    if not problemes:
+        return propositions
+    temp_btree = any(nature == "B-tree temporaire" for nature, _, _ in problemes)
+    en_cause = {nom for nature, nom, _ in problemes if nom}
+    for nom in sorted(alias, key=lambda n: n not in en_cause):
+        table = alias[nom]
+        roles = colonnes_citees(requete['sql'], nom, colonnes_tables[table], len(alias) == 1)
+        for nature, alias_probleme, precision in problemes:
+            if nature == "index automatique" and alias_probleme == nom:
+                colonnes = tuple(re.findall(r"(\w+)\s*[=<>]", precision.split("(", 1)[1]))
+                propositions.append((table, colonnes, None, "remplace l'index automatique"))
+
+        filtre = tuple(roles['filtre']) + tuple(roles['intervalle'][:1])
+        cles = [(filtre, "colonnes filtrées")] if filtre else []
+        cles += [((colonne,) + filtre, "jointure") for colonne in roles['jointure']]
+        if roles['like']:
+            # Le motif ne peut pas être cherché : parcourir un index plus petit que la table
+            cles.append((tuple(roles['like']) + tuple(roles['jointure']), "parcours du LIKE"))
+        # Le tri ne peut être servi par un index que si la table est la seule ou celle parcourue
+        if temp_btree and roles['tri'] and (len(alias) == 1 or nom in en_cause):
+            cles.append((tuple(roles['filtre']) + tuple(c for c in roles['tri'] if c not in roles['filtre']),
+                         "évite le B-tree temporaire"))
+
+        citees = list(dict.fromkeys(c for role in ('filtre', 'jointure', 'intervalle', 'like', 'tri', 'autres')
+                                    for c in roles[role]))
+        for cle, raison in cles:
+            cle = tuple(dict.fromkeys(cle))
+            propositions.append((table, cle, None, raison))
+            couvrant = cle + tuple(c for c in citees if c not in cle)
+            if len(cle) < len(couvrant) <= MAX_COLONNES_COUVRANT:
+                propositions.append((table, couvrant, None, f"{raison}, index couvrant"))
+        for colonne, operateur, litteral in roles['litteraux']:
+            cle = tuple(c for c in roles['jointure'] + roles['filtre'] + roles['intervalle'] + roles['tri']
+                        if c != colonne)
+            if cle:
+                propositions.append((table, tuple(dict.fromkeys(cle)), f"{colonne} {operateur} {litteral}",
+                                     "index partiel sur une condition constante"))
+    return propositions
+
+
+class Command(BaseCommand):
+    help = "Analyse les plans des requêtes et propose des index classés par gain mesuré"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sources', nargs='+', choices=['queries', 'service'], default=['queries', 'service'],
+                            help='Requêtes analysées : Q1-Q8 de queries.py, service SQLite de l\'application')
+        parser.add_argument('--iterations', type=int, default=5, help='Exécutions mesurées par requête')
+        parser.add_argument('--max-candidats', type=int, default=40, help='Index candidats mesurés au plus')
+        parser.add_argument('--json', help='Fichier JSON du rapport')
+
+    def handle(self, *args, **options):
+        db_path = str(settings.DATABASES['imdb']['NAME'])
+        if getattr(settings, 'SQLITE_IMMUTABLE', False):
+            raise CommandError("SQLITE_IMMUTABLE : les index candidats ne peuvent pas être créés sur cette base")
+        requetes = self.noter_requetes(db_path, options['sources'])
+
+        # Mêmes réglages que les connexions du service ; transactions gérées à la main
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute(f"PRAGMA mmap_size = {int(getattr(settings, 'SQLITE_MMAP_MO', 256)) * 1024 * 1024}")
+        conn.execute(f"PRAGMA cache_size = -{int(getattr(settings, 'SQLITE_CACHE_MO', 64)) * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        service.fts_disponible(conn)
+        tables = {nom.lower(): nom for (nom,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'")}
+        colonnes_tables = {t: [c[1] for c in conn.execute(f'PRAGMA table_info("{t}")')] for t in tables.values()}
+        index = index_existants(conn, tables)
+
+        # Plans, problèmes et latence de référence de chaque requête
+        propositions = {}
+        for requete in requetes:
+            requete['alias'] = alias_tables(requete['sql'], tables)
+            requete['plan'] = lire_plan(conn, requete)
+            requete['problemes'] = problemes_plan(requete['plan'], requete['alias'], requete)
+            requete['p50_ms'] = self.mesurer(conn, requete, options['iterations'])
+            for table, colonnes, condition, raison in candidats_requete(
+                    requete, requete['problemes'], requete['alias'], colonnes_tables):
+                propositions.setdefault((table, colonnes, condition), raison)
+
+        candidats = self.filtrer(propositions, index)[:options['max_candidats']]
+        self.stdout.write(f"{len(requetes)} requêtes analysées, {len(candidats)} index candidats "
+                          f"({options['iterations']} exécutions mesurées par requête)")
+        for candidat in candidats:
+            self.evaluer(conn, candidat, requetes, options['iterations'])
+        conn.close()
+
+        utilises = {nom for requete in requetes for detail in requete['plan']
+                    for nom in re.findall(r"INDEX (\w+)", detail)}
+        rapport = {
+            'requetes': [{cle: requete[cle] for cle in ('origine', 'sql', 'plan', 'problemes', 'p50_ms')}
+                         for requete in requetes],
+            'candidats': sorted(candidats, key=lambda c: -c['gain_ms']),
+            'redondants': index_redondants(index),
+            'non_utilises': sorted(nom for nom, spec in index.items()
+                                   if nom not in utilises and not spec['unique']),
+        }
+        self.afficher(rapport)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(rapport, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"\nRapport JSON : {options['json']}")
+
+    def noter_requetes(self, db_path, sources):
+        """Exécute les requêtes des sources choisies en notant leur SQL et leurs paramètres"""
+        enregistreur = Enregistreur()
+        if 'queries' in sources:
+            conn = enregistreur.connexion(sqlite3.connect(db_path))
+            for nom, fonction, jeux in SUITE:
+                for parametres in jeux:
+                    enregistreur.origine = libelle(nom, parametres)
+                    fonction(conn, *parametres)
+            conn.close()
+        if 'service' in sources:
+            conn = sqlite3.connect(db_path)
+            pid = conn.execute("SELECT pid FROM principals LIMIT 1").fetchone()
+            mid = conn.execute("SELECT mid FROM movies LIMIT 1").fetchone()
+            serie = conn.execute("SELECT parentMid FROM episodes LIMIT 1").fetchone()
+            conn.close()
+            pid, mid, serie = (valeur[0] if valeur else None for valeur in (pid, mid, serie))
+            if settings.IMDB_COMPACT_KEYS:
+                pid, mid = service.pid_texte(pid), service.mid_texte(mid)
+                serie = service.mid_texte(serie) if serie is not None else None
+
+            connexion_service = service.get_sqlite_connection
+            service.get_sqlite_connection = lambda: enregistreur.connexion(connexion_service())
+            try:
+                for origine, appel in appels_service(pid, mid, serie):
+                    enregistreur.origine = origine
+                    appel()
+            finally:
+                service.get_sqlite_connection = connexion_service
+        return list(enregistreur.requetes.values())
+
+    def mesurer(self, conn, requete, iterations):
+        """p50 en ms de la requête (après une exécution d'échauffement)"""
+        conn.execute(requete['sql'], requete['parametres']).fetchall()
+        temps = []
+        for _ in range(iterations):
+            debut = time.perf_counter()
+            conn.execute(requete['sql'], requete['parametres']).fetchall()
+            temps.append((time.perf_counter() - debut) * 1000)
+        return float(np.percentile(temps, 50))
+
+    def filtrer(self, propositions, index):
+        """Candidats sans doublon, hors index existants (ou préfixes d'un index existant)"""
+        candidats, noms = [], set(index)
+        for (table, colonnes, condition), raison in propositions.items():
+            if not condition and any(spec['table'] == table and not spec['partiel']
+                                     and spec['colonnes'][:len(colonnes)] == colonnes
+                                     for spec in index.values()):
+                continue
+            nom = base = f"idx_{table}_{'_'.join(colonnes)}" + ("_partiel" if condition else "")
+            suffixe = 2
+            while nom in noms:
+                nom, suffixe = f"{base}_{suffixe}", suffixe + 1
+            noms.add(nom)
+            ddl = f"CREATE INDEX {nom} ON {table}({', '.join(colonnes)})" + (f" WHERE {condition}" if condition else "")
+            candidats.append({'nom': nom, 'table': table, 'ddl': ddl, 'raison': raison})
+        return candidats
+
+    def evaluer(self, conn, candidat, requetes, iterations):
+        """Crée l'index dans une transaction annulée : taille, requêtes qui l'utilisent et leur latence"""
+        taille_page = conn.execute("PRAGMA page_size").fetchone()[0]
+        candidat.update(octets=0, creation_s=0.0, gain_ms=0.0, requetes=[], regression=False, retenu=False)
+        conn.execute("BEGIN")
+        try:
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            debut = time.perf_counter()
+            conn.execute(candidat['ddl'])
+            candidat['creation_s'] = time.perf_counter() - debut
+            candidat['octets'] = (conn.execute("PRAGMA page_count").fetchone()[0] - pages) * taille_page
+            for requete in requetes:
+                if candidat['table'] not in requete['alias'].values():
+                    continue
+                if not any(candidat['nom'] in detail for detail in lire_plan(conn, requete)):
+                    continue
+                p50 = self.mesurer(conn, requete, iterations)
+                candidat['requetes'].append({'origine': requete['origine'], 'avant_ms': requete['p50_ms'],
+                                             'apres_ms': p50})
+                candidat['gain_ms'] += requete['p50_ms'] - p50
+                candidat['regression'] |= p50 > requete['p50_ms'] * SEUIL_REGRESSION
+            avant = sum(effet['avant_ms'] for effet in candidat['requetes'])
+            candidat['retenu'] = candidat['gain_ms'] >= max(GAIN_MIN_MS, GAIN_MIN_RELATIF * avant)
+        except sqlite3.Error as e:
+            candidat['erreur'] = str(e)
+        finally:
+            conn.execute("ROLLBACK")
+
+    def afficher(self, rapport):
+        """Rapport : problèmes par requête, index candidats classés, index redondants ou inutilisés"""
+        self.stdout.write("\nProblèmes détectés dans les plans")
+        self.stdout.write("-" * 100)
+        for requete in rapport['requetes']:
+            for nature, _, precision in requete['problemes']:
+                self.stdout.write(f"{requete['origine'][:44]:<45} {requete['p50_ms']:>9.2f} ms  "
+                                  f"{nature} : {precision}")
+
+        self.stdout.write("\nIndex candidats (classés par gain total mesuré)")
+        self.stdout.write(f"{'Rang':<5} {'Gain (ms)':>10} {'Taille (Mo)':>12} {'ms/Mo':>9} "
+                          f"{'Création (s)':>13}  Index")
+        self.stdout.write("-" * 100)
+        retenus = [candidat for candidat in rapport['candidats'] if candidat['retenu']]
+        for rang, candidat in enumerate(retenus, 1):
+            mo = candidat['octets'] / (1024 * 1024)
+            self.stdout.write(f"{rang:<5} {candidat['gain_ms']:>10.2f} {mo:>12.2f} "
+                              f"{candidat['gain_ms'] / max(mo, 0.01):>9.1f} {candidat['creation_s']:>13.2f}  "
+                              f"{candidat['ddl']}")
+            self.stdout.write(f"{'':<53}{candidat['raison']}" + (" (régression sur une requête)"
+                                                                  if candidat['regression'] else ""))
+            for effet in candidat['requetes']:
+                self.stdout.write(f"{'':<55}{effet['origine'][:40]:<41} "
+                                  f"{effet['avant_ms']:>9.2f} → {effet['apres_ms']:.2f} ms")
+        if len(retenus) < len(rapport['candidats']):
+            self.stdout.write(f"{len(rapport['candidats']) - len(retenus)} candidat(s) sans gain mesurable "
+                              f"(inutilisés par SQLite, ou gain sous {GAIN_MIN_MS} ms / {GAIN_MIN_RELATIF:.0%})")
+
+        self.stdout.write("\nIndex existants redondants (préfixe d'un autre index)")
+        for nom, autre in rapport['redondants']:
+            self.stdout.write(f"  {nom} → couvert par {autre}")
+        if not rapport['redondants']:
+            self.stdout.write("  aucun")
+        self.stdout.write("\nIndex non utilisés par les requêtes analysées "
+                          "(peuvent servir aux clés étrangères ou à d'autres requêtes)")
+        self.stdout.write("  " + (", ".join(rapport['non_utilises']) or "aucun"))
@@ -0,0 +1,61 @@
+"""
+construire_graphe
+=================
+Construit le graphe des collaborations (movies/graphe_service.py) depuis imdb.db
+dans GRAPHE_DOSSIER, affiche le temps de construction, la taille des tableaux et
+la mémoire maximale du processus, puis mesure la latence des requêtes
+(p50 / p99 des degrés de séparation, du voisinage à 2 collaborations et des
+principaux collaborateurs, sur des personnes tirées au hasard).
+
+    python manage.py construire_graphe --mesurer 500
+"""
+
+import random
+import resource
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movies.graphe_service import GrapheCollaborations, construire_graphe
+
+
+class Command(BaseCommand):
+    help = "Construit le graphe des collaborations et mesure sa latence"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mesurer', type=int, default=200,
+                            help='Requêtes mesurées par type après la construction (0 : aucune)')
+
+    def handle(self, *args, **options):
+        meta = construire_graphe(str(settings.DATABASES['imdb']['NAME']), str(settings.GRAPHE_DOSSIER))
+        self.stdout.write(f"Graphe construit dans {settings.GRAPHE_DOSSIER}/{meta['version']}")
+        self.stdout.write(f"  {meta['personnes']:,} personnes, {meta['films']:,} films, {meta['liens']:,} liens")
+        self.stdout.write(f"  {meta['octets'] / (1024 * 1024):.1f} Mo sur disque")
+        for phase, duree in meta['durees_s'].items():
+            self.stdout.write(f"  {phase:<10} : {duree:>7.2f}s")
+        # ru_maxrss est en Ko sous Linux
+        self.stdout.write(f"  mémoire maximale du processus : "
+                          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mo")
+
+        if not options['mesurer'] or meta['personnes'] < 2:
+            return
+        graphe = GrapheCollaborations(settings.GRAPHE_DOSSIER)
+        aleatoire = random.Random(42)
+        requetes = {
+            'Degrés de séparation': lambda: graphe.chemin(*aleatoire.sample(range(graphe.nb_personnes), 2)),
+            'Voisinage (k=2)': lambda: graphe.voisinage(aleatoire.randrange(graphe.nb_personnes), 2),
+            'Collaborateurs (n=10)': lambda: graphe.collaborateurs(aleatoire.randrange(graphe.nb_personnes), 10),
+        }
+        self.stdout.write(f"\n{options['mesurer']} requêtes par type")
+        self.stdout.write(f"{'Requête':<24} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+        self.stdout.write("-" * 57)
+        for nom, requete in requetes.items():
+            latences = []
+            for _ in range(options['mesurer']):
+                debut = time.perf_counter()
+                requete()
+                latences.append((time.perf_counter() - debut) * 1000)
+            p50, p99 = np.percentile(latences, [50, 99])
+            self.stdout.write(f"{nom:<24} {p50:>10.2f} {p99:>10.2f} {max(latences):>10.2f}")
@@ -0,0 +1,54 @@
+"""
+construire_recommandations
+==========================
+Construit le modèle de recommandation (movies/recommandation_service.py) depuis imdb.db
+dans RECOMMANDATIONS_DOSSIER, puis mesure la latence des recommandations
+(p50 / p99 sur des listes de 1 à 3 films aimés tirés parmi les films notés).
+
+    python manage.py construire_recommandations --votes-min 100 --mesurer 2000
+"""
+
+import random
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movies.recommandation_service import ModeleRecommandation, construire_modele
+
+
+class Command(BaseCommand):
+    help = "Construit le modèle de recommandation par le contenu et mesure sa latence"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes-min', type=int, default=settings.RECOMMANDATIONS_VOTES_MIN,
+                            help='Votes minimum d\'un film pour être recommandé')
+        parser.add_argument('--mesurer', type=int, default=1000,
+                            help='Requêtes de recommandation mesurées après la construction (0 : aucune)')
+        parser.add_argument('--n', type=int, default=10, help='Recommandations par requête')
+
+    def handle(self, *args, **options):
+        meta = construire_modele(str(settings.DATABASES['imdb']['NAME']),
+                                 str(settings.RECOMMANDATIONS_DOSSIER), options['votes_min'])
+        self.stdout.write(f"Modèle construit dans {settings.RECOMMANDATIONS_DOSSIER}/{meta['version']}")
+        self.stdout.write(f"  {meta['films']:,} films ({meta['recommandables']:,} recommandables), "
+                          f"{meta['caracteristiques']:,} caractéristiques, {meta['valeurs']:,} valeurs non nulles")
+        self.stdout.write(f"  {meta['octets'] / (1024 * 1024):.1f} Mo sur disque")
+        for phase, duree in meta['durees_s'].items():
+            self.stdout.write(f"  {phase:<10} : {duree:>7.2f}s")
+
+        if not options['mesurer'] or not meta['recommandables']:
+            return
+        modele = ModeleRecommandation(settings.RECOMMANDATIONS_DOSSIER)
+        aleatoire = random.Random(42)
+        films = [modele.film(int(i))['id'] for i in modele.recommandables]
+        latences = []
+        for _ in range(options['mesurer']):
+            aimes = aleatoire.sample(films, min(len(films), aleatoire.randint(1, 3)))
+            debut = time.perf_counter()
+            modele.recommander(aimes, options['n'])
+            latences.append((time.perf_counter() - debut) * 1000)
+        p50, p99 = np.percentile(latences, [50, 99])
+        self.stdout.write(f"\n{options['mesurer']} requêtes (1 à 3 films aimés, {options['n']} recommandations) : "
+                          f"p50 {p50:.2f} ms, p99 {p99:.2f} ms")
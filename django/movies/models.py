@@ -145,3 +145,15 @@ class KnownForMovie(models.Model):
         app_label = 'movies'
         managed = False
         unique_together = (('pid', 'mid'),)
+
+
+class Episode(models.Model):
+    mid = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True, db_column='mid', related_name='episode')
+    parentMid = models.ForeignKey(Movie, on_delete=models.CASCADE, db_column='parentMid', related_name='episodes')
+    seasonNumber = models.IntegerField(null=True, blank=True)
+    episodeNumber = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'episodes'
+        app_label = 'movies'
+        managed = False
@@ -0,0 +1,170 @@
+"""
+mongo_async.py
+==============
+Version asynchrone des lectures MongoDB des pages accueil et détail de film,
+pour les vues asynchrones servies en ASGI (config/asgi.py).
+
+Client : pymongo.AsyncMongoClient (driver asynchrone officiel, qui remplace Motor),
+un par boucle d'événements (un seul sous uvicorn). Les requêtes sont celles de
+mongo_service.py (filtres, projections et mises en forme partagés).
+Un membre lent du replica set ne bloque plus un thread : la boucle continue de
+servir les autres requêtes pendant l'attente.
+"""
+
+import asyncio
+import logging
+import weakref
+
+from django.conf import settings
+from pymongo import AsyncMongoClient
+from pymongo.errors import PyMongoError
+
+from .chargement_parallele import en_thread
+from .mongo_service import (
+    compteurs_pool_async,
+    get_cache_films,
+    renommer_id,
+    verifier_personnages,
+    film_simple,
+    filtre_similaires,
+    pipeline_aleatoires,
+    PROJECTION_FILM,
+    FILTRE_TOP_FILMS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Client asynchrone par boucle d'événements (un client est lié à la boucle qui l'utilise)
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Client MongoDB asynchrone de la boucle courante, créé au premier appel
+    avec les mêmes options que le client synchrone (MONGODB_CLIENT_OPTIONS) ;
+    son pool est compté à part (compteurs_pool_async, clé "async" de get_pool_stats).
+
+    Returns:
+        AsyncMongoClient: Client de la boucle d'événements en cours
+    """
+    boucle = asyncio.get_running_loop()
+    client = _clients.get(boucle)
+    if client is None:
+        options = getattr(settings, 'MONGODB_CLIENT_OPTIONS', {})
+        client = AsyncMongoClient(settings.MONGODB_URI, event_listeners=[compteurs_pool_async], **options)
+        _clients[boucle] = client
+    return client
+
+
+def get_async_db():
+    """Base cineexplorer via le client asynchrone de la boucle courante"""
+    return get_async_client()[settings.MONGODB_NAME]
+
+
+async def lire_avec_cache_async(cle, chargement):
+    """
+    Version asynchrone de mongo_service.lire_avec_cache (même cache des films) :
+    le cache partagé, synchrone dans Django, est lu et écrit dans le pool de threads.
+
+    Args:
+        cle: Tuple (type, movie_id, ...)
+        chargement: Fonction sans argument retournant la coroutine de lecture MongoDB
+    """
+    cache = get_cache_films()
+    if cache is None:
+        return await chargement()
+    if cache.verification_due():
+        try:
+            document = await get_async_db()['migration_meta'].find_one({'_id': 'generation'}, {'valeur': 1})
+            cache.definir_generation(document['valeur'] if document else None)
+        except PyMongoError as erreur:
+            logger.warning("Génération de migration illisible : %s", erreur)
+    trouve, valeur = cache.lire(cle, partage=False)
+    if not trouve and cache.backend is not None:
+        trouve, valeur = await en_thread(cache.lire_partage, cle)
+    if trouve:
+        return valeur
+    valeur = await chargement()
+    donnees = cache.ecrire(cle, valeur, partage=False)
+    if cache.backend is not None:
+        await en_thread(cache.ecrire_partage, cle, donnees)
+    return valeur
+
+
+async def _lire_detail_async(movie_id):
+    """Document du film dans movies_complete, sinon dans movies (format réduit), sinon None"""
+    db = get_async_db()
+    movie = await db['movies_complete'].find_one({'_id': movie_id})
+    if movie:
+        return renommer_id(movie)
+
+    # Si pas trouvé dans movies_complete, essayer la collection movies simple
+    movie = await db['movies'].find_one({'mid': movie_id})
+    return film_simple(movie) if movie else None
+
+
+async def get_movie_detail_async(movie_id):
+    """
+    Détails complets d'un film (movies_complete), en une lecture gardée dans le cache des films.
+    Avec MONGO_VERIFIER_PERSONNAGES, les personnages SQLite sont lus en même temps et comparés.
+
+    Args:
+        movie_id: L'identifiant du film (ex: 'tt0000177')
+
+    Returns:
+        dict: Document complet du film ou None si non trouvé
+    """
+    from .sqlite_service import get_movie_characters
+    lecture = lire_avec_cache_async(('detail', movie_id), lambda: _lire_detail_async(movie_id))
+
+    if getattr(settings, 'MONGO_VERIFIER_PERSONNAGES', False):
+        movie, characters_map = await asyncio.gather(
+            lecture,
+            # SQLite n'a pas d'API asynchrone : lecture dans un thread (connexion du thread réutilisée)
+            en_thread(get_movie_characters, movie_id),
+        )
+        return verifier_personnages(movie, characters_map) if movie else None
+    return await lecture
+
+
+async def get_similar_movies_async(movie_id, genres, limit=6):
+    """
+    Films similaires (au moins un genre en commun), les mieux notés d'abord.
+
+    Returns:
+        list: Liste de films similaires
+    """
+    if not genres:
+        return []
+
+    async def chargement():
+        curseur = get_async_db()['movies_complete'].find(
+            filtre_similaires(movie_id, genres), PROJECTION_FILM
+        ).sort('rating.average', -1).limit(limit)
+        return [renommer_id(movie) async for movie in curseur]
+
+    return await lire_avec_cache_async(('similaires', movie_id, limit), chargement)
+
+
+async def get_top_movies_async(limit=10):
+    """
+    Films les mieux notés (minimum de votes), par note décroissante.
+
+    Returns:
+        list: Liste des top films
+    """
+    curseur = get_async_db()['movies_complete'].find(
+        FILTRE_TOP_FILMS, dict(PROJECTION_FILM, directors=1)
+    ).sort('rating.average', -1).limit(limit)
+    return [renommer_id(movie) async for movie in curseur]
+
+
+async def get_random_movies_async(limit=6):
+    """
+    Films aléatoires notés ($sample).
+
+    Returns:
+        list: Liste de films aléatoires
+    """
+    curseur = await get_async_db()['movies_complete'].aggregate(pipeline_aleatoires(limit))
+    return [renommer_id(movie) async for movie in curseur]
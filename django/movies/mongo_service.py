@@ -5,105 +5,601 @@ Service pour interagir avec la base MongoDB.
 Utilisé principalement pour les détails de films (collection movies_complete).
 """
 
-from pymongo import MongoClient
+from collections import OrderedDict
+
+import bson
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
 from django.conf import settings
+from django.core.cache import caches
+import atexit
+import contextvars
+import logging
+import os
 import random as random_module
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Client unique du processus (son pool de connexions est partagé par toutes les requêtes)
+_client = None
+_client_pid = None
+_verrou_client = threading.Lock()
+
+# Dernières statistiques MongoDB (instant du calcul, valeur), gardées STATS_MONGO_TTL_S secondes
+_cache_stats_mongo = (0.0, None)
+
+# Au-delà de ce délai, un checkout est compté comme une attente (pool saturé ou nouvelle connexion)
+SEUIL_ATTENTE_MS = 1.0
+
+
+class CompteursPool(monitoring.ConnectionPoolListener):
+    """
+    Compteurs du pool de connexions (checkouts, attentes, connexions ouvertes),
+    alimentés par les événements CMAP de pymongo.
+    Le début du checkout est gardé dans une ContextVar : propre à chaque thread (client
+    synchrone) et à chaque tâche asyncio (client asynchrone, coroutines sur un même thread).
+    """
+
+    def __init__(self, nom='sync'):
+        self._verrou = threading.Lock()
+        self._debut = contextvars.ContextVar(f'debut_checkout_{nom}', default=None)
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        with self._verrou:
+            self.compteurs = {
+                'checkouts': 0,
+                'checkouts_echoues': 0,
+                'attentes': 0,
+                'temps_attente_total_ms': 0.0,
+                'temps_attente_max_ms': 0.0,
+                'en_cours': 0,
+                'en_cours_max': 0,
+                'connexions_creees': 0,
+                'connexions_fermees': 0,
+                'pools_vides': 0,
+            }
+
+    def instantane(self):
+        """Copie des compteurs, cohérente (prise sous le verrou)"""
+        with self._verrou:
+            return dict(self.compteurs)
+
+    def _incrementer(self, **valeurs):
+        with self._verrou:
+            for cle, valeur in valeurs.items():
+                self.compteurs[cle] += valeur
+
+    def _duree_ms(self):
+        debut = self._debut.get()
+        return (time.perf_counter() - debut) * 1000 if debut is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._debut.set(time.perf_counter())
+
+    def connection_checked_out(self, event):
+        duree = self._duree_ms()
+        with self._verrou:
+            c = self.compteurs
+            c['checkouts'] += 1
+            c['en_cours'] += 1
+            c['en_cours_max'] = max(c['en_cours_max'], c['en_cours'])
+            if duree > SEUIL_ATTENTE_MS:
+                c['attentes'] += 1
+                c['temps_attente_total_ms'] += duree
+                c['temps_attente_max_ms'] = max(c['temps_attente_max_ms'], duree)
+
+    def connection_check_out_failed(self, event):
+        self._incrementer(checkouts_echoues=1)
+
+    def connection_checked_in(self, event):
+        self._incrementer(en_cours=-1)
+
+    def connection_created(self, event):
+        self._incrementer(connexions_creees=1)
+
+    def connection_closed(self, event):
+        self._incrementer(connexions_fermees=1)
+
+    def pool_cleared(self, event):
+        self._incrementer(pools_vides=1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+compteurs_pool = CompteursPool()
+# Pool des clients asynchrones (mongo_async.py), compté à part
+compteurs_pool_async = CompteursPool('async')
+
+
+def _oublier_client():
+    """Après un fork, l'enfant ne doit pas réutiliser les sockets du parent : nouveau client à la demande"""
+    global _client, _client_pid
+    _client, _client_pid = None, None
+    compteurs_pool.reinitialiser()
+    compteurs_pool_async.reinitialiser()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_oublier_client)
+
+
+def _fermer_client():
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+
+
+atexit.register(_fermer_client)
+
+
+def get_mongo_client():
+    """
+    Client MongoDB partagé par tout le processus, créé au premier appel.
+    Taille du pool, timeouts et préférence de lecture viennent de settings.MONGODB_CLIENT_OPTIONS.
+    Recréé dans un processus enfant après un fork (workers gunicorn, multiprocessing).
+    
+    Returns:
+        MongoClient: Client (thread-safe) du processus courant
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _verrou_client:
+        if _client is None or _client_pid != pid:
+            options = getattr(settings, 'MONGODB_CLIENT_OPTIONS', {})
+            _client = MongoClient(settings.MONGODB_URI, event_listeners=[compteurs_pool], **options)
+            _client_pid = pid
+        return _client
 
 
 def get_mongo_connection():
     """
-    Établit la connexion MongoDB vers le replica set.
-    Retourne l'objet database.
+    Retourne l'objet database du replica set (client partagé du processus).
     """
-    client = MongoClient(settings.MONGODB_URI)
-    db = client[settings.MONGODB_NAME]
-    return db
+    return get_mongo_client()[settings.MONGODB_NAME]
+
+
+def get_pool_stats():
+    """
+    Compteurs du pool de connexions MongoDB du processus (pour la supervision).
+    Ceux des clients asynchrones (vues ASGI) sont sous la clé 'async'.
+    
+    Returns:
+        dict: Compteurs de checkouts / attentes / connexions et options du pool
+    """
+    def arrondir(stats):
+        stats['temps_attente_total_ms'] = round(stats['temps_attente_total_ms'], 2)
+        stats['temps_attente_max_ms'] = round(stats['temps_attente_max_ms'], 2)
+        return stats
+
+    stats = arrondir(compteurs_pool.instantane())
+    stats['async'] = arrondir(compteurs_pool_async.instantane())
+    stats['pid'] = os.getpid()
+    stats['client_actif'] = _client is not None and _client_pid == os.getpid()
+    stats['options'] = getattr(settings, 'MONGODB_CLIENT_OPTIONS', {})
+    return stats
 
 
 def get_mongo_stats():
     """
     Récupère les statistiques globales de la base MongoDB.
     Retourne le nombre de collections, documents par collection, et taille totale.
+    Les comptages viennent des métadonnées des collections (estimated_document_count,
+    sans parcours) et le résultat est gardé STATS_MONGO_TTL_S secondes.
     """
+    global _cache_stats_mongo
+    calcule_a, resultat = _cache_stats_mongo
+    if resultat is not None and time.monotonic() - calcule_a < getattr(settings, 'STATS_MONGO_TTL_S', 300):
+        return resultat
+    
     db = get_mongo_connection()
     collections = db.list_collection_names()
     
     # Nombre de documents par collection
     collection_counts = {}
     for collection in collections:
-        collection_counts[collection] = db[collection].count_documents({})
+        collection_counts[collection] = db[collection].estimated_document_count()
     
     # Taille totale de la base
     stats = db.command('dbStats')
     db_size_mb = stats.get('dataSize', 0) / (1024 * 1024)  # en MB
     
     # Statistiques supplémentaires pour la page d'accueil
-    movies_count = db['movies'].count_documents({})
-    persons_count = db['persons'].count_documents({})
-    directors_count = db['directors'].count_documents({})
-    
-    return {
+    resultat = {
         'collections': collections,
         'collection_counts': collection_counts,
         'total_size_mb': round(db_size_mb, 2),
-        'movies_count': movies_count,
-        'persons_count': persons_count,
-        'directors_count': directors_count
+        'movies_count': collection_counts.get('movies', 0),
+        'persons_count': collection_counts.get('persons', 0),
+        'directors_count': collection_counts.get('directors', 0)
     }
+    _cache_stats_mongo = (time.monotonic(), resultat)
+    return resultat
 
 
-def get_movie_detail_mongo(movie_id):
+class CacheFilms:
     """
-    Récupère les détails complets d'un film depuis la collection movies_complete.
-    Cette collection contient les données dénormalisées (cast, directors, etc.).
-    Enrichit les personnages avec les données de SQLite (plus fiables).
-    
+    Cache de lecture des documents de films (détail, films similaires) du processus :
+    LRU borné en octets (CACHE_FILMS_MAX_OCTETS) avec durée de vie (CACHE_FILMS_TTL_S),
+    et second niveau optionnel partagé entre processus (cache Django CACHE_FILMS_BACKEND).
+
+    Les valeurs sont gardées encodées en BSON : la taille d'une entrée est celle de son
+    encodage et chaque lecture retourne une copie, que la vue peut modifier sans risque.
+    Les clés sont des tuples (type, movie_id, ...). Le cache est vidé quand la génération
+    de migration (document "generation" de la collection migration_meta) change.
+    """
+
+    def __init__(self, max_octets, ttl_s, intervalle_verification_s, backend=None):
+        self.max_octets = max_octets
+        self.ttl_s = ttl_s
+        self.intervalle_verification_s = intervalle_verification_s
+        self.backend = backend
+        self.generation = None
+        self._verifie_a = None
+        self._entrees = OrderedDict()  # clé -> (expiration, valeur encodée)
+        self._octets = 0
+        self._verrou = threading.Lock()
+        self.reinitialiser_compteurs()
+
+    def reinitialiser_compteurs(self):
+        with self._verrou:
+            self.compteurs = {
+                'hits': 0,
+                'hits_partages': 0,
+                'misses': 0,
+                'evictions': 0,
+                'expirations': 0,
+                'invalidations': 0,
+            }
+
+    def _cle_partagee(self, cle):
+        # La génération fait partie de la clé : une migration rend obsolètes les entrées partagées
+        return f"film:{self.generation}:" + ":".join(map(str, cle))
+
+    def _retirer(self, cle):
+        _, donnees = self._entrees.pop(cle)
+        self._octets -= len(donnees)
+
+    def _ajouter(self, cle, donnees):
+        if len(donnees) > self.max_octets:
+            return
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+            self._entrees[cle] = (time.monotonic() + self.ttl_s, donnees)
+            self._octets += len(donnees)
+            while self._octets > self.max_octets:
+                _, (_, ancienne) = self._entrees.popitem(last=False)
+                self._octets -= len(ancienne)
+                self.compteurs['evictions'] += 1
+
+    def lire(self, cle, partage=True):
+        """
+        Args:
+            cle: Tuple (type, movie_id, ...)
+            partage: Consulter aussi le cache partagé en cas d'absence locale
+
+        Returns:
+            tuple: (trouvé, valeur)
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] < time.monotonic():
+                self._retirer(cle)
+                self.compteurs['expirations'] += 1
+                entree = None
+            if entree is not None:
+                self._entrees.move_to_end(cle)
+                self.compteurs['hits'] += 1
+            elif self.backend is None:
+                self.compteurs['misses'] += 1
+        if entree is not None:
+            return True, bson.decode(entree[1])['v']
+        if self.backend is not None and partage:
+            return self.lire_partage(cle)
+        return False, None
+
+    def lire_partage(self, cle):
+        """Lit le cache partagé ; une entrée trouvée est recopiée dans le cache local"""
+        donnees = self.backend.get(self._cle_partagee(cle))
+        if donnees is None:
+            with self._verrou:
+                self.compteurs['misses'] += 1
+            return False, None
+        self._ajouter(cle, donnees)
+        with self._verrou:
+            self.compteurs['hits_partages'] += 1
+        return True, bson.decode(donnees)['v']
+
+    def ecrire(self, cle, valeur, partage=True):
+        """
+        Returns:
+            bytes: Valeur encodée (pour ecrire_partage)
+        """
+        donnees = bson.encode({'v': valeur})
+        self._ajouter(cle, donnees)
+        if self.backend is not None and partage:
+            self.ecrire_partage(cle, donnees)
+        return donnees
+
+    def ecrire_partage(self, cle, donnees):
+        self.backend.set(self._cle_partagee(cle), donnees, self.ttl_s)
+
+    def invalider(self, movie_id=None):
+        """Retire les entrées d'un film, ou tout le cache (local et partagé) si movie_id est None"""
+        with self._verrou:
+            if movie_id is None:
+                cles = []
+                self._entrees.clear()
+                self._octets = 0
+            else:
+                cles = [cle for cle in self._entrees if cle[1] == movie_id]
+                for cle in cles:
+                    self._retirer(cle)
+            self.compteurs['invalidations'] += 1
+        if self.backend is not None:
+            if movie_id is None:
+                self.backend.clear()
+            else:
+                self.backend.delete_many([self._cle_partagee(cle) for cle in cles + [('detail', movie_id)]])
+
+    def verification_due(self):
+        """True au plus une fois par intervalle : le thread appelant relit la génération de migration"""
+        maintenant = time.monotonic()
+        with self._verrou:
+            if self._verifie_a is not None and maintenant - self._verifie_a < self.intervalle_verification_s:
+                return False
+            self._verifie_a = maintenant
+            return True
+
+    def definir_generation(self, generation):
+        """Vide le cache local si la génération de migration a changé depuis la dernière lecture"""
+        if generation == self.generation:
+            return
+        if self.generation is not None:
+            logger.info("Nouvelle migration MongoDB (%s) : cache des films vidé", generation)
+            with self._verrou:
+                self._entrees.clear()
+                self._octets = 0
+                self.compteurs['invalidations'] += 1
+        self.generation = generation
+
+    def stats(self):
+        with self._verrou:
+            stats = dict(self.compteurs)
+            stats['entrees'] = len(self._entrees)
+            stats['octets'] = self._octets
+        lectures = stats['hits'] + stats['hits_partages'] + stats['misses']
+        stats['taux_hits'] = round((stats['hits'] + stats['hits_partages']) / lectures, 4) if lectures else None
+        stats['max_octets'] = self.max_octets
+        stats['ttl_s'] = self.ttl_s
+        stats['generation'] = self.generation
+        stats['backend'] = getattr(settings, 'CACHE_FILMS_BACKEND', None)
+        return stats
+
+
+_cache_films = None
+_verrou_cache_films = threading.Lock()
+
+
+def get_cache_films():
+    """
+    Cache des documents de films du processus, créé au premier appel.
+
+    Returns:
+        CacheFilms: Cache partagé par les vues, ou None si CACHE_FILMS est désactivé
+    """
+    global _cache_films
+    if not getattr(settings, 'CACHE_FILMS', True):
+        return None
+    if _cache_films is None:
+        with _verrou_cache_films:
+            if _cache_films is None:
+                alias = getattr(settings, 'CACHE_FILMS_BACKEND', None)
+                _cache_films = CacheFilms(
+                    max_octets=getattr(settings, 'CACHE_FILMS_MAX_OCTETS', 64 * 1024 * 1024),
+                    ttl_s=getattr(settings, 'CACHE_FILMS_TTL_S', 600),
+                    intervalle_verification_s=getattr(settings, 'CACHE_FILMS_VERIFICATION_S', 30),
+                    backend=caches[alias] if alias else None,
+                )
+    return _cache_films
+
+
+def get_cache_films_stats():
+    """
+    Compteurs du cache des films (hits, misses, évictions, taille en octets).
+
+    Returns:
+        dict: Compteurs et réglages du cache, {'actif': False} s'il est désactivé
+    """
+    cache = get_cache_films()
+    if cache is None:
+        return {'actif': False}
+    return dict(cache.stats(), actif=True)
+
+
+def invalider_cache_films(movie_id=None):
+    """Retire un film (ou tous les films) du cache, par exemple après une modification manuelle"""
+    cache = get_cache_films()
+    if cache is not None:
+        cache.invalider(movie_id)
+
+
+def generation_migration(db):
+    """
+    Génération de la dernière migration MongoDB (document écrit par les scripts de la phase 2,
+    scripts/phase2_mongodb/meta_migration.py). Sert de clé d'invalidation du cache des films.
+
+    Returns:
+        str: Identifiant de la génération, None pour une base migrée avant son introduction
+    """
+    document = db['migration_meta'].find_one({'_id': 'generation'}, {'valeur': 1})
+    return document['valeur'] if document else None
+
+
+def lire_avec_cache(cle, chargement):
+    """
+    Lecture à travers le cache des films : la valeur est lue dans le cache local, puis dans le
+    cache partagé, sinon chargée depuis MongoDB et mise en cache.
+
     Args:
-        movie_id: L'identifiant du film (ex: 'tt0000177')
-    
+        cle: Tuple (type, movie_id, ...)
+        chargement: Callable sans argument qui lit la valeur dans MongoDB
+
     Returns:
-        dict: Document complet du film ou None si non trouvé
+        La valeur (copie indépendante du cache)
     """
+    cache = get_cache_films()
+    if cache is None:
+        return chargement()
+    if cache.verification_due():
+        try:
+            cache.definir_generation(generation_migration(get_mongo_connection()))
+        except PyMongoError as erreur:
+            # MongoDB injoignable : les entrées en cache restent servies
+            logger.warning("Génération de migration illisible : %s", erreur)
+    trouve, valeur = cache.lire(cle)
+    if trouve:
+        return valeur
+    valeur = chargement()
+    cache.ecrire(cle, valeur)
+    return valeur
+
+
+def _lire_detail(movie_id):
+    """Document du film dans movies_complete, sinon dans movies (format réduit), sinon None"""
     db = get_mongo_connection()
     
     # Chercher dans movies_complete (documents pré-agrégés)
     movie = db['movies_complete'].find_one({'_id': movie_id})
-    
     if movie:
-        # Renommer _id en id pour compatibilité avec les templates Django
-        movie['id'] = movie.pop('_id')
-        
-        # Enrichir le cast avec les personnages de SQLite (plus fiables que MongoDB)
-        from .sqlite_service import get_movie_characters
-        characters_map = get_movie_characters(movie_id)
-        
-        if movie.get('cast') and characters_map:
-            for actor in movie['cast']:
-                person_id = actor.get('person_id')
-                if person_id and person_id in characters_map:
-                    # Remplacer les personnages MongoDB par ceux de SQLite
-                    actor['characters'] = characters_map[person_id]
-        
-        return movie
+        return renommer_id(movie)
     
     # Si pas trouvé dans movies_complete, essayer la collection movies simple
     movie = db['movies'].find_one({'mid': movie_id})
-    if movie:
-        # Convertir en format compatible
-        return {
-            'id': movie.get('mid'),
-            'title': movie.get('primaryTitle'),
-            'year': movie.get('startYear'),
-            'runtime': movie.get('runtimeMinutes'),
-            'genres': [],
-            'rating': None,
-            'directors': [],
-            'cast': [],
-            'writers': [],
-            'titles': []
-        }
-    
-    return None
+    return film_simple(movie) if movie else None
+
+
+def get_movie_detail_mongo(movie_id):
+    """
+    Récupère les détails complets d'un film depuis la collection movies_complete.
+    Cette collection contient les données dénormalisées (cast avec personnages, directors, etc.) :
+    la page est servie par une seule lecture, gardée dans le cache des films (CACHE_FILMS).
+    Avec MONGO_VERIFIER_PERSONNAGES, les personnages sont aussi lus dans SQLite,
+    comparés au document et ceux de SQLite sont affichés.
+    
+    Args:
+        movie_id: L'identifiant du film (ex: 'tt0000177')
+    
+    Returns:
+        dict: Document complet du film ou None si non trouvé
+    """
+    movie = lire_avec_cache(('detail', movie_id), lambda: _lire_detail(movie_id))
+    
+    if movie and getattr(settings, 'MONGO_VERIFIER_PERSONNAGES', False):
+        from .sqlite_service import get_movie_characters
+        return verifier_personnages(movie, get_movie_characters(movie_id))
+    return movie
+
+
+# Requêtes partagées par ce module et sa version asynchrone (mongo_async.py)
+
+PROJECTION_FILM = {'_id': 1, 'title': 1, 'year': 1, 'rating': 1, 'genres': 1}
+
+
+def renommer_id(movie):
+    """Renomme _id en id pour compatibilité avec les templates Django"""
+    movie['id'] = movie.pop('_id')
+    return movie
+
+
+def enrichir_personnages(movie, characters_map):
+    """Remplace les personnages du cast MongoDB par ceux de SQLite ({person_id: [personnages]})"""
+    if movie.get('cast') and characters_map:
+        for actor in movie['cast']:
+            person_id = actor.get('person_id')
+            if person_id and person_id in characters_map:
+                actor['characters'] = characters_map[person_id]
+    return movie
+
+
+def comparer_personnages(movie, characters_map):
+    """
+    Compare les personnages du cast du document à ceux de SQLite.
+
+    Returns:
+        list: person_id des membres du cast dont les personnages diffèrent
+    """
+    return [
+        actor.get('person_id') for actor in movie.get('cast') or []
+        if sorted(actor.get('characters') or []) != sorted(characters_map.get(actor.get('person_id'), []))
+    ]
+
+
+def verifier_personnages(movie, characters_map):
+    """Signale les écarts entre document et SQLite, puis affiche les personnages de SQLite"""
+    ecarts = comparer_personnages(movie, characters_map)
+    if ecarts:
+        logger.warning("Film %s : personnages différents de SQLite pour %d membres du cast (%s), "
+                       "relancer migrate_structured.py --personnages",
+                       movie.get('id'), len(ecarts), ", ".join(map(str, ecarts[:5])))
+    return enrichir_personnages(movie, characters_map)
+
+
+def film_simple(movie):
+    """Convertit un document de la collection movies au format de movies_complete"""
+    return {
+        'id': movie.get('mid'),
+        'title': movie.get('primaryTitle'),
+        'year': movie.get('startYear'),
+        'runtime': movie.get('runtimeMinutes'),
+        'genres': [],
+        'rating': None,
+        'directors': [],
+        'cast': [],
+        'writers': [],
+        'titles': []
+    }
+
+
+def filtre_similaires(movie_id, genres):
+    """Films avec au moins un genre en commun, notés, hors film courant"""
+    return {
+        '_id': {'$ne': movie_id},  # Exclure le film actuel
+        'genres': {'$in': genres},  # Au moins un genre en commun
+        'rating.average': {'$exists': True}  # Avoir une note
+    }
+
+
+# Films les mieux notés avec un minimum de votes
+FILTRE_TOP_FILMS = {
+    'rating.average': {'$exists': True, '$gte': 7.0},
+    'rating.votes': {'$exists': True, '$gte': 1000}
+}
+
+
+def pipeline_aleatoires(limit):
+    """Pipeline $sample de films notés au moins 5"""
+    return [
+        {'$match': {
+            'rating.average': {'$exists': True, '$gte': 5.0}
+        }},
+        {'$sample': {'size': limit}},
+        {'$project': PROJECTION_FILM}
+    ]
 
 
 def search_movies_mongo(query, limit=20):
@@ -158,26 +654,18 @@ def get_similar_movies(movie_id, genres, limit=6):
     Returns:
         list: Liste de films similaires
     """
-    db = get_mongo_connection()
-    
     if not genres:
         return []
     
-    # Recherche de films avec au moins un genre en commun
-    similar = list(db['movies_complete'].find(
-        {
-            '_id': {'$ne': movie_id},  # Exclure le film actuel
-            'genres': {'$in': genres},  # Au moins un genre en commun
-            'rating.average': {'$exists': True}  # Avoir une note
-        },
-        {'_id': 1, 'title': 1, 'year': 1, 'rating': 1, 'genres': 1}
-    ).sort('rating.average', -1).limit(limit))
+    def chargement():
+        # Recherche de films avec au moins un genre en commun
+        similar = get_mongo_connection()['movies_complete'].find(
+            filtre_similaires(movie_id, genres), PROJECTION_FILM
+        ).sort('rating.average', -1).limit(limit)
+        return [renommer_id(movie) for movie in similar]
     
-    # Renommer _id en id pour compatibilité avec les templates Django
-    for movie in similar:
-        movie['id'] = movie.pop('_id')
-    
-    return similar
+    # Les genres viennent du document du film : movie_id et limit suffisent comme clé
+    return lire_avec_cache(('similaires', movie_id, limit), chargement)
 
 
 def get_top_movies(limit=10):
@@ -193,19 +681,11 @@ def get_top_movies(limit=10):
     db = get_mongo_connection()
     
     # Récupérer les films les mieux notés avec un minimum de votes
-    top_movies = list(db['movies_complete'].find(
-        {
-            'rating.average': {'$exists': True, '$gte': 7.0},
-            'rating.votes': {'$exists': True, '$gte': 1000}
-        },
-        {'_id': 1, 'title': 1, 'year': 1, 'rating': 1, 'genres': 1, 'directors': 1}
-    ).sort('rating.average', -1).limit(limit))
-    
-    # Renommer _id en id pour compatibilité avec les templates Django
-    for movie in top_movies:
-        movie['id'] = movie.pop('_id')
+    top_movies = db['movies_complete'].find(
+        FILTRE_TOP_FILMS, dict(PROJECTION_FILM, directors=1)
+    ).sort('rating.average', -1).limit(limit)
     
-    return top_movies
+    return [renommer_id(movie) for movie in top_movies]
 
 
 def get_random_movies(limit=6):
@@ -222,21 +702,9 @@ def get_random_movies(limit=6):
     db = get_mongo_connection()
     
     # Utiliser $sample pour obtenir des films aléatoires avec une note
-    random_movies = list(db['movies_complete'].aggregate([
-        {'$match': {
-            'rating.average': {'$exists': True, '$gte': 5.0}
-        }},
-        {'$sample': {'size': limit}},
-        {'$project': {
-            '_id': 1, 'title': 1, 'year': 1, 'rating': 1, 'genres': 1
-        }}
-    ]))
-    
-    # Renommer _id en id pour compatibilité avec les templates Django
-    for movie in random_movies:
-        movie['id'] = movie.pop('_id')
+    random_movies = db['movies_complete'].aggregate(pipeline_aleatoires(limit))
     
-    return random_movies
+    return [renommer_id(movie) for movie in random_movies]
 
 
 def get_genres_list():
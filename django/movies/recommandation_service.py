@@ -0,0 +1,343 @@
+"""
+recommandation_service.py
+=========================
+Recommandations « parce que vous avez aimé X » à partir du contenu des films.
+
+Le modèle est construit hors ligne depuis imdb.db (python manage.py construire_recommandations) :
+- matrice creuse films × caractéristiques (genres, décennie, réalisateurs, scénaristes,
+  casting principal), pondérée TF-IDF et normalisée : le produit scalaire de deux films
+  est leur similarité cosinus ;
+- stockée en CSR (vecteur de chaque film) et en CSC restreinte aux films recommandables
+  (notés, au moins RECOMMANDATIONS_VOTES_MIN votes) dans des fichiers .npy ouverts en
+  mmap : les processus du serveur partagent les pages du fichier au lieu d'une copie chacun.
+
+Une requête est un produit creux X_recommandables · Q, Q étant formée des vecteurs des films
+aimés : seules les listes de films des caractéristiques de ces films sont parcourues.
+Chaque recommandation est attribuée au film aimé qui contribue le plus à son score.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Poids de chaque type de caractéristique (multiplié par l'IDF de la caractéristique)
+POIDS_TYPES = {
+    'genre': 1.0,
+    'decennie': 0.5,
+    'realisateur': 2.0,
+    'scenariste': 1.5,
+    'casting': 1.0,
+}
+
+# Couples (film, valeur) de chaque type de caractéristique (la décennie vient de movies)
+REQUETES_CARACTERISTIQUES = {
+    'genre': "SELECT mid, genre FROM genres WHERE genre IS NOT NULL",
+    'decennie': "SELECT mid, (startYear / 10) * 10 FROM movies WHERE startYear IS NOT NULL",
+    'realisateur': "SELECT mid, pid FROM directors",
+    'scenariste': "SELECT mid, pid FROM writers",
+    'casting': "SELECT mid, pid FROM principals WHERE category NOT IN ('director', 'writer')",
+}
+
+# Tableaux du modèle (un fichier .npy chacun)
+TABLEAUX = (
+    'numeros', 'annees', 'notes', 'votes', 'decalages', 'titres',
+    'lignes_indptr', 'lignes_indices', 'lignes_valeurs',
+    'recommandables', 'position_recommandable',
+    'colonnes_indptr', 'colonnes_indices', 'colonnes_valeurs',
+)
+
+# Films aimés pris en compte au plus par requête
+MAX_FILMS_AIMES = 20
+
+_modele = None
+_verrou = threading.Lock()
+
+
+def numero_film(identifiant):
+    """Partie numérique d'un identifiant de film ('tt0111161' ou clé compacte 111161), None si invalide"""
+    if isinstance(identifiant, int):
+        return identifiant
+    if isinstance(identifiant, str) and identifiant.startswith('tt') and identifiant[2:].isdigit():
+        return int(identifiant[2:])
+    return None
+
+
+def construire_modele(db_path, dossier, votes_min=100):
+    """
+    Construit le modèle depuis la base SQLite et l'écrit dans un sous-dossier de `dossier`,
+    désigné par meta.json (remplacé en dernier) : un serveur ne voit jamais un modèle
+    à moitié écrit, et celui qui a ouvert l'ancien le lit jusqu'à son rechargement.
+
+    Args:
+        db_path: Chemin de imdb.db (schéma texte ou compact)
+        dossier: Dossier des fichiers du modèle
+        votes_min: Votes minimum d'un film pour être recommandé
+
+    Returns:
+        dict: Métadonnées du modèle (tailles, durées par phase)
+    """
+    durees = {}
+    debut = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    films = conn.execute("""
+        SELECT m.mid, m.primaryTitle, m.startYear, r.averageRating, r.numVotes
+        FROM movies m
+        LEFT JOIN ratings r ON r.mid = m.mid
+    """).fetchall()
+    films.sort(key=lambda ligne: numero_film(ligne[0]))
+    index = {ligne[0]: i for i, ligne in enumerate(films)}
+    nb_films = len(films)
+
+    lignes, colonnes, types, caracteristiques = [], [], [], {}
+    for type_caracteristique, requete in REQUETES_CARACTERISTIQUES.items():
+        for mid, valeur in conn.execute(requete):
+            i = index.get(mid)
+            if i is None or valeur is None:
+                continue
+            cle = (type_caracteristique, valeur)
+            colonne = caracteristiques.get(cle)
+            if colonne is None:
+                colonne = caracteristiques[cle] = len(caracteristiques)
+                types.append(POIDS_TYPES[type_caracteristique])
+            lignes.append(i)
+            colonnes.append(colonne)
+    try:
+        # Génération de l'import dont le modèle est issu (table import_meta d'import_data.py)
+        generation = conn.execute("SELECT valeur FROM import_meta WHERE cle = 'generation'").fetchone()
+    except sqlite3.OperationalError:
+        generation = None
+    conn.close()
+    durees['chargement'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    nb_caracteristiques = len(caracteristiques)
+    # Couples (film, caractéristique) uniques, triés par film puis caractéristique (ordre CSR)
+    couples = np.unique(np.array(lignes, dtype=np.int64) * max(nb_caracteristiques, 1)
+                        + np.array(colonnes, dtype=np.int64))
+    lignes = couples // max(nb_caracteristiques, 1)
+    colonnes = couples % max(nb_caracteristiques, 1)
+
+    # TF-IDF puis normalisation L2 de chaque film
+    df = np.bincount(colonnes, minlength=nb_caracteristiques)
+    valeurs = np.array(types)[colonnes] * np.log(nb_films / np.maximum(df[colonnes], 1))
+    normes = np.sqrt(np.bincount(lignes, weights=valeurs ** 2, minlength=nb_films))
+    valeurs = valeurs / np.maximum(normes[lignes], 1e-12)
+    garder = valeurs > 0
+    lignes, colonnes, valeurs = lignes[garder], colonnes[garder], valeurs[garder]
+
+    tableaux = {}
+    tableaux['numeros'] = np.array([numero_film(ligne[0]) for ligne in films], dtype=np.int64)
+    tableaux['annees'] = np.array([ligne[2] or 0 for ligne in films], dtype=np.int16)
+    tableaux['notes'] = np.array([ligne[3] if ligne[3] is not None else np.nan for ligne in films],
+                                 dtype=np.float32)
+    tableaux['votes'] = np.array([ligne[4] or 0 for ligne in films], dtype=np.int32)
+    titres = [(ligne[1] or '').encode('utf-8') for ligne in films]
+    tableaux['decalages'] = np.zeros(nb_films + 1, dtype=np.int64)
+    np.cumsum([len(titre) for titre in titres], out=tableaux['decalages'][1:])
+    tableaux['titres'] = np.frombuffer(b''.join(titres), dtype=np.uint8)
+
+    # CSR : vecteur de chaque film
+    tableaux['lignes_indptr'] = np.zeros(nb_films + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lignes, minlength=nb_films), out=tableaux['lignes_indptr'][1:])
+    tableaux['lignes_indices'] = colonnes.astype(np.int32)
+    tableaux['lignes_valeurs'] = valeurs.astype(np.float32)
+
+    # CSC restreinte aux films recommandables (indices locaux 0..R-1)
+    recommandables = np.flatnonzero(~np.isnan(tableaux['notes']) & (tableaux['votes'] >= votes_min))
+    position = np.full(nb_films, -1, dtype=np.int32)
+    position[recommandables] = np.arange(len(recommandables), dtype=np.int32)
+    est_recommandable = position[lignes] >= 0
+    ordre = np.argsort(colonnes[est_recommandable], kind='stable')
+    tableaux['recommandables'] = recommandables.astype(np.int32)
+    tableaux['position_recommandable'] = position
+    tableaux['colonnes_indptr'] = np.zeros(nb_caracteristiques + 1, dtype=np.int64)
+    np.cumsum(np.bincount(colonnes[est_recommandable], minlength=nb_caracteristiques),
+              out=tableaux['colonnes_indptr'][1:])
+    tableaux['colonnes_indices'] = position[lignes[est_recommandable]][ordre]
+    tableaux['colonnes_valeurs'] = valeurs[est_recommandable][ordre].astype(np.float32)
+    durees['calcul'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    version = f"modele-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    os.makedirs(os.path.join(dossier, version))
+    for nom in TABLEAUX:
+        np.save(os.path.join(dossier, version, f"{nom}.npy"), tableaux[nom])
+    meta = {
+        'version': version,
+        'generation': generation[0] if generation else None,
+        'date_construction': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'films': nb_films,
+        'recommandables': int(len(recommandables)),
+        'caracteristiques': nb_caracteristiques,
+        'valeurs': int(len(valeurs)),
+        'votes_min': votes_min,
+        'poids': POIDS_TYPES,
+        'octets': int(sum(t.nbytes for t in tableaux.values())),
+    }
+    durees['ecriture'] = time.perf_counter() - debut
+    meta['durees_s'] = {phase: round(duree, 3) for phase, duree in durees.items()}
+    precedente = version_designee(dossier)
+    temporaire = os.path.join(dossier, 'meta.tmp.json')
+    with open(temporaire, 'w') as fichier:
+        json.dump(meta, fichier, indent=2)
+    os.replace(temporaire, os.path.join(dossier, 'meta.json'))
+
+    # La version précédente est gardée : un serveur qui a lu l'ancien meta.json peut être
+    # en train d'ouvrir ses fichiers. Les plus anciennes ne sont plus désignées par personne
+    # depuis une construction au moins (les fichiers déjà mappés restent lisibles).
+    for nom in os.listdir(dossier):
+        if nom.startswith('modele-') and nom not in (version, precedente):
+            shutil.rmtree(os.path.join(dossier, nom), ignore_errors=True)
+    return meta
+
+
+def version_designee(dossier):
+    """Version désignée par le meta.json de `dossier`, None s'il n'y en a pas"""
+    try:
+        with open(os.path.join(dossier, 'meta.json')) as fichier:
+            return json.load(fichier).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+class ModeleRecommandation:
+    """Modèle chargé depuis son dossier (tableaux en lecture seule, mappés en mémoire)"""
+
+    def __init__(self, dossier):
+        self.dossier = str(dossier)
+        chemin_meta = os.path.join(self.dossier, 'meta.json')
+        self.mtime = os.path.getmtime(chemin_meta)
+        with open(chemin_meta) as fichier:
+            self.meta = json.load(fichier)
+        for nom in TABLEAUX:
+            setattr(self, nom, np.load(os.path.join(self.dossier, self.meta['version'], f"{nom}.npy"),
+                                       mmap_mode='r'))
+
+    def indice(self, identifiant):
+        """Ligne du film dans le modèle, None s'il est inconnu"""
+        numero = numero_film(identifiant)
+        if numero is None:
+            return None
+        i = int(np.searchsorted(self.numeros, numero))
+        return i if i < len(self.numeros) and self.numeros[i] == numero else None
+
+    def film(self, i):
+        """Identifiant et informations d'affichage du film de la ligne i"""
+        note = float(self.notes[i])
+        return {
+            'id': f"tt{int(self.numeros[i]):07d}",
+            'title': bytes(self.titres[self.decalages[i]:self.decalages[i + 1]]).decode('utf-8'),
+            'year': int(self.annees[i]) or None,
+            'rating': None if np.isnan(note) else {'average': round(note, 1), 'votes': int(self.votes[i])},
+        }
+
+    def recommander(self, identifiants, n=10):
+        """
+        Films les plus proches de l'ensemble des films aimés.
+
+        Args:
+            identifiants: Identifiants IMDb des films aimés (les inconnus sont ignorés)
+            n: Nombre de recommandations
+
+        Returns:
+            tuple: (films aimés reconnus, recommandations triées par score décroissant,
+                    chacune attribuée au film aimé qui y contribue le plus)
+        """
+        aimes = []
+        for identifiant in identifiants[:MAX_FILMS_AIMES]:
+            i = self.indice(identifiant)
+            if i is not None and i not in aimes:
+                aimes.append(i)
+        if not aimes:
+            return [], []
+
+        # Q : caractéristiques des films aimés (une colonne par film aimé)
+        debuts = np.array([self.lignes_indptr[i] for i in aimes])
+        fins = np.array([self.lignes_indptr[i + 1] for i in aimes])
+        nombres = fins - debuts
+        positions = np.repeat(debuts - (np.cumsum(nombres) - nombres), nombres) + np.arange(int(nombres.sum()))
+        caracteristiques = self.lignes_indices[positions]
+        poids_q = self.lignes_valeurs[positions]
+        colonnes_q = np.repeat(np.arange(len(aimes)), nombres)
+
+        # X_recommandables · Q : parcours des listes de films de chaque caractéristique de Q
+        longueurs = self.colonnes_indptr[caracteristiques + 1] - self.colonnes_indptr[caracteristiques]
+        total = int(longueurs.sum())
+        positions = (np.repeat(self.colonnes_indptr[caracteristiques] - (np.cumsum(longueurs) - longueurs), longueurs)
+                     + np.arange(total))
+        films = self.colonnes_indices[positions]
+        contributions = self.colonnes_valeurs[positions] * np.repeat(poids_q, longueurs)
+        scores = np.bincount(films, weights=contributions, minlength=len(self.recommandables))
+
+        # Les films aimés ne sont pas recommandés
+        deja_vus = self.position_recommandable[aimes]
+        scores[deja_vus[deja_vus >= 0]] = 0
+
+        n = min(n, int(np.count_nonzero(scores)))
+        if n <= 0:
+            return [self.film(i) for i in aimes], []
+        meilleurs = np.argpartition(-scores, n - 1)[:n]
+        meilleurs = meilleurs[np.lexsort((-self.votes[self.recommandables[meilleurs]], -scores[meilleurs]))]
+
+        # Contribution de chaque film aimé aux films retenus (attribution « parce que vous avez aimé »)
+        rang = np.full(len(self.recommandables), -1, dtype=np.int64)
+        rang[meilleurs] = np.arange(n)
+        retenus = rang[films] >= 0
+        par_film_aime = np.bincount(rang[films[retenus]] * len(aimes) + np.repeat(colonnes_q, longueurs)[retenus],
+                                    weights=contributions[retenus], minlength=n * len(aimes)).reshape(n, len(aimes))
+
+        aimes_films = [self.film(i) for i in aimes]
+        recommandations = []
+        for position, candidat in enumerate(meilleurs):
+            recommandation = self.film(int(self.recommandables[candidat]))
+            recommandation['score'] = round(float(scores[candidat]), 4)
+            origine = aimes_films[int(np.argmax(par_film_aime[position]))]
+            recommandation['because'] = {'id': origine['id'], 'title': origine['title']}
+            recommandations.append(recommandation)
+        return aimes_films, recommandations
+
+
+def get_modele():
+    """
+    Modèle de recommandation du processus, chargé au premier appel puis rechargé
+    quand construire_recommandations a écrit une nouvelle version.
+
+    Returns:
+        ModeleRecommandation: Modèle prêt, ou None si aucun modèle n'a été construit
+    """
+    global _modele
+    from django.conf import settings
+    dossier = str(settings.RECOMMANDATIONS_DOSSIER)
+    chemin_meta = os.path.join(dossier, 'meta.json')
+    if not os.path.exists(chemin_meta):
+        return None
+    modele = _modele
+    if modele is not None and modele.dossier == dossier and modele.mtime == os.path.getmtime(chemin_meta):
+        return modele
+    with _verrou:
+        if _modele is None or _modele.dossier != dossier or _modele.mtime != os.path.getmtime(chemin_meta):
+            _modele = ModeleRecommandation(dossier)
+        return _modele
+
+
+def recommander(identifiants, n=10):
+    """
+    Recommandations pour une liste de films aimés.
+
+    Args:
+        identifiants: Identifiants IMDb des films aimés
+        n: Nombre de recommandations
+
+    Returns:
+        tuple: (films aimés reconnus, recommandations) ; None si le modèle n'est pas construit
+    """
+    modele = get_modele()
+    if modele is None:
+        return None
+    return modele.recommander(identifiants, n)
@@ -7,24 +7,134 @@ Utilisé pour les listes, filtres, recherches et statistiques.
 
 import sqlite3
 import os
+import base64
+import json
+import math
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
 
+# Requête et classement de la recherche plein texte : ceux des tables FTS de la phase 1
+# (bm25 pondéré par colonne moins POIDS_POPULARITE * ln(1 + votes/films)), mesurés par benchmark_fts.py
+_SCRIPTS_PHASE1 = str(Path(__file__).resolve().parents[2] / 'scripts' / 'phase1_sqlite')
+if _SCRIPTS_PHASE1 not in sys.path:
+    sys.path.insert(0, _SCRIPTS_PHASE1)
+from recherche_texte import POIDS_POPULARITE, poids_bm25, requete_fts  # noqa: E402
+
+
+# Connexions en lecture seule réutilisées, une par thread
+_connexions = threading.local()
+
+
+class ConnexionLecture(sqlite3.Connection):
+    """
+    Connexion persistante du thread : les fonctions du service appellent toujours
+    conn.close() en fin de requête, qui ne ferme donc rien ici (voir fermer()).
+    """
+
+    def close(self):
+        pass
+
+    def fermer(self):
+        super().close()
+
+
+def _ouvrir_connexion_lecture(db_path):
+    """
+    Ouvre une connexion en lecture seule réglée pour les lectures répétées :
+    URI mode=ro (immutable=1 si SQLITE_IMMUTABLE), cache de requêtes préparées,
+    mmap et cache de pages dimensionnés depuis les settings.
+    """
+    from django.conf import settings
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    if getattr(settings, 'SQLITE_IMMUTABLE', False):
+        uri += "&immutable=1"
+    conn = sqlite3.connect(
+        uri, uri=True, factory=ConnexionLecture,
+        cached_statements=getattr(settings, 'SQLITE_CACHED_STATEMENTS', 256),
+    )
+    conn.execute(f"PRAGMA mmap_size = {int(getattr(settings, 'SQLITE_MMAP_MO', 256)) * 1024 * 1024}")
+    conn.execute(f"PRAGMA cache_size = -{int(getattr(settings, 'SQLITE_CACHE_MO', 64)) * 1024}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.row_factory = sqlite3.Row
+    return conn
+
 
 def get_sqlite_connection():
     """
     Établit la connexion à la base de données SQLite imdb.
+    Avec SQLITE_CONNEXIONS_PERSISTANTES, retourne la connexion en lecture seule du thread
+    (ouverte une fois, rouverte si le fichier imdb.db a été remplacé) ;
+    sinon une nouvelle connexion à chaque appel (ancien comportement, pour comparaison).
     
     Returns:
         sqlite3.Connection: Connexion à la base de données
     """
     from django.conf import settings
-    db_path = settings.DATABASES['imdb']['NAME']
-    conn = sqlite3.connect(str(db_path))
-    # Retourner les résultats sous forme de dictionnaires
-    conn.row_factory = sqlite3.Row
+    db_path = str(settings.DATABASES['imdb']['NAME'])
+    
+    if not getattr(settings, 'SQLITE_CONNEXIONS_PERSISTANTES', True):
+        conn = sqlite3.connect(db_path)
+        # Retourner les résultats sous forme de dictionnaires
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    # Le fichier est identifié par son inode : un nouvel imdb.db (reconstruit) rouvre la connexion
+    fichier = (db_path, os.stat(db_path).st_ino)
+    conn = getattr(_connexions, 'conn', None)
+    if conn is None or _connexions.fichier != fichier:
+        if conn is not None:
+            conn.fermer()
+        conn = _ouvrir_connexion_lecture(db_path)
+        _connexions.conn, _connexions.fichier = conn, fichier
     return conn
 
 
+def fermer_connexion_thread():
+    """Ferme la connexion persistante du thread courant (fin de thread, tests)"""
+    conn = getattr(_connexions, 'conn', None)
+    if conn is not None:
+        conn.fermer()
+        _connexions.conn = None
+
+
+def cle_identifiant(identifiant, prefixe):
+    """
+    Convertit un identifiant IMDb ('tt0111161', 'nm0000158') en valeur de clé SQLite.
+    Avec le schéma compact (IMDB_COMPACT_KEYS), seule la partie numérique est stockée.
+    
+    Args:
+        identifiant: Identifiant IMDb reçu (URL, formulaire...)
+        prefixe: Préfixe attendu ('tt' pour un film, 'nm' pour une personne)
+    
+    Returns:
+        str | int | None: Clé à utiliser dans les requêtes (None si mal formé en mode compact)
+    """
+    from django.conf import settings
+    if not getattr(settings, 'IMDB_COMPACT_KEYS', False) or identifiant is None:
+        return identifiant
+    identifiant = str(identifiant)
+    if not identifiant.startswith(prefixe) or not identifiant[len(prefixe):].isdigit():
+        return None
+    return int(identifiant[len(prefixe):])
+
+
+def mid_texte(cle):
+    """Reconvertit une clé de film SQLite en identifiant IMDb (111161 -> 'tt0111161')"""
+    if cle is None or isinstance(cle, str):
+        return cle
+    return f"tt{cle:07d}"
+
+
+def pid_texte(cle):
+    """Reconvertit une clé de personne SQLite en identifiant IMDb (158 -> 'nm0000158')"""
+    if cle is None or isinstance(cle, str):
+        return cle
+    return f"nm{cle:07d}"
+
+
 def get_sqlite_stats():
     """
     Récupère les statistiques globales de la base SQLite.
@@ -35,20 +145,26 @@ def get_sqlite_stats():
     from django.conf import settings
     db_path = settings.DATABASES['imdb']['NAME']
     
-    conn = get_sqlite_connection()
-    cursor = conn.cursor()
-    
-    # Liste des tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = [row[0] for row in cursor.fetchall()]
-    
-    # Nombre de lignes par table
-    table_counts = {}
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table};")
-        table_counts[table] = cursor.fetchone()[0]
-    
-    conn.close()
+    instantane = get_stats_snapshot()['sections']
+    if 'tables' in instantane:
+        # Comptages calculés à l'import (scripts/phase1_sqlite/statistiques.py)
+        table_counts = instantane['tables']
+        tables = list(table_counts)
+    else:
+        conn = get_sqlite_connection()
+        cursor = conn.cursor()
+        
+        # Liste des tables
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        tables = [row[0] for row in cursor.fetchall()]
+        
+        # Nombre de lignes par table
+        table_counts = {}
+        for table in tables:
+            cursor.execute(f"SELECT COUNT(*) FROM {table};")
+            table_counts[table] = cursor.fetchone()[0]
+        
+        conn.close()
     
     # Taille du fichier
     db_size = os.path.getsize(db_path) / (1024 * 1024)  # en MB
@@ -68,6 +184,10 @@ def get_global_stats():
     Returns:
         dict: Statistiques globales
     """
+    instantane = get_stats_snapshot()['sections']
+    if 'global' in instantane:
+        return dict(instantane['global'])
+    
     conn = get_sqlite_connection()
     cursor = conn.cursor()
     
@@ -117,42 +237,104 @@ def get_all_genres():
     return genres
 
 
-def get_movies_list(page=1, per_page=20, genre=None, year_min=None, year_max=None, 
-                    rating_min=None, sort_by='rating', sort_order='desc'):
+def generation_import(conn):
     """
-    Récupère une liste paginée de films avec filtres.
+    Génération du dernier import (table import_meta écrite par import_data.py).
+    Sert de clé d'invalidation des caches ; repli sur la date du fichier pour une ancienne base.
     
-    Args:
-        page: Numéro de page (1-indexed)
-        per_page: Nombre de films par page
-        genre: Filtre par genre (optionnel)
-        year_min: Année minimum (optionnel)
-        year_max: Année maximum (optionnel)
-        rating_min: Note minimum (optionnel)
-        sort_by: Champ de tri ('title', 'year', 'rating')
-        sort_order: Ordre de tri ('asc', 'desc')
+    Returns:
+        str: Identifiant de la génération courante des données
+    """
+    try:
+        row = conn.execute("SELECT valeur FROM import_meta WHERE cle = 'generation'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row:
+        return row[0]
+    from django.conf import settings
+    return f"mtime-{os.path.getmtime(str(settings.DATABASES['imdb']['NAME']))}"
+
+
+# Instantané des statistiques du processus : (génération d'import, contenu)
+_instantane_stats = (None, None)
+
+
+def get_stats_snapshot():
+    """
+    Instantané des statistiques calculé à l'import (table stats_snapshot, voir
+    scripts/phase1_sqlite/statistiques.py), relu seulement quand la génération d'import change.
+    Sans instantané (base importée avant son ajout), sections est vide et les fonctions
+    de statistiques calculent en direct.
     
     Returns:
-        dict: {movies: list, total: int, pages: int}
+        dict: {sections: {section: valeur}, date_calcul: datetime ou None}
     """
+    global _instantane_stats
     conn = get_sqlite_connection()
-    cursor = conn.cursor()
+    generation = generation_import(conn)
+    if _instantane_stats[0] == generation:
+        conn.close()
+        return _instantane_stats[1]
     
-    # Construire la requête de base
-    base_query = """
-        SELECT DISTINCT m.mid, m.primaryTitle, m.startYear, m.runtimeMinutes,
-               r.averageRating, r.numVotes
-        FROM movies m
-        LEFT JOIN ratings r ON m.mid = r.mid
+    try:
+        rows = conn.execute("SELECT section, valeur, date_calcul FROM stats_snapshot").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    conn.close()
+    
+    instantane = {
+        'sections': {row['section']: json.loads(row['valeur']) for row in rows},
+        'date_calcul': max((datetime.fromisoformat(row['date_calcul']) for row in rows), default=None),
+    }
+    _instantane_stats = (generation, instantane)
+    return instantane
+
+
+# Cache des totaux de la liste des films : (génération, filtres) -> total
+TAILLE_CACHE_COMPTAGES = 1024
+_cache_comptages = OrderedDict()
+_verrou_comptages = threading.Lock()
+
+# Colonnes de tri de la liste des films (départage par mid pour un ordre total)
+COLONNES_TRI = {
+    'title': 'm.primaryTitle',
+    'year': 'm.startYear',
+    'rating': 'r.averageRating'
+}
+
+
+def encoder_curseur(valeur, mid):
+    """Curseur de pagination opaque (valeur de tri et mid de la ligne frontière)"""
+    return base64.urlsafe_b64encode(json.dumps([valeur, mid]).encode()).decode().rstrip('=')
+
+
+def decoder_curseur(curseur):
     """
+    Décode un curseur de pagination.
     
-    # Conditions WHERE
+    Returns:
+        tuple | None: (valeur de tri, mid), ou None si le curseur est absent ou invalide
+    """
+    if not curseur:
+        return None
+    try:
+        valeur, mid = json.loads(base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valeur, (str, int, float, type(None))) or not isinstance(mid, (str, int)):
+        return None
+    return valeur, mid
+
+
+def _filtres_films(genre, year_min, year_max, rating_min):
+    """Jointures, conditions et paramètres des filtres de la liste des films"""
+    jointures = ""
     conditions = ["m.titleType = 'movie'"]
     params = []
     
-    # Filtre par genre (nécessite une jointure)
+    # Filtre par genre (nécessite une jointure ; (mid, genre) est la clé de genres : pas de doublon)
     if genre:
-        base_query += " JOIN genres g ON m.mid = g.mid"
+        jointures += " JOIN genres g ON m.mid = g.mid"
         conditions.append("g.genre = ?")
         params.append(genre)
     
@@ -169,38 +351,201 @@ def get_movies_list(page=1, per_page=20, genre=None, year_min=None, year_max=Non
         conditions.append("r.averageRating >= ?")
         params.append(float(rating_min))
     
-    # Ajouter les conditions WHERE
-    if conditions:
-        base_query += " WHERE " + " AND ".join(conditions)
+    return jointures, conditions, params
+
+
+def compter_films(conn, genre=None, year_min=None, year_max=None, rating_min=None, non_nul=None):
+    """
+    Nombre de films correspondant aux filtres, mis en cache jusqu'au prochain import.
     
-    # Tri
-    sort_column_map = {
-        'title': 'm.primaryTitle',
-        'year': 'm.startYear',
-        'rating': 'r.averageRating'
-    }
-    sort_col = sort_column_map.get(sort_by, 'r.averageRating')
-    order = 'DESC' if sort_order == 'desc' else 'ASC'
+    Args:
+        non_nul: Champ de tri ('title', 'year', 'rating') : ne compter que les films
+            qui ont une valeur pour ce champ (optionnel)
+    
+    Returns:
+        int: Total des films filtrés
+    """
+    cle = (generation_import(conn), genre, year_min, year_max, rating_min, non_nul)
+    with _verrou_comptages:
+        if cle in _cache_comptages:
+            _cache_comptages.move_to_end(cle)
+            return _cache_comptages[cle]
+    
+    jointures, conditions, params = _filtres_films(genre, year_min, year_max, rating_min)
+    if non_nul:
+        conditions.append(f"{COLONNES_TRI[non_nul]} IS NOT NULL")
+    total = conn.execute(f"""
+        SELECT COUNT(*)
+        FROM movies m
+        LEFT JOIN ratings r ON m.mid = r.mid{jointures}
+        WHERE {" AND ".join(conditions)}
+    """, params).fetchone()[0]
+    
+    with _verrou_comptages:
+        _cache_comptages[cle] = total
+        if len(_cache_comptages) > TAILLE_CACHE_COMPTAGES:
+            _cache_comptages.popitem(last=False)
+    return total
+
+
+def _lire_page_films(conn, filtres, sort_by, desc, curseur, en_avant, limit, skip=0,
+                     nb_valeurs=None):
+    """
+    Lit une page de films par pagination par clé (keyset) sur (colonne de tri, mid).
+    
+    L'ordre affiché est « valeurs triées puis NULL » : on lit en deux phases
+    (lignes avec une valeur via l'index de tri, puis lignes NULL triées par mid)
+    au lieu d'un ORDER BY ... NULLS LAST que SQLite ne sait pas servir par un index.
+    Les lignes sautées le sont par SQLite (OFFSET de chaque phase), sans être lues en Python.
+    
+    Args:
+        filtres: (jointures, conditions, params) de _filtres_films
+        curseur: (valeur, mid) de la ligne frontière, ou None (début ou fin de liste)
+        en_avant: True = lignes après le curseur ; False = lignes avant (liste parcourue à l'envers)
+        limit: Nombre de lignes de la page
+        skip: Lignes à sauter après le curseur
+        nb_valeurs: Nombre de lignes de la phase « valeurs » (compter_films), utilisé sans
+            curseur quand skip dépasse cette phase ; compté par SQLite s'il n'est pas fourni
+    
+    Returns:
+        list: Lignes dans l'ordre d'affichage
+    """
+    jointures, conditions, params = filtres
+    colonne = COLONNES_TRI[sort_by]
+    desc_lecture = desc if en_avant else not desc
+    op = '<' if desc_lecture else '>'
+    ordre = 'DESC' if desc_lecture else 'ASC'
+    
+    phases = ['valeurs', 'nulls'] if en_avant else ['nulls', 'valeurs']
+    rows = []
+    for phase in phases:
+        if len(rows) >= limit:
+            break
+        # Tri par note : les lignes avec une valeur ont forcément une note. On parcourt alors
+        # idx_ratings_rating (ratings en table externe, CROSS JOIN fixe l'ordre des tables)
+        # et on départage par r.mid (égal à m.mid) pour que l'index serve tout le tri.
+        par_notes = sort_by == 'rating' and phase == 'valeurs'
+        tables = "ratings r CROSS JOIN movies m ON m.mid = r.mid" if par_notes else \
+            "movies m LEFT JOIN ratings r ON m.mid = r.mid"
+        mid = "r.mid" if par_notes else "m.mid"
+        conditions_phase = list(conditions)
+        params_phase = list(params)
+        if phase == 'valeurs':
+            conditions_phase.append(f"{colonne} IS NOT NULL")
+            if curseur is not None:
+                if curseur[0] is None:
+                    # Curseur dans les NULL : toutes les valeurs sont avant lui
+                    if en_avant:
+                        continue
+                else:
+                    conditions_phase.append(f"({colonne}, {mid}) {op} (?, ?)")
+                    params_phase.extend(curseur)
+            tri = f"{colonne} {ordre}, {mid} {ordre}"
+        else:
+            conditions_phase.append(f"{colonne} IS NULL")
+            if sort_by == 'rating':
+                # Films sans note, dans l'ordre de mid : le « + » écarte l'index sur titleType
+                # pour que SQLite parcoure la clé primaire (déjà triée) au lieu de trier
+                conditions_phase[0] = "+m.titleType = 'movie'"
+            if curseur is not None:
+                if curseur[0] is None:
+                    conditions_phase.append(f"m.mid {op} ?")
+                    params_phase.append(curseur[1])
+                elif not en_avant:
+                    # Curseur dans les valeurs : les NULL sont tous après lui
+                    continue
+            tri = f"m.mid {ordre}"
+        
+        lues = conn.execute(f"""
+            SELECT m.mid, m.primaryTitle, m.startYear, m.runtimeMinutes,
+                   r.averageRating, r.numVotes, {colonne} AS cle_tri
+            FROM {tables}{jointures}
+            WHERE {" AND ".join(conditions_phase)}
+            ORDER BY {tri}
+            LIMIT ? OFFSET ?
+        """, params_phase + [limit - len(rows), skip]).fetchall()
+        rows += lues
+        
+        if skip and not lues and phase != phases[-1]:
+            # Le saut dépasse cette phase : on retire ses lignes du saut de la phase suivante
+            if curseur is None and phase == 'valeurs' and nb_valeurs is not None:
+                nb_phase = nb_valeurs
+            else:
+                nb_phase = conn.execute(f"""
+                    SELECT COUNT(*) FROM (
+                        SELECT 1 FROM {tables}{jointures}
+                        WHERE {" AND ".join(conditions_phase)}
+                        LIMIT ?)
+                """, params_phase + [skip]).fetchone()[0]
+            skip -= nb_phase
+        else:
+            skip = 0
+    
+    if not en_avant:
+        rows.reverse()
+    return rows
+
+
+def get_movies_list(page=1, per_page=20, genre=None, year_min=None, year_max=None, 
+                    rating_min=None, sort_by='rating', sort_order='desc',
+                    after=None, before=None, skip=0, last=False):
+    """
+    Récupère une liste paginée de films avec filtres.
+    Pagination par clé : avec un curseur (after / before), la page est lue à partir de la
+    ligne frontière de la page voisine au lieu de sauter (page - 1) * per_page lignes.
+    Sans curseur, la page est lue depuis le début (ou la fin si last) de la liste.
+    
+    Args:
+        page: Numéro de page (1-indexed), utilisé pour l'affichage et sans curseur
+        per_page: Nombre de films par page
+        genre: Filtre par genre (optionnel)
+        year_min: Année minimum (optionnel)
+        year_max: Année maximum (optionnel)
+        rating_min: Note minimum (optionnel)
+        sort_by: Champ de tri ('title', 'year', 'rating')
+        sort_order: Ordre de tri ('asc', 'desc')
+        after: Curseur de la dernière ligne de la page précédente (optionnel)
+        before: Curseur de la première ligne de la page suivante (optionnel)
+        skip: Nombre de lignes à sauter à partir du curseur (pages voisines)
+        last: Lire la dernière page
     
-    # Compter le total pour la pagination
-    count_query = f"SELECT COUNT(*) FROM ({base_query})"
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
+    Returns:
+        dict: {movies, total, pages, current_page, first_cursor, last_cursor}
+    """
+    conn = get_sqlite_connection()
     
-    # Ajouter tri et pagination
-    base_query += f" ORDER BY {sort_col} {order} NULLS LAST"
-    base_query += " LIMIT ? OFFSET ?"
-    params.extend([per_page, (page - 1) * per_page])
+    if sort_by not in COLONNES_TRI:
+        sort_by = 'rating'
+    desc = sort_order == 'desc'
+    filtres = _filtres_films(genre, year_min, year_max, rating_min)
     
-    # Exécuter la requête
-    cursor.execute(base_query, params)
-    rows = cursor.fetchall()
+    # Compter le total pour la pagination (en cache jusqu'au prochain import)
+    total = compter_films(conn, genre, year_min, year_max, rating_min)
+    total_pages = (total + per_page - 1) // per_page
+    page = min(max(page, 1), max(total_pages, 1))
+    
+    curseur_apres, curseur_avant = decoder_curseur(after), decoder_curseur(before)
+    if last and total_pages:
+        page = total_pages
+        rows = _lire_page_films(conn, filtres, sort_by, desc, None, False,
+                                total - (total_pages - 1) * per_page)
+    elif curseur_apres is not None:
+        rows = _lire_page_films(conn, filtres, sort_by, desc, curseur_apres, True, per_page, skip)
+    elif curseur_avant is not None:
+        rows = _lire_page_films(conn, filtres, sort_by, desc, curseur_avant, False, per_page, skip)
+    else:
+        # Sans curseur (lien direct vers une page) : lecture depuis le début de la liste,
+        # les pages précédentes sont sautées par OFFSET
+        skip = (page - 1) * per_page
+        nb_valeurs = compter_films(conn, genre, year_min, year_max, rating_min, non_nul=sort_by) \
+            if skip else None
+        rows = _lire_page_films(conn, filtres, sort_by, desc, None, True, per_page, skip, nb_valeurs)
     
     # Convertir en liste de dictionnaires
     movies = []
     for row in rows:
         movies.append({
-            'mid': row['mid'],
+            'mid': mid_texte(row['mid']),
             'primaryTitle': row['primaryTitle'],
             'startYear': row['startYear'],
             'runtimeMinutes': row['runtimeMinutes'],
@@ -210,14 +555,13 @@ def get_movies_list(page=1, per_page=20, genre=None, year_min=None, year_max=Non
     
     conn.close()
     
-    # Calculer le nombre de pages
-    total_pages = (total + per_page - 1) // per_page
-    
     return {
         'movies': movies,
         'total': total,
         'pages': total_pages,
-        'current_page': page
+        'current_page': page,
+        'first_cursor': encoder_curseur(rows[0]['cle_tri'], rows[0]['mid']) if rows else None,
+        'last_cursor': encoder_curseur(rows[-1]['cle_tri'], rows[-1]['mid']) if rows else None,
     }
 
 
@@ -248,7 +592,7 @@ def get_top_rated_movies(limit=10):
     movies = []
     for row in cursor.fetchall():
         movies.append({
-            'mid': row['mid'],
+            'mid': mid_texte(row['mid']),
             'primaryTitle': row['primaryTitle'],
             'startYear': row['startYear'],
             'runtimeMinutes': row['runtimeMinutes'],
@@ -260,9 +604,31 @@ def get_top_rated_movies(limit=10):
     return movies
 
 
+def fts_disponible(conn):
+    """
+    Vérifie que les tables FTS5 ont été construites (import_data.py / recherche_texte.py).
+    Enregistre ln() en Python si SQLite est compilé sans les fonctions mathématiques.
+    
+    Returns:
+        bool: True si la recherche plein texte est utilisable, sinon recherche LIKE
+    """
+    nb_tables = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('movies_fts', 'persons_fts')"
+    ).fetchone()[0]
+    if nb_tables < 2:
+        return False
+    try:
+        conn.execute("SELECT ln(1)")
+    except sqlite3.OperationalError:
+        conn.create_function("ln", 1, math.log, deterministic=True)
+    return True
+
+
 def search_movies(query, limit=20):
     """
-    Recherche de films par titre (LIKE).
+    Recherche de films par titre (titre principal, original et titres alternatifs).
+    Utilise l'index FTS5 movies_fts, classé par pertinence (bm25) et nombre de votes ;
+    repli sur LIKE si la base n'a pas d'index plein texte.
     Exclut les épisodes TV pour ne retourner que les films/séries.
     
     Args:
@@ -275,23 +641,38 @@ def search_movies(query, limit=20):
     conn = get_sqlite_connection()
     cursor = conn.cursor()
     
-    search_term = f"%{query}%"
-    
-    cursor.execute("""
-        SELECT m.mid, m.primaryTitle, m.startYear, m.runtimeMinutes,
-               m.titleType, r.averageRating, r.numVotes
-        FROM movies m
-        LEFT JOIN ratings r ON m.mid = r.mid
-        WHERE (m.primaryTitle LIKE ? OR m.originalTitle LIKE ?)
-          AND m.titleType NOT IN ('tvEpisode')
-        ORDER BY r.averageRating DESC NULLS LAST
-        LIMIT ?
-    """, (search_term, search_term, limit))
+    if fts_disponible(conn):
+        requete = requete_fts(query)
+        if requete is None:
+            conn.close()
+            return []
+        cursor.execute(f"""
+            SELECT m.mid, m.primaryTitle, m.startYear, m.runtimeMinutes,
+                   m.titleType, r.averageRating, r.numVotes
+            FROM movies_fts f
+            JOIN movies m ON m.rowid = f.rowid
+            LEFT JOIN ratings r ON m.mid = r.mid
+            WHERE movies_fts MATCH ?
+            ORDER BY bm25(movies_fts, {poids_bm25("movies_fts")}) - {POIDS_POPULARITE} * ln(1 + f.numVotes)
+            LIMIT ?
+        """, (requete, limit))
+    else:
+        search_term = f"%{query}%"
+        cursor.execute("""
+            SELECT m.mid, m.primaryTitle, m.startYear, m.runtimeMinutes,
+                   m.titleType, r.averageRating, r.numVotes
+            FROM movies m
+            LEFT JOIN ratings r ON m.mid = r.mid
+            WHERE (m.primaryTitle LIKE ? OR m.originalTitle LIKE ?)
+              AND m.titleType NOT IN ('tvEpisode')
+            ORDER BY r.averageRating DESC NULLS LAST
+            LIMIT ?
+        """, (search_term, search_term, limit))
     
     movies = []
     for row in cursor.fetchall():
         movies.append({
-            'mid': row['mid'],
+            'mid': mid_texte(row['mid']),
             'primaryTitle': row['primaryTitle'],
             'startYear': row['startYear'],
             'runtimeMinutes': row['runtimeMinutes'],
@@ -306,7 +687,9 @@ def search_movies(query, limit=20):
 
 def search_persons(query, limit=20):
     """
-    Recherche de personnes par nom (LIKE).
+    Recherche de personnes par nom.
+    Utilise l'index FTS5 persons_fts, classé par pertinence (bm25) et nombre de films ;
+    repli sur LIKE si la base n'a pas d'index plein texte.
     
     Args:
         query: Terme de recherche
@@ -318,21 +701,34 @@ def search_persons(query, limit=20):
     conn = get_sqlite_connection()
     cursor = conn.cursor()
     
-    search_term = f"%{query}%"
-    
-    cursor.execute("""
-        SELECT p.pid, p.primaryName, p.birthYear, p.deathYear,
-               (SELECT COUNT(*) FROM principals pr WHERE pr.pid = p.pid) as film_count
-        FROM persons p
-        WHERE p.primaryName LIKE ?
-        ORDER BY film_count DESC
-        LIMIT ?
-    """, (search_term, limit))
+    if fts_disponible(conn):
+        requete = requete_fts(query)
+        if requete is None:
+            conn.close()
+            return []
+        cursor.execute(f"""
+            SELECT p.pid, p.primaryName, p.birthYear, p.deathYear, f.nbFilms as film_count
+            FROM persons_fts f
+            JOIN persons p ON p.rowid = f.rowid
+            WHERE persons_fts MATCH ?
+            ORDER BY bm25(persons_fts, {poids_bm25("persons_fts")}) - {POIDS_POPULARITE} * ln(1 + f.nbFilms)
+            LIMIT ?
+        """, (requete, limit))
+    else:
+        search_term = f"%{query}%"
+        cursor.execute("""
+            SELECT p.pid, p.primaryName, p.birthYear, p.deathYear,
+                   (SELECT COUNT(*) FROM principals pr WHERE pr.pid = p.pid) as film_count
+            FROM persons p
+            WHERE p.primaryName LIKE ?
+            ORDER BY film_count DESC
+            LIMIT ?
+        """, (search_term, limit))
     
     persons = []
     for row in cursor.fetchall():
         persons.append({
-            'pid': row['pid'],
+            'pid': pid_texte(row['pid']),
             'primaryName': row['primaryName'],
             'birthYear': row['birthYear'],
             'deathYear': row['deathYear'],
@@ -361,11 +757,11 @@ def get_movie_characters(movie_id):
         SELECT pid, name
         FROM characters
         WHERE mid = ?
-    """, (movie_id,))
+    """, (cle_identifiant(movie_id, 'tt'),))
     
     characters_map = {}
     for row in cursor.fetchall():
-        pid = row['pid']
+        pid = pid_texte(row['pid'])
         char_name = row['name']
         if pid not in characters_map:
             characters_map[pid] = []
@@ -383,6 +779,10 @@ def get_genre_stats():
     Returns:
         dict: {genre: count}
     """
+    instantane = get_stats_snapshot()['sections']
+    if 'genres' in instantane:
+        return {genre: count for genre, count in instantane['genres'][:15]}
+    
     conn = get_sqlite_connection()
     cursor = conn.cursor()
     
@@ -402,53 +802,100 @@ def get_genre_stats():
     return result
 
 
-def get_decade_stats():
+# Largeurs de tranche proposées sur la page de statistiques
+LARGEURS_TRANCHES_NOTES = (0.5, 1.0, 2.0)
+
+
+def largeur_tranche_notes(valeur=None):
     """
-    Récupère le nombre de films par décennie.
+    Largeur de tranche de l'histogramme des notes, arrondie au dixième (les notes IMDb
+    ont une décimale). Valeur absente ou invalide : STATS_LARGEUR_TRANCHE_NOTES.
     
     Returns:
-        dict: {décennie: count}
+        float: Largeur entre 0.1 et 10
     """
-    conn = get_sqlite_connection()
-    cursor = conn.cursor()
+    from django.conf import settings
+    try:
+        largeur = round(float(valeur), 1)
+    except (TypeError, ValueError):
+        largeur = None
+    if largeur is None or not 0.1 <= largeur <= 10:
+        largeur = round(float(getattr(settings, 'STATS_LARGEUR_TRANCHE_NOTES', 1.0)), 1)
+    return largeur
+
+
+def get_movie_distributions(largeur=None):
+    """
+    Films par décennie et distribution des notes, en un seul parcours groupé
+    de movies (index idx_movies_type_year) joint à ratings.
     
-    cursor.execute("""
-        SELECT (startYear / 10) * 10 as decade, COUNT(*) as count
-        FROM movies
-        WHERE titleType = 'movie' AND startYear IS NOT NULL
-        GROUP BY decade
-        ORDER BY decade
-    """)
+    Args:
+        largeur: Largeur des tranches de notes (défaut : STATS_LARGEUR_TRANCHE_NOTES)
     
-    result = {int(row['decade']): row['count'] for row in cursor.fetchall() if row['decade']}
+    Returns:
+        dict: {decades: {décennie: count}, ratings: {borne inférieure: count}, largeur}
+    """
+    largeur = largeur_tranche_notes(largeur)
+    # Calcul en dixièmes de point : 7.3 / 0.1 donnerait 72.99 en flottant
+    pas = round(largeur * 10)
+    
+    decades = {}
+    # Toutes les tranches de 0 à 10, vides comprises (10.0 tombe dans la dernière)
+    tranches = dict.fromkeys(range(100 // pas + 1), 0)
+    
+    instantane = get_stats_snapshot()['sections']
+    if 'distributions' in instantane:
+        # Instantané : films par dixième de note, regroupés ici selon la largeur demandée
+        decades = {int(decade): count for decade, count in instantane['distributions']['decennies'].items()}
+        for dixieme, count in enumerate(instantane['distributions']['dixiemes']):
+            tranches[dixieme // pas] += count
+    else:
+        conn = get_sqlite_connection()
+        rows = conn.execute("""
+            SELECT (m.startYear / 10) * 10 AS decade,
+                   CAST(ROUND(r.averageRating * 10) AS INTEGER) / ? AS tranche,
+                   COUNT(*) AS count
+            FROM movies m
+            LEFT JOIN ratings r ON m.mid = r.mid
+            WHERE m.titleType = 'movie'
+            GROUP BY decade, tranche
+        """, (pas,)).fetchall()
+        conn.close()
+        
+        for row in rows:
+            if row['decade']:
+                decades[int(row['decade'])] = decades.get(int(row['decade']), 0) + row['count']
+            if row['tranche'] is not None:
+                tranches[row['tranche']] = tranches.get(row['tranche'], 0) + row['count']
     
-    conn.close()
-    return result
+    return {
+        'decades': dict(sorted(decades.items())),
+        'ratings': {round(tranche * pas / 10, 1): count for tranche, count in tranches.items()},
+        'largeur': largeur,
+    }
 
 
-def get_rating_distribution():
+def get_decade_stats():
     """
-    Récupère la distribution des notes (histogramme).
+    Récupère le nombre de films par décennie.
     
     Returns:
-        dict: {note: count}
+        dict: {décennie: count}
     """
-    conn = get_sqlite_connection()
-    cursor = conn.cursor()
+    return get_movie_distributions()['decades']
+
+
+def get_rating_distribution(largeur=None):
+    """
+    Récupère la distribution des notes (histogramme).
     
-    result = {}
-    for i in range(0, 11):
-        cursor.execute("""
-            SELECT COUNT(*) as count
-            FROM ratings r
-            JOIN movies m ON r.mid = m.mid
-            WHERE m.titleType = 'movie'
-              AND r.averageRating >= ? AND r.averageRating < ?
-        """, (i, i + 1))
-        result[i] = cursor.fetchone()['count']
+    Args:
+        largeur: Largeur des tranches (défaut : STATS_LARGEUR_TRANCHE_NOTES)
     
-    conn.close()
-    return result
+    Returns:
+        dict: {borne inférieure de la tranche: count}
+    """
+    return get_movie_distributions(largeur)['ratings']
 
 
 def get_top_actors(limit=10):
@@ -461,6 +908,11 @@ def get_top_actors(limit=10):
     Returns:
         list: Liste des top acteurs avec leur nombre de films
     """
+    instantane = get_stats_snapshot()['sections']
+    if len(instantane.get('top_acteurs', [])) >= limit:
+        return [{'pid': pid_texte(pid), 'primaryName': nom, 'film_count': count}
+                for pid, nom, count in instantane['top_acteurs'][:limit]]
+    
     conn = get_sqlite_connection()
     cursor = conn.cursor()
     
@@ -477,7 +929,7 @@ def get_top_actors(limit=10):
     actors = []
     for row in cursor.fetchall():
         actors.append({
-            'pid': row['pid'],
+            'pid': pid_texte(row['pid']),
             'primaryName': row['primaryName'],
             'film_count': row['film_count']
         })
@@ -503,7 +955,7 @@ def get_person_detail(person_id):
         SELECT p.pid, p.primaryName, p.birthYear, p.deathYear
         FROM persons p
         WHERE p.pid = ?
-    """, (person_id,))
+    """, (cle_identifiant(person_id, 'nm'),))
     
     row = cursor.fetchone()
     if not row:
@@ -511,7 +963,7 @@ def get_person_detail(person_id):
         return None
     
     person = {
-        'pid': row['pid'],
+        'pid': pid_texte(row['pid']),
         'primaryName': row['primaryName'],
         'birthYear': int(row['birthYear']) if row['birthYear'] else None,
         'deathYear': int(row['deathYear']) if row['deathYear'] else None,
@@ -520,7 +972,7 @@ def get_person_detail(person_id):
     # Récupérer les professions
     cursor.execute("""
         SELECT DISTINCT jobName FROM professions WHERE pid = ?
-    """, (person_id,))
+    """, (cle_identifiant(person_id, 'nm'),))
     person['professions'] = [row['jobName'] for row in cursor.fetchall()]
     
     conn.close()
@@ -552,7 +1004,7 @@ def get_person_filmography(person_id):
         LEFT JOIN ratings r ON m.mid = r.mid
         WHERE pr.pid = ?
         ORDER BY m.startYear DESC NULLS LAST
-    """, (person_id,))
+    """, (cle_identifiant(person_id, 'nm'),))
     
     # Grouper par catégorie
     filmography = {}
@@ -562,7 +1014,7 @@ def get_person_filmography(person_id):
             filmography[category] = []
         
         filmography[category].append({
-            'mid': row['mid'],
+            'mid': mid_texte(row['mid']),
             'primaryTitle': row['primaryTitle'],
             'startYear': row['startYear'],
             'runtimeMinutes': row['runtimeMinutes'],
@@ -573,3 +1025,95 @@ def get_person_filmography(person_id):
     
     conn.close()
     return filmography
+
+
+def get_series_detail(series_id):
+    """
+    Récupère une série et l'arbre saisons / épisodes avec les notes par saison.
+    Les épisodes sont lus en un seul parcours de l'index idx_episodes_parent,
+    qui les renvoie déjà triés par saison puis par numéro d'épisode.
+    
+    Args:
+        series_id: ID de la série (ex: 'tt0903747')
+    
+    Returns:
+        dict: Série avec la liste 'seasons' (épisodes + agrégats) ou None
+    """
+    conn = get_sqlite_connection()
+    cursor = conn.cursor()
+    cle = cle_identifiant(series_id, 'tt')
+    
+    cursor.execute("""
+        SELECT m.mid, m.titleType, m.primaryTitle, m.startYear, m.endYear,
+               r.averageRating, r.numVotes
+        FROM movies m
+        LEFT JOIN ratings r ON m.mid = r.mid
+        WHERE m.mid = ?
+    """, (cle,))
+    
+    row = cursor.fetchone()
+    if not row:
+        conn.close()
+        return None
+    
+    series = {
+        'mid': mid_texte(row['mid']),
+        'titleType': row['titleType'],
+        'primaryTitle': row['primaryTitle'],
+        'startYear': row['startYear'],
+        'endYear': row['endYear'],
+        'averageRating': row['averageRating'],
+        'numVotes': row['numVotes'],
+    }
+    
+    cursor.execute("""
+        SELECT e.seasonNumber, e.episodeNumber, e.mid,
+               m.primaryTitle, m.startYear, r.averageRating, r.numVotes
+        FROM episodes e
+        JOIN movies m ON e.mid = m.mid
+        LEFT JOIN ratings r ON e.mid = r.mid
+        WHERE e.parentMid = ?
+        ORDER BY e.seasonNumber, e.episodeNumber
+    """, (cle,))
+    
+    # Regroupement par saison (les lignes arrivent triées, NULL en premier)
+    seasons = []
+    saison_courante = None
+    for row in cursor.fetchall():
+        if saison_courante is None or saison_courante['number'] != row['seasonNumber']:
+            saison_courante = {'number': row['seasonNumber'], 'episodes': []}
+            seasons.append(saison_courante)
+        saison_courante['episodes'].append({
+            'mid': mid_texte(row['mid']),
+            'episodeNumber': row['episodeNumber'],
+            'primaryTitle': row['primaryTitle'],
+            'startYear': row['startYear'],
+            'averageRating': row['averageRating'],
+            'numVotes': row['numVotes'],
+        })
+    
+    conn.close()
+    
+    # Agrégats par saison : moyenne pondérée par les votes, total des votes, meilleur épisode
+    for saison in seasons:
+        notes = [ep for ep in saison['episodes'] if ep['averageRating'] is not None]
+        votes = sum(ep['numVotes'] or 0 for ep in notes)
+        saison['episode_count'] = len(saison['episodes'])
+        saison['rated_count'] = len(notes)
+        saison['total_votes'] = votes
+        if votes:
+            saison['average_rating'] = round(
+                sum(ep['averageRating'] * (ep['numVotes'] or 0) for ep in notes) / votes, 2)
+        elif notes:
+            saison['average_rating'] = round(sum(ep['averageRating'] for ep in notes) / len(notes), 2)
+        else:
+            saison['average_rating'] = None
+        saison['best_episode'] = max(notes, key=lambda ep: (ep['averageRating'], ep['numVotes'] or 0)) if notes else None
+    
+    # Épisodes sans numéro de saison affichés en dernier
+    if seasons and seasons[0]['number'] is None:
+        seasons.append(seasons.pop(0))
+    
+    series['seasons'] = seasons
+    series['episode_count'] = sum(s['episode_count'] for s in seasons)
+    return series
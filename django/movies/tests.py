@@ -1,3 +1,357 @@
-from django.test import TestCase
+"""
+Tests des calculs NumPy précalculés hors ligne, comparés à une version naïve en Python
+sur une petite base IMDb synthétique (films, genres, notes, réalisateurs, scénaristes, casting),
+et des modes d'import de scripts/phase1_sqlite/import_data.py entre eux.
 
-# Create your tests here.
+    python manage.py test movies
+"""
+
+import csv
+import io
+import math
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from movies import sqlite_service  # noqa: F401 (met scripts/phase1_sqlite dans sys.path)
+from movies.graphe_service import GrapheCollaborations, construire_graphe
+from movies.recommandation_service import (
+    POIDS_TYPES as POIDS_RECOMMANDATION, REQUETES_CARACTERISTIQUES, ModeleRecommandation, construire_modele,
+)
+
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scripts' / 'phase2_mongodb'))
+from similarites import POIDS_TYPES as POIDS_SIMILARITE, calculer_similaires  # noqa: E402
+from create_schema import creer_tables  # noqa: E402
+from generer_donnees import Generateur  # noqa: E402
+from import_data import ORDRE_INSERTION, import_bulk, import_complet, import_streaming  # noqa: E402
+
+GENRES = ['Drama', 'Comedy', 'Action', 'Thriller', 'Romance', 'Horror', 'Documentary', 'Animation']
+
+
+def creer_base_synthetique(chemin, nb_films=400, nb_personnes=300, graine=7):
+    """
+    Petite base au schéma texte de create_schema.py (colonnes utilisées par les calculs seulement).
+    Activité des personnes très inégale (quelques personnes dans beaucoup de films), films sans note
+    ou avec peu de votes, une chaîne de films accrochée au reste (longs chemins de collaboration)
+    et un petit groupe de films isolé du reste (personnes sans lien commun).
+
+    Returns:
+        str: Chemin de la base créée
+    """
+    aleatoire = random.Random(graine)
+    conn = sqlite3.connect(chemin)
+    conn.executescript("""
+        CREATE TABLE movies (mid TEXT PRIMARY KEY, titleType TEXT, primaryTitle TEXT, startYear INTEGER);
+        CREATE TABLE ratings (mid TEXT PRIMARY KEY, averageRating REAL, numVotes INTEGER);
+        CREATE TABLE genres (mid TEXT, genre TEXT, PRIMARY KEY (mid, genre));
+        CREATE TABLE persons (pid TEXT PRIMARY KEY, primaryName TEXT);
+        CREATE TABLE directors (mid TEXT, pid TEXT, PRIMARY KEY (mid, pid));
+        CREATE TABLE writers (mid TEXT, pid TEXT, PRIMARY KEY (mid, pid));
+        CREATE TABLE principals (mid TEXT, ordering INTEGER, pid TEXT, category TEXT,
+                                 PRIMARY KEY (mid, ordering, pid, category));
+    """)
+    personnes = [f"nm{numero:07d}" for numero in range(1, nb_personnes + 1)]
+    # Poids d'activité décroissants : les premières personnes tournent beaucoup plus
+    activite = [1 / (rang + 1) ** 0.8 for rang in range(len(personnes))]
+    conn.executemany("INSERT INTO persons VALUES (?, ?)",
+                     [(pid, f"Personne {pid[2:]}") for pid in personnes])
+    isoles = [f"nm{numero:07d}" for numero in range(900001, 900005)]
+    conn.executemany("INSERT INTO persons VALUES (?, ?)", [(pid, f"Isolé {pid[2:]}") for pid in isoles])
+
+    for numero in range(1, nb_films + 1):
+        mid = f"tt{numero * 3:07d}"
+        conn.execute("INSERT INTO movies VALUES (?, 'movie', ?, ?)",
+                     (mid, f"Film {numero}", aleatoire.choice([None] + list(range(1950, 2025)))))
+        if aleatoire.random() < 0.85:
+            conn.execute("INSERT INTO ratings VALUES (?, ?, ?)",
+                         (mid, round(aleatoire.uniform(2, 9), 1), int(aleatoire.lognormvariate(6, 1.5))))
+        for genre in aleatoire.sample(GENRES, aleatoire.randint(0, 3)):
+            conn.execute("INSERT INTO genres VALUES (?, ?)", (mid, genre))
+        equipe = set()
+        while len(equipe) < aleatoire.randint(3, 7):
+            equipe.add(aleatoire.choices(personnes, activite)[0])
+        equipe = sorted(equipe)
+        conn.execute("INSERT INTO directors VALUES (?, ?)", (mid, equipe[0]))
+        conn.execute("INSERT INTO writers VALUES (?, ?)", (mid, equipe[-1]))
+        for ordre, pid in enumerate(equipe, start=1):
+            categorie = aleatoire.choice(['actor', 'actress', 'actor', 'producer', 'director'])
+            conn.execute("INSERT INTO principals VALUES (?, ?, ?, ?)", (mid, ordre, pid, categorie))
+
+    # Chaîne de films qui part du premier film : chemins de 10 degrés et plus
+    chaine = [f"nm{numero:07d}" for numero in range(800001, 800011)]
+    conn.executemany("INSERT INTO persons VALUES (?, ?)", [(pid, f"Chaîne {pid[2:]}") for pid in chaine])
+    conn.execute("INSERT INTO principals VALUES ('tt0000003', 99, ?, 'actor')", (chaine[0],))
+    for numero, (premier, second) in enumerate(zip(chaine, chaine[1:]), start=1):
+        mid = f"tt{8000000 + numero:07d}"
+        conn.execute("INSERT INTO movies VALUES (?, 'movie', ?, 2010)", (mid, f"Film chaîne {numero}"))
+        conn.execute("INSERT INTO principals VALUES (?, 1, ?, 'actor')", (mid, premier))
+        conn.execute("INSERT INTO principals VALUES (?, 2, ?, 'actress')", (mid, second))
+
+    # Deux films reliés entre eux seulement
+    for numero, (premier, second) in enumerate([isoles[:2], isoles[1:3]], start=1):
+        mid = f"tt{9000000 + numero:07d}"
+        conn.execute("INSERT INTO movies VALUES (?, 'movie', ?, 2000)", (mid, f"Film isolé {numero}"))
+        conn.execute("INSERT INTO principals VALUES (?, 1, ?, 'actor')", (mid, premier))
+        conn.execute("INSERT INTO principals VALUES (?, 2, ?, 'actress')", (mid, second))
+    conn.commit()
+    conn.close()
+    return chemin
+
+
+def caracteristiques_films(conn, requetes):
+    """
+    Caractéristiques (type, valeur) de chaque film, calculées naïvement.
+
+    Returns:
+        dict: {mid: set de (type, valeur)}
+    """
+    caracteristiques = {mid: set() for (mid,) in conn.execute("SELECT mid FROM movies")}
+    for type_caracteristique, requete in requetes.items():
+        for mid, valeur in conn.execute(requete):
+            if mid in caracteristiques and valeur is not None:
+                caracteristiques[mid].add((type_caracteristique, valeur))
+    return caracteristiques
+
+
+def poids_idf(caracteristiques, poids_types):
+    """Poids de chaque caractéristique : poids de son type × log(N / nb de films qui l'ont)"""
+    df = {}
+    for valeurs in caracteristiques.values():
+        for cle in valeurs:
+            df[cle] = df.get(cle, 0) + 1
+    return {cle: poids_types[cle[0]] * math.log(len(caracteristiques) / nb) for cle, nb in df.items()}
+
+
+class BaseSynthetiqueMixin:
+    """Base synthétique créée une fois par classe de tests dans un dossier temporaire"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dossier = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.dossier.cleanup)
+        cls.db_path = creer_base_synthetique(str(Path(cls.dossier.name) / 'imdb.db'))
+        cls.conn = sqlite3.connect(cls.db_path)
+        cls.addClassCleanup(cls.conn.close)
+
+
+class SimilairesTests(BaseSynthetiqueMixin, SimpleTestCase):
+    """Films similaires de scripts/phase2_mongodb/similarites.py contre un Jaccard pondéré naïf"""
+
+    K = 5
+    VOTES_MIN = 100
+
+    def jaccard_naif(self):
+        """Scores de tous les couples (film, film candidat) avec au moins une caractéristique commune"""
+        requetes = {
+            'genre': "SELECT mid, genre FROM genres",
+            'realisateur': "SELECT mid, pid FROM directors",
+            'acteur': "SELECT mid, pid FROM principals WHERE category IN ('actor', 'actress')",
+        }
+        caracteristiques = caracteristiques_films(self.conn, requetes)
+        poids = poids_idf(caracteristiques, POIDS_SIMILARITE)
+        total = {mid: sum(poids[cle] for cle in valeurs) for mid, valeurs in caracteristiques.items()}
+        candidats = {mid for mid, note, votes in self.conn.execute("SELECT mid, averageRating, numVotes FROM ratings")
+                     if note is not None and votes >= self.VOTES_MIN}
+        scores = {}
+        for source, valeurs in caracteristiques.items():
+            for cible in candidats:
+                commun = sum(poids[cle] for cle in valeurs & caracteristiques[cible])
+                if cible != source and commun > 0:
+                    scores[source, cible] = commun / (total[source] + total[cible] - commun)
+        return scores
+
+    def test_top_k_egal_au_calcul_naif(self):
+        # Lots de 64 films : les frontières de lots sont aussi vérifiées
+        donnees, resultats, _ = calculer_similaires(self.conn, k=self.K, votes_min=self.VOTES_MIN, taille_lot=64)
+        mids = [ligne[0] for ligne in donnees['films']]
+        naifs = self.jaccard_naif()
+        par_source = {}
+        for (source, cible), score in naifs.items():
+            par_source.setdefault(source, []).append(score)
+
+        self.assertTrue(resultats)
+        for i, mid in enumerate(mids):
+            attendus = sorted(par_source.get(mid, []), reverse=True)[:self.K]
+            obtenus = resultats.get(i, [])
+            with self.subTest(film=mid):
+                # Même liste de scores (à égalité de score, le film retenu peut différer)
+                self.assertEqual(len(obtenus), len(attendus))
+                for (cible, score), attendu in zip(obtenus, attendus):
+                    self.assertAlmostEqual(score, attendu, places=9)
+                    self.assertAlmostEqual(score, naifs[mid, mids[cible]], places=9)
+
+
+class RecommandationsTests(BaseSynthetiqueMixin, SimpleTestCase):
+    """recommandation_service.ModeleRecommandation.recommander contre un cosinus dense naïf"""
+
+    VOTES_MIN = 100
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        construire_modele(cls.db_path, cls.dossier.name, votes_min=cls.VOTES_MIN)
+        cls.modele = ModeleRecommandation(cls.dossier.name)
+
+    def vecteurs_naifs(self):
+        """Vecteur TF-IDF normalisé de chaque film : {mid: {caractéristique: valeur}}"""
+        caracteristiques = caracteristiques_films(self.conn, REQUETES_CARACTERISTIQUES)
+        poids = poids_idf(caracteristiques, POIDS_RECOMMANDATION)
+        vecteurs = {}
+        for mid, valeurs in caracteristiques.items():
+            norme = math.sqrt(sum(poids[cle] ** 2 for cle in valeurs)) or 1
+            vecteurs[mid] = {cle: poids[cle] / norme for cle in valeurs}
+        return vecteurs
+
+    def test_recommandations_egales_au_cosinus_dense(self):
+        vecteurs = self.vecteurs_naifs()
+        votes = {mid: nb for mid, nb in self.conn.execute("SELECT mid, numVotes FROM ratings")}
+        recommandables = [mid for mid, nb in votes.items() if nb >= self.VOTES_MIN]
+
+        def cosinus(a, b):
+            return sum(valeur * vecteurs[b].get(cle, 0) for cle, valeur in vecteurs[a].items())
+
+        aleatoire = random.Random(3)
+        films = sorted(vecteurs)
+        for essai in range(40):
+            aimes = aleatoire.sample(films, aleatoire.randint(1, 4))
+            with self.subTest(aimes=aimes):
+                scores = {mid: sum(cosinus(aime, mid) for aime in aimes)
+                          for mid in recommandables if mid not in aimes}
+                attendus = sorted((score for score in scores.values() if score > 0), reverse=True)[:10]
+                reconnus, recommandations = self.modele.recommander(aimes, n=10)
+
+                self.assertEqual([film['id'] for film in reconnus], aimes)
+                self.assertEqual(len(recommandations), len(attendus))
+                for recommandation, attendu in zip(recommandations, attendus):
+                    # Scores arrondis à 4 décimales, valeurs du modèle en float32
+                    self.assertAlmostEqual(recommandation['score'], attendu, delta=2e-4)
+                    self.assertAlmostEqual(recommandation['score'], scores[recommandation['id']], delta=2e-4)
+                    # Attribuée au film aimé qui contribue le plus au score
+                    contributions = {aime: cosinus(aime, recommandation['id']) for aime in aimes}
+                    self.assertGreaterEqual(contributions[recommandation['because']['id']] + 1e-5,
+                                            max(contributions.values()))
+
+
+class GrapheCollaborationsTests(BaseSynthetiqueMixin, SimpleTestCase):
+    """graphe_service.GrapheCollaborations contre un parcours en largeur Python sur les mêmes liens"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        construire_graphe(cls.db_path, cls.dossier.name)
+        cls.graphe = GrapheCollaborations(cls.dossier.name)
+        cls.films_de, cls.personnes_de = {}, {}
+        for table in ('principals', 'directors', 'writers'):
+            for mid, pid in cls.conn.execute(f"SELECT mid, pid FROM {table}"):
+                cls.films_de.setdefault(pid, set()).add(mid)
+                cls.personnes_de.setdefault(mid, set()).add(pid)
+
+    def distances(self, depart):
+        """Distances de collaboration depuis une personne (parcours en largeur naïf)"""
+        distances, frontiere = {depart: 0}, [depart]
+        while frontiere:
+            suivante = []
+            for pid in frontiere:
+                for mid in self.films_de[pid]:
+                    for autre in self.personnes_de[mid]:
+                        if autre not in distances:
+                            distances[autre] = distances[pid] + 1
+                            suivante.append(autre)
+            frontiere = suivante
+        return distances
+
+    def test_chemin_egal_au_parcours_naif(self):
+        aleatoire = random.Random(5)
+        personnes = sorted(self.films_de)
+        couples = [aleatoire.sample(personnes, 2) for _ in range(150)]
+        couples += [(aleatoire.choice(personnes), f"nm{numero:07d}") for numero in range(800001, 800011)]
+        couples += [(personnes[0], 'nm0900001'), ('nm0900001', 'nm0900003'), (personnes[1], personnes[1])]
+        for depart, arrivee in couples:
+            with self.subTest(depart=depart, arrivee=arrivee):
+                attendu = self.distances(depart).get(arrivee)
+                resultat = self.graphe.chemin(self.graphe.indice(depart), self.graphe.indice(arrivee))
+                if attendu is None:
+                    self.assertIsNone(resultat)
+                    continue
+                self.assertEqual(resultat['degrees'], attendu)
+                chemin = resultat['path']
+                self.assertEqual(len(chemin), 2 * attendu + 1)
+                self.assertEqual((chemin[0]['id'], chemin[-1]['id']), (depart, arrivee))
+                # Chaque film du chemin relie les deux personnes qui l'entourent
+                for k in range(1, len(chemin), 2):
+                    self.assertEqual(chemin[k]['type'], 'movie')
+                    self.assertIn(chemin[k - 1]['id'], self.personnes_de[chemin[k]['id']])
+                    self.assertIn(chemin[k + 1]['id'], self.personnes_de[chemin[k]['id']])
+
+    def test_voisinage_et_collaborateurs_egaux_au_calcul_naif(self):
+        for pid in sorted(self.films_de)[::7]:
+            with self.subTest(personne=pid):
+                distances = self.distances(pid)
+                attendus = [sum(1 for d in distances.values() if d == niveau) for niveau in (1, 2, 3)]
+                self.assertEqual(self.graphe.voisinage(self.graphe.indice(pid), 3), attendus)
+
+                communs = {}
+                for mid in self.films_de[pid]:
+                    for autre in self.personnes_de[mid] - {pid}:
+                        communs[autre] = communs.get(autre, 0) + 1
+                attendus = sorted(communs.items(), key=lambda item: (-item[1], item[0]))[:5]
+                obtenus = self.graphe.collaborateurs(self.graphe.indice(pid), 5)
+                self.assertEqual([(c['id'], c['films']) for c in obtenus], attendus)
+
+
+class ModesImportTests(SimpleTestCase):
+    """Mêmes lignes importées par import_data.py quel que soit le mode (complet, streaming, bulk)"""
+
+    # Lignes ajoutées aux CSV générés, avec une colonne de clé primaire vide (en double exprès)
+    LIGNES_CLE_INCOMPLETE = {
+        'characters': ['tt{mid},nm{pid},', 'tt{mid},nm{pid},'],
+        'principals': ['tt{mid},1,nm{pid},', 'tt{mid},1,nm{pid},'],
+        'genres': ['tt{mid},', 'tt{mid},'],
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dossier = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.dossier.cleanup)
+        cls.chemin_csv = str(Path(cls.dossier.name) / 'csv') + os.sep
+        Generateur(0.002, cls.chemin_csv, graine=11).generer()
+        with open(cls.chemin_csv + 'principals.csv', encoding='utf-8') as fichier:
+            mid, _, pid = next(csv.reader(list(fichier)[1:]))[:3]
+        for table, lignes in cls.LIGNES_CLE_INCOMPLETE.items():
+            with open(cls.chemin_csv + f'{table}.csv', 'a', encoding='utf-8') as fichier:
+                for ligne in lignes:
+                    fichier.write(ligne.format(mid=mid[2:], pid=pid[2:]) + '\n')
+
+    def importer(self, mode):
+        """Importe les CSV dans une base neuve avec un mode ; retourne {table: nombre de lignes}"""
+        conn = sqlite3.connect(str(Path(self.dossier.name) / f'{mode}.db'))
+        self.addCleanup(conn.close)
+        conn.execute("PRAGMA foreign_keys = ON")
+        creer_tables(conn)
+        stats = {'succes': {}, 'erreurs': 0, 'filtrees': {}}
+        with redirect_stdout(io.StringIO()):
+            if mode == 'bulk':
+                import_bulk(conn, self.chemin_csv, stats, cache_mo=16, index_secondaires=False)
+            elif mode == 'streaming':
+                import_streaming(conn, self.chemin_csv, stats, chunksize=500)
+            else:
+                import_complet(conn, self.chemin_csv, stats)
+        self.assertEqual(stats['erreurs'], 0)
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ORDRE_INSERTION}
+
+    def test_lignes_a_cle_incomplete_gardees_dans_tous_les_modes(self):
+        attendus = self.importer('complet')
+        for table in self.LIGNES_CLE_INCOMPLETE:
+            self.assertGreater(attendus[table], 0)
+        for mode in ('streaming', 'bulk'):
+            with self.subTest(mode=mode):
+                self.assertEqual(self.importer(mode), attendus)
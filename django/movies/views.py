@@ -5,8 +5,11 @@ Vues Django pour l'application CineExplorer.
 Gère les 5 pages principales : accueil, liste, détail, recherche, statistiques.
 """
 
+import asyncio
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
-from django.http import Http404
+from django.http import Http404, JsonResponse
 
 # Import des services (SQLite et MongoDB)
 from .mongo_service import (
@@ -14,7 +17,9 @@ from .mongo_service import (
     get_movie_detail_mongo, 
     get_similar_movies,
     get_top_movies as get_top_movies_mongo,
-    get_random_movies
+    get_random_movies,
+    get_pool_stats,
+    get_cache_films_stats
 )
 from .sqlite_service import (
     get_sqlite_stats,
@@ -25,13 +30,43 @@ from .sqlite_service import (
     search_movies,
     search_persons,
     get_genre_stats,
-    get_decade_stats,
-    get_rating_distribution,
+    get_stats_snapshot,
+    get_movie_distributions,
+    LARGEURS_TRANCHES_NOTES,
+    largeur_tranche_notes,
     get_top_actors,
     get_person_detail,
-    get_person_filmography
+    get_person_filmography,
+    get_series_detail
+)
+from .autocomplete_service import autocomplete
+from .recommandation_service import recommander
+from .graphe_service import degres_separation, reseau_personne
+from .chargement_parallele import charger, charger_async, en_thread, entete_server_timing
+from .mongo_async import (
+    get_movie_detail_async,
+    get_similar_movies_async,
+    get_top_movies_async,
+    get_random_movies_async
 )
 
+# Films similaires affichés sur la page d'un film
+NB_FILMS_SIMILAIRES = 6
+
+
+def top_movies_sqlite(limit=10):
+    """
+    Repli SQLite du top des films de l'accueil, au format des documents MongoDB
+    (id, title, year, rating.average, rating.votes, genres) attendu par index.html.
+    """
+    return [{
+        'id': movie['mid'],
+        'title': movie['primaryTitle'],
+        'year': movie['startYear'],
+        'rating': {'average': movie['averageRating'], 'votes': movie['numVotes']},
+        'genres': [],
+    } for movie in get_top_rated_movies(limit=limit)]
+
 
 def home(request):
     """
@@ -43,29 +78,26 @@ def home(request):
     - Films aléatoires (sélection du jour)
     
     Base utilisée : SQLite pour les stats, MongoDB pour top films et aléatoires
+    Les trois appels sont indépendants : ils sont lancés en parallèle (chargement_parallele)
     """
-    # Statistiques globales depuis SQLite (plus rapide pour les COUNT)
-    stats = get_global_stats()
-    
-    # Top 10 films - essayer MongoDB d'abord, sinon SQLite
-    try:
-        top_movies = get_top_movies_mongo(limit=10)
-    except Exception:
-        # Fallback sur SQLite si MongoDB échoue
-        top_movies = get_top_rated_movies(limit=10)
-    
-    # Films aléatoires depuis MongoDB (utilise $sample)
-    try:
-        random_movies = get_random_movies(limit=6)
-    except Exception:
-        random_movies = []
+    donnees, temps = charger({
+        # Statistiques globales depuis l'instantané SQLite calculé à l'import
+        'stats': (get_global_stats, dict),
+        # Top 10 films - MongoDB d'abord, repli sur SQLite si MongoDB échoue ou ne répond pas
+        'top_movies': (lambda: get_top_movies_mongo(limit=10), lambda: top_movies_sqlite(limit=10)),
+        # Films aléatoires depuis MongoDB (utilise $sample)
+        'random_movies': (lambda: get_random_movies(limit=6), list),
+    })
     
     context = {
-        'stats': stats,
-        'top_movies': top_movies,
-        'random_movies': random_movies,
+        'stats': donnees['stats'],
+        'snapshot_date': get_stats_snapshot()['date_calcul'],
+        'top_movies': donnees['top_movies'],
+        'random_movies': donnees['random_movies'],
     }
-    return render(request, 'movies/index.html', context)
+    response = render(request, 'movies/index.html', context)
+    response['Server-Timing'] = entete_server_timing(temps)
+    return response
 
 
 def movie_list(request):
@@ -77,9 +109,17 @@ def movie_list(request):
     - Tri : titre, année, note (ASC/DESC)
     
     Base utilisée : SQLite (requêtes relationnelles efficaces pour les filtres)
+    Pagination par clé : les liens portent le curseur de la page courante
+    (after / before), les totaux sont en cache jusqu'au prochain import.
     """
+    per_page = 20
+    
     # Récupérer les paramètres de filtrage
-    page = int(request.GET.get('page', 1))
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        skip = max(int(request.GET.get('skip', 0)), 0)
+    except ValueError:
+        page, skip = 1, 0
     genre = request.GET.get('genre', '')
     year_min = request.GET.get('year_min', '')
     year_max = request.GET.get('year_max', '')
@@ -90,13 +130,17 @@ def movie_list(request):
     # Récupérer la liste des films depuis SQLite
     result = get_movies_list(
         page=page,
-        per_page=20,
+        per_page=per_page,
         genre=genre if genre else None,
         year_min=year_min if year_min else None,
         year_max=year_max if year_max else None,
         rating_min=rating_min if rating_min else None,
         sort_by=sort_by,
-        sort_order=sort_order
+        sort_order=sort_order,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        skip=min(skip, 4 * per_page),
+        last=request.GET.get('last') == '1'
     )
     
     # Récupérer la liste des genres pour le filtre
@@ -109,7 +153,21 @@ def movie_list(request):
     # Afficher 5 pages autour de la page courante
     start_page = max(1, current_page - 2)
     end_page = min(total_pages, current_page + 2)
-    page_range = range(start_page, end_page + 1)
+    
+    # Paramètres de pagination de chaque lien : les pages voisines sont lues
+    # à partir du curseur de la page courante (quelques lignes sautées au plus)
+    def page_params(num):
+        if num == 1:
+            return "page=1"
+        if num == total_pages:
+            return f"page={num}&last=1"
+        if num > current_page and result['last_cursor']:
+            return f"page={num}&after={result['last_cursor']}&skip={(num - current_page - 1) * per_page}"
+        if num < current_page and result['first_cursor']:
+            return f"page={num}&before={result['first_cursor']}&skip={(current_page - num - 1) * per_page}"
+        return f"page={num}"
+    
+    page_range = [(num, page_params(num)) for num in range(start_page, end_page + 1)]
     
     context = {
         'movies': result['movies'],
@@ -119,8 +177,10 @@ def movie_list(request):
         'page_range': page_range,
         'has_previous': current_page > 1,
         'has_next': current_page < total_pages,
-        'previous_page': current_page - 1,
-        'next_page': current_page + 1,
+        'first_params': page_params(1),
+        'previous_params': page_params(current_page - 1),
+        'next_params': page_params(current_page + 1),
+        'last_params': page_params(total_pages),
         'genres': genres,
         # Conserver les filtres actuels
         'current_filters': {
@@ -143,9 +203,11 @@ def movie_detail(request, movie_id):
     - Casting complet avec personnages
     - Réalisateurs et scénaristes
     - Titres alternatifs par région
-    - Films similaires (même genre/réalisateur)
+    - Films similaires (genres, réalisateurs et acteurs en commun)
     
     Base utilisée : MongoDB (collection movies_complete, document pré-agrégé)
+    Les films similaires sont précalculés dans le document (scripts/phase2_mongodb/similarites.py),
+    sinon recherchés par genre.
     """
     # Récupérer le film depuis MongoDB (document complet)
     movie = get_movie_detail_mongo(movie_id)
@@ -153,13 +215,13 @@ def movie_detail(request, movie_id):
     if not movie:
         raise Http404("Film non trouvé")
     
-    # Récupérer les films similaires (basés sur les genres)
-    similar_movies = []
-    if movie.get('genres'):
+    # Films similaires précalculés (même document), sinon recherche par genre
+    similar_movies = (movie.get('similaires') or [])[:NB_FILMS_SIMILAIRES]
+    if 'similaires' not in movie and movie.get('genres'):
         similar_movies = get_similar_movies(
             movie_id, 
             movie['genres'][:2],  # Utiliser les 2 premiers genres
-            limit=6
+            limit=NB_FILMS_SIMILAIRES
         )
     
     context = {
@@ -177,7 +239,7 @@ def search(request):
     - Résultats de recherche par nom de personne
     - Résultats groupés par type
     
-    Base utilisée : SQLite (LIKE - simple et suffisant)
+    Base utilisée : SQLite (index plein texte FTS5, classement bm25 + popularité)
     """
     query = request.GET.get('q', '').strip()
     
@@ -208,41 +270,141 @@ def search(request):
     return render(request, 'movies/search.html', context)
 
 
+def autocomplete_api(request):
+    """
+    Autocomplétion de la barre de recherche (/api/autocomplete/?q=...&k=...)
+    Retourne en JSON les films et personnes dont le titre / nom commence par la saisie,
+    classés par popularité (votes ou nombre de films).
+    
+    Base utilisée : index de préfixes en mémoire (construit depuis SQLite)
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        k = min(max(int(request.GET.get('k', 10)), 1), 20)
+    except ValueError:
+        k = 10
+    
+    results = autocomplete(query, k) if query else []
+    return JsonResponse({'query': query, 'results': results})
+
+
+def recommandations_api(request):
+    """
+    Recommandations « parce que vous avez aimé X » (/api/recommandations/?films=tt0111161,tt0068646&n=10)
+    Retourne en JSON les films les plus proches des films aimés (genres, décennie, réalisateurs,
+    scénaristes, casting), chacun avec le film aimé qui l'explique le mieux.
+    
+    Base utilisée : modèle précalculé depuis SQLite (construire_recommandations)
+    """
+    films = [film.strip() for film in request.GET.get('films', '').split(',') if film.strip()]
+    try:
+        n = min(max(int(request.GET.get('n', 10)), 1), 50)
+    except ValueError:
+        n = 10
+    
+    resultat = recommander(films, n) if films else ([], [])
+    if resultat is None:
+        return JsonResponse({'erreur': "Modèle de recommandation absent : lancer "
+                                       "python manage.py construire_recommandations"}, status=503)
+    aimes, recommandations = resultat
+    return JsonResponse({'liked': aimes, 'results': recommandations})
+
+
+def graphe_chemin_api(request):
+    """
+    Degrés de séparation entre deux personnes (/api/graphe/chemin/?de=nm0000102&a=nm0000158)
+    Retourne en JSON le nombre de degrés et la chaîne personne, film, personne... qui les relie.
+    
+    Base utilisée : graphe des collaborations précalculé depuis SQLite (construire_graphe)
+    """
+    resultat = degres_separation(request.GET.get('de', '').strip(), request.GET.get('a', '').strip())
+    if resultat is None:
+        return JsonResponse({'erreur': "Graphe des collaborations absent : lancer "
+                                       "python manage.py construire_graphe"}, status=503)
+    if resultat['from'] is None or resultat['to'] is None:
+        return JsonResponse(dict(resultat, erreur="Personne inconnue du graphe"), status=404)
+    return JsonResponse(resultat)
+
+
+def graphe_personne_api(request, person_id):
+    """
+    Réseau de collaborations d'une personne (/api/graphe/nm0000102/?k=2&n=10)
+    Retourne en JSON le nombre de personnes à 1..k collaborations et les n principaux collaborateurs.
+    
+    Base utilisée : graphe des collaborations précalculé depuis SQLite (construire_graphe)
+    """
+    try:
+        k = min(max(int(request.GET.get('k', 2)), 1), 3)
+        n = min(max(int(request.GET.get('n', 10)), 1), 50)
+    except ValueError:
+        k, n = 2, 10
+    
+    resultat = reseau_personne(person_id, k, n)
+    if resultat is None:
+        return JsonResponse({'erreur': "Graphe des collaborations absent : lancer "
+                                       "python manage.py construire_graphe"}, status=503)
+    if resultat['person'] is None:
+        return JsonResponse(dict(resultat, erreur="Personne inconnue du graphe"), status=404)
+    return JsonResponse(resultat)
+
+
+def mongo_pool_api(request):
+    """
+    Supervision du pool de connexions MongoDB du processus (/api/mongo-pool/)
+    Retourne en JSON les compteurs de checkouts, attentes et connexions ouvertes.
+    """
+    return JsonResponse(get_pool_stats())
+
+
+def cache_films_api(request):
+    """
+    Supervision du cache des documents de films du processus (/api/cache-films/)
+    Retourne en JSON les hits, misses, évictions et la taille occupée en octets.
+    """
+    return JsonResponse(get_cache_films_stats())
+
+
 def stats(request):
     """
     Page de statistiques (/stats/)
     Affiche :
     - Films par genre (bar chart)
     - Films par décennie (line chart)
-    - Distribution des notes (histogram)
+    - Distribution des notes (histogram, largeur de tranche ?largeur=0.5)
     - Top 10 acteurs prolifiques
     - Statistiques des bases de données
     
-    Base utilisée : SQLite (agrégations SQL efficaces)
+    Base utilisée : SQLite (instantané des agrégations calculé à l'import)
+    Les appels SQLite et MongoDB sont lancés en parallèle (chargement_parallele)
     """
-    # Statistiques pour les graphiques
-    genre_stats = get_genre_stats()
-    decade_stats = get_decade_stats()
-    rating_distribution = get_rating_distribution()
-    top_actors = get_top_actors(limit=10)
-    
-    # Statistiques des bases de données
-    sqlite_stats = get_sqlite_stats()
-    
-    try:
-        mongo_stats = get_mongo_stats()
-    except Exception:
-        mongo_stats = {'collections': [], 'collection_counts': {}, 'total_size_mb': 0}
+    largeur = largeur_tranche_notes(request.GET.get('largeur'))
+    donnees, temps = charger({
+        # Statistiques pour les graphiques
+        'genre_stats': (get_genre_stats, dict),
+        # Décennies et histogramme des notes : un seul parcours de la table movies
+        'distributions': (lambda: get_movie_distributions(largeur),
+                          lambda: {'decades': {}, 'ratings': {}, 'largeur': largeur}),
+        'top_actors': (lambda: get_top_actors(limit=10), list),
+        # Statistiques des bases de données
+        'sqlite_stats': (get_sqlite_stats, lambda: {'tables': [], 'table_counts': {}, 'total_size_mb': 0}),
+        'mongo_stats': (get_mongo_stats, lambda: {'collections': [], 'collection_counts': {}, 'total_size_mb': 0}),
+    })
+    distributions = donnees['distributions']
     
     context = {
-        'genre_stats': genre_stats,
-        'decade_stats': decade_stats,
-        'rating_distribution': rating_distribution,
-        'top_actors': top_actors,
-        'sqlite_stats': sqlite_stats,
-        'mongo_stats': mongo_stats,
+        'genre_stats': donnees['genre_stats'],
+        'decade_stats': distributions['decades'],
+        'rating_distribution': distributions['ratings'],
+        'rating_bucket_width': distributions['largeur'],
+        'rating_bucket_widths': LARGEURS_TRANCHES_NOTES,
+        'top_actors': donnees['top_actors'],
+        'sqlite_stats': donnees['sqlite_stats'],
+        'mongo_stats': donnees['mongo_stats'],
+        'snapshot_date': get_stats_snapshot()['date_calcul'],
     }
-    return render(request, 'movies/stats.html', context)
+    response = render(request, 'movies/stats.html', context)
+    response['Server-Timing'] = entete_server_timing(temps)
+    return response
 
 
 def person_detail(request, person_id):
@@ -251,8 +413,10 @@ def person_detail(request, person_id):
     Affiche :
     - Informations personnelles (nom, dates, professions)
     - Filmographie complète groupée par rôle
+    - Réseau de collaborations et degrés de séparation avec GRAPHE_PERSONNE_REFERENCE
+      (ou la personne passée en ?vers=nm...)
     
-    Base utilisée : SQLite
+    Base utilisée : SQLite (graphe des collaborations précalculé, construire_graphe)
     """
     # Récupérer les détails de la personne
     person = get_person_detail(person_id)
@@ -279,9 +443,112 @@ def person_detail(request, person_id):
         if cat not in category_order:
             sorted_filmography.append((cat, films))
     
+    # Réseau de collaborations (None si le graphe n'est pas construit)
+    reseau = reseau_personne(person_id, k=2, n=8)
+    separation = None
+    vers = request.GET.get('vers', '').strip() or getattr(settings, 'GRAPHE_PERSONNE_REFERENCE', None)
+    if reseau and reseau['person'] and vers and vers != person_id:
+        separation = degres_separation(person_id, vers)
+    
     context = {
         'person': person,
         'filmography': sorted_filmography,
         'total_films': total_films,
+        'reseau': reseau,
+        'separation': separation,
+        'vers': vers,
     }
     return render(request, 'movies/person_detail.html', context)
+
+
+def series_detail(request, series_id):
+    """
+    Page d'une série (/series/<id>/)
+    Affiche :
+    - Informations de la série
+    - Saisons et épisodes avec note moyenne, votes et meilleur épisode par saison
+    
+    Base utilisée : SQLite
+    """
+    series = get_series_detail(series_id)
+    
+    if not series:
+        raise Http404("Série non trouvée")
+    
+    context = {
+        'series': series,
+    }
+    return render(request, 'movies/series_detail.html', context)
+
+
+# Vues asynchrones (servies en ASGI, voir VUES_ASYNC dans config/settings.py) :
+# MongoDB via AsyncMongoClient, SQLite dans les threads du pool des vues (en_thread)
+
+async def home_async(request):
+    """
+    Version asynchrone de home() : mêmes données, mêmes replis,
+    les appels MongoDB attendent sur la boucle d'événements au lieu de bloquer un thread.
+    """
+    donnees, temps = await charger_async({
+        'stats': (lambda: en_thread(get_global_stats), dict),
+        'top_movies': (lambda: get_top_movies_async(limit=10), lambda: top_movies_sqlite(limit=10)),
+        'random_movies': (lambda: get_random_movies_async(limit=6), list),
+    })
+    instantane = await en_thread(get_stats_snapshot)
+    
+    context = {
+        'stats': donnees['stats'],
+        'snapshot_date': instantane['date_calcul'],
+        'top_movies': donnees['top_movies'],
+        'random_movies': donnees['random_movies'],
+    }
+    response = render(request, 'movies/index.html', context)
+    response['Server-Timing'] = entete_server_timing(temps)
+    return response
+
+
+async def movie_detail_async(request, movie_id):
+    """Version asynchrone de movie_detail()"""
+    movie = await get_movie_detail_async(movie_id)
+    
+    if not movie:
+        raise Http404("Film non trouvé")
+    
+    # Films similaires précalculés (même document), sinon recherche par les 2 premiers genres
+    similar_movies = (movie.get('similaires') or [])[:NB_FILMS_SIMILAIRES]
+    if 'similaires' not in movie and movie.get('genres'):
+        similar_movies = await get_similar_movies_async(movie_id, movie['genres'][:2], limit=NB_FILMS_SIMILAIRES)
+    
+    context = {
+        'movie': movie,
+        'similar_movies': similar_movies,
+    }
+    return render(request, 'movies/movie_detail.html', context)
+
+
+async def search_async(request):
+    """Version asynchrone de search() : recherches de films et de personnes lancées ensemble"""
+    query = request.GET.get('q', '').strip()
+    
+    results = {
+        'movies': [],
+        'persons': [],
+        'total': 0
+    }
+    
+    if query and len(query) >= 2:
+        movies, persons = await asyncio.gather(
+            en_thread(search_movies, query, 20),
+            en_thread(search_persons, query, 20),
+        )
+        results = {
+            'movies': movies,
+            'persons': persons,
+            'total': len(movies) + len(persons)
+        }
+    
+    context = {
+        'query': query,
+        'results': results,
+    }
+    return render(request, 'movies/search.html', context)
@@ -0,0 +1,61 @@
+// Autocomplétion de la barre de recherche (/api/autocomplete/)
+const searchInput = document.getElementById('searchInput');
+const autocompleteResults = document.getElementById('autocompleteResults');
+let autocompleteTimer = null;
+let autocompleteRequest = 0;
+
+function clearAutocomplete() {
+    autocompleteResults.innerHTML = '';
+}
+
+function renderAutocomplete(results) {
+    clearAutocomplete();
+    results.forEach(result => {
+        const template = result.type === 'movie' ? searchInput.dataset.movieUrl : searchInput.dataset.personUrl;
+        const item = document.createElement('a');
+        item.className = 'list-group-item list-group-item-action';
+        item.href = template.replace('ID', result.id);
+
+        const icon = document.createElement('i');
+        icon.className = result.type === 'movie' ? 'bi bi-film me-2' : 'bi bi-person me-2';
+        item.appendChild(icon);
+        item.appendChild(document.createTextNode(result.label));
+        if (result.year) {
+            const year = document.createElement('small');
+            year.className = 'text-muted ms-1';
+            year.textContent = `(${result.year})`;
+            item.appendChild(year);
+        }
+        autocompleteResults.appendChild(item);
+    });
+}
+
+if (searchInput) {
+    searchInput.addEventListener('input', () => {
+        clearTimeout(autocompleteTimer);
+        const query = searchInput.value.trim();
+        if (query.length < 2) {
+            clearAutocomplete();
+            return;
+        }
+        // Petit délai pour ne pas envoyer une requête à chaque frappe
+        autocompleteTimer = setTimeout(() => {
+            const request = ++autocompleteRequest;
+            fetch(`${searchInput.dataset.autocompleteUrl}?q=${encodeURIComponent(query)}&k=8`)
+                .then(response => response.json())
+                .then(data => {
+                    // Ignorer les réponses arrivées après une saisie plus récente
+                    if (request === autocompleteRequest) {
+                        renderAutocomplete(data.results);
+                    }
+                })
+                .catch(clearAutocomplete);
+        }, 100);
+    });
+
+    document.addEventListener('click', event => {
+        if (!searchInput.form.contains(event.target)) {
+            clearAutocomplete();
+        }
+    });
+}
@@ -51,20 +51,20 @@ function initDecadeChart(labels, data) {
     });
 }
 
-function initRatingChart(labels, data) {
-    const ratingColors = [
-        'rgba(231, 76, 60, 0.6)',
-        'rgba(230, 126, 34, 0.6)',
-        'rgba(241, 196, 15, 0.6)',
-        'rgba(241, 196, 15, 0.6)',
-        'rgba(245, 215, 110, 0.6)',
-        'rgba(245, 215, 110, 0.6)',
-        'rgba(46, 204, 113, 0.6)',
-        'rgba(46, 204, 113, 0.6)',
-        'rgba(39, 174, 96, 0.6)',
-        'rgba(39, 174, 96, 0.6)',
-        'rgba(39, 174, 96, 0.6)'
-    ];
+// Couleur d'une tranche de notes selon sa borne inférieure (rouge -> vert)
+function ratingColor(note) {
+    if (note < 1) return 'rgba(231, 76, 60, 0.6)';
+    if (note < 2) return 'rgba(230, 126, 34, 0.6)';
+    if (note < 4) return 'rgba(241, 196, 15, 0.6)';
+    if (note < 6) return 'rgba(245, 215, 110, 0.6)';
+    if (note < 8) return 'rgba(46, 204, 113, 0.6)';
+    return 'rgba(39, 174, 96, 0.6)';
+}
+
+// bounds : borne inférieure de chaque tranche, width : largeur des tranches (0.5, 1, 2...)
+function initRatingChart(bounds, data, width) {
+    const decimals = Number.isInteger(width) ? 0 : 1;
+    const labels = bounds.map(b => `${b.toFixed(decimals)}-${(b + width).toFixed(decimals)}`);
 
     new Chart(document.getElementById('ratingChart'), {
         type: 'bar',
@@ -73,7 +73,7 @@ function initRatingChart(labels, data) {
             datasets: [{
                 label: 'Nombre de films',
                 data: data,
-                backgroundColor: ratingColors,
+                backgroundColor: bounds.map(ratingColor),
                 borderColor: chartColors.border,
                 borderWidth: 1
             }]
@@ -1,6 +1,36 @@
+#T1.4 : Benchmark des requêtes Q1-Q8 sans puis avec index
+#
+# La suite est déclarative (SUITE) : nom, fonction de queries.py et jeux de paramètres.
+# Chaque cas est exécuté `echauffement` fois sans mesure, puis `iterations` fois ;
+# on garde min, max, moyenne, écart-type, p50 / p95 / p99 et le nombre de lignes retournées.
+# Les résultats s'exportent en JSON ou CSV, et un export précédent sert de référence
+# (--comparer) pour signaler les requêtes dont le p50 a augmenté de plus de --seuil %.
+#
+# Modes de mesure (--modes) :
+# - froid : connexion neuve et fichiers de la base retirés du cache du système
+#   (posix_fadvise DONTNEED) avant chaque exécution, comme la première requête après un déploiement ;
+# - tiede : connexion neuve (cache de pages SQLite vide), cache du système chaud ;
+# - chaud : connexion gardée d'une exécution à l'autre, après l'échauffement.
+# Les pages lues par requête ne viennent pas des compteurs de SQLite (le module sqlite3 n'expose
+# pas sqlite3_db_status) mais de /proc/self/io (Linux), ramenés en pages de la base :
+# - pages_lues : octets demandés par SQLite au système (rchar), les pages absentes de son cache ;
+#   les lectures par mmap échappent à ce compteur, d'où mmap_size = 0 sur chaque connexion ;
+# - pages_disque_readahead : octets lus sur le disque (read_bytes), lecture anticipée du noyau
+#   comprise ; à froid ce nombre dépasse souvent pages_lues (blocs voisins chargés en avance).
+
+import argparse
+import csv
+import json
+import os
+import platform
 import sqlite3
+import statistics
+import subprocess
+import sys
 import time
-import os
+from datetime import datetime
+
+from create_schema import SCHEMA
 from queries import (
     query_actor_filmography,
     top_n_films,
@@ -12,243 +42,425 @@ from queries import (
     films_par_realisateur_et_genre
 )
 
+# (nom, fonction(conn, *paramètres), [jeux de paramètres])
+SUITE = [
+    ("Q1 - Filmographie", query_actor_filmography, [("Tom Hanks",), ("Meryl Streep",)]),
+    ("Q2 - Top N films", top_n_films, [("Adventure", "1980", "1990", 10), ("Drama", "2000", "2010", 10)]),
+    ("Q3 - Acteurs multi-rôles", acteurs_multi_roles, [("Tom Hanks",)]),
+    ("Q4 - Collaborations", collaborations, [("Tom Hanks",)]),
+    ("Q5 - Genres populaires", genres_populaires, [()]),
+    ("Q6 - Classement par genre", classement_par_genre, [()]),
+    ("Q7 - Carrière propulsée", carriere_propulsee, [()]),
+    ("Q8 - Films par réalisateur", films_par_realisateur_et_genre, [("Steven Spielberg",), ("Christopher Nolan",)]),
+]
+
+# Index comparés par le benchmark (créés entre les deux phases)
+INDEX_BENCHMARK = [
+    # Index pour chercher par nom
+    ("idx_persons_name", "CREATE INDEX IF NOT EXISTS idx_persons_name ON persons(primaryName)"),
+
+    # Index pour les clés étrangères (jointures) ; mid est déjà le premier
+    # champ des clés primaires (principals, directors, genres, ratings, characters)
+    ("idx_principals_pid", "CREATE INDEX IF NOT EXISTS idx_principals_pid ON principals(pid)"),
+    ("idx_directors_pid", "CREATE INDEX IF NOT EXISTS idx_directors_pid ON directors(pid)"),
+    ("idx_genres_genre", "CREATE INDEX IF NOT EXISTS idx_genres_genre ON genres(genre)"),
+
+    # Index pour les ratings
+    ("idx_ratings_numVotes", "CREATE INDEX IF NOT EXISTS idx_ratings_numVotes ON ratings(numVotes)"),
+
+    # Index pour les characters et knownformovies
+    ("idx_characters_pid", "CREATE INDEX IF NOT EXISTS idx_characters_pid ON characters(pid)"),
+    ("idx_knownformovies_pid", "CREATE INDEX IF NOT EXISTS idx_knownformovies_pid ON knownformovies(pid)"),
+    ("idx_knownformovies_mid", "CREATE INDEX IF NOT EXISTS idx_knownformovies_mid ON knownformovies(mid)"),
+]
+
+# Index du schéma (clés primaires et index de create_schema.py) : présents dans les deux phases
+INDEX_SCHEMA = {nom for spec in SCHEMA.values() for nom, _ in spec.get("index", [])}
+
+# Modes de mesure, du plus froid au plus chaud
+MODES = ("froid", "tiede", "chaud")
+
+# Colonnes de l'export CSV (une ligne par phase, mode, requête et jeu de paramètres)
+COLONNES_CSV = [
+    "phase", "mode", "requete", "parametres", "lignes", "iterations",
+    "min_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "moyenne_ms", "ecart_type_ms",
+    "pages_lues", "pages_disque_readahead",
+]
+
+
+def libelle(nom, parametres):
+    """Nom affiché d'un cas : 'Q1 - Filmographie (Tom Hanks)'"""
+    return f"{nom} ({', '.join(str(p) for p in parametres)})" if parametres else nom
+
+
+def percentile(valeurs, p):
+    """Percentile p (0-100) par interpolation linéaire entre les valeurs triées (méthode par défaut de numpy)"""
+    valeurs = sorted(valeurs)
+    rang = (len(valeurs) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (rang - bas)
+
+
+def statistiques(temps):
+    """Résumé des temps d'exécution en millisecondes"""
+    return {
+        "iterations": len(temps),
+        "min_ms": round(min(temps), 3),
+        "p50_ms": round(percentile(temps, 50), 3),
+        "p95_ms": round(percentile(temps, 95), 3),
+        "p99_ms": round(percentile(temps, 99), 3),
+        "max_ms": round(max(temps), 3),
+        "moyenne_ms": round(statistics.fmean(temps), 3),
+        "ecart_type_ms": round(statistics.stdev(temps), 3) if len(temps) > 1 else 0.0,
+    }
+
+
+def compteurs_io():
+    """Octets lus par le processus (rchar) et sur le disque (read_bytes, lecture anticipée comprise),
+    None hors Linux"""
+    try:
+        with open("/proc/self/io") as fichier:
+            compteurs = dict(ligne.split(": ") for ligne in fichier.read().splitlines())
+        return int(compteurs["rchar"]), int(compteurs["read_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def index_secondaires(conn):
+    """Index de la base hors clés primaires et index du schéma (create_schema.py)"""
+    return [nom for (nom,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name")
+        if not nom.startswith("pk_") and nom not in INDEX_SCHEMA]
+
+
+def vider_cache_os(db_path) -> bool:
+    """
+    Retire la base (et son journal WAL) du cache de pages du système, sans droits root.
+
+    Returns:
+        bool: False si la plateforme n'a pas posix_fadvise (le mode froid n'est alors que tiède)
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for chemin in (db_path, f"{db_path}-wal"):
+        if not os.path.exists(chemin):
+            continue
+        fd = os.open(chemin, os.O_RDONLY)
+        try:
+            os.fsync(fd)  # Les pages modifiées non écrites ne seraient pas retirées
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
 class BenchmarkDB:
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.execute("PRAGMA foreign_keys = ON")
-
-    # Mesurer le temps d'une requête
-    def measure_query(self, query_name: str, query_func, *args, iterations: int = 3) -> float:
-        times = []
-        
-        # On exécute 3 fois pour avoir une moyenne
-        for i in range(iterations):
-            start = time.perf_counter()
-            result = query_func(self.conn, *args)
-            end = time.perf_counter()
-            times.append((end - start) * 1000)  # En millisecondes
-        
-        avg_time = sum(times) / len(times)
-        print(f"  {query_name}: {avg_time:.2f} ms")
-        return avg_time
+        self.conn = self.connecter()
+        self.page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        self.cache_os_vide = True
+        # Index secondaires restés en place pendant la phase sans index (rempli par run_benchmark)
+        self.index_sans_index = None
+        # Lecture de /proc/self/io comptée entre deux relevés (retirée de chaque mesure)
+        avant, apres = compteurs_io(), compteurs_io()
+        self.octets_releve = apres[0] - avant[0] if avant and apres else 0
+
+    # Ouvrir une connexion (réglages identiques dans tous les modes)
+    def connecter(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        # Lectures par read() seulement : celles par mmap ne sont pas comptées dans /proc/self/io
+        conn.execute("PRAGMA mmap_size = 0")
+        return conn
+
+    # Exécuter une fois une requête : (durée en ms, lignes, octets lus par SQLite, octets lus sur le disque)
+    def executer(self, conn, fonction, args):
+        avant = compteurs_io()
+        debut = time.perf_counter()
+        resultat = fonction(conn, *args)
+        duree = (time.perf_counter() - debut) * 1000  # En millisecondes
+        apres = compteurs_io()
+        lignes = len(resultat) if hasattr(resultat, "__len__") else None
+        if avant is None or apres is None:
+            return duree, lignes, None, None
+        return duree, lignes, max(apres[0] - avant[0] - self.octets_releve, 0), apres[1] - avant[1]
+
+    # Mesurer une requête dans un mode : échauffement, puis statistiques sur `iterations` exécutions
+    def mesurer(self, nom: str, fonction, *args, iterations: int = 10, echauffement: int = 2,
+                mode: str = "chaud") -> dict:
+        # Les premières exécutions chargent les pages dans le cache SQLite et celui du système
+        if mode != "froid":
+            for _ in range(echauffement):
+                fonction(self.conn, *args)
+
+        temps, octets_lus, octets_disque = [], [], []
+        lignes = None
+        for _ in range(iterations):
+            if mode == "chaud":
+                conn = self.conn
+            else:
+                if mode == "froid":
+                    self.cache_os_vide = vider_cache_os(self.db_path) and self.cache_os_vide
+                conn = self.connecter()
+            duree, lignes, lus, disque = self.executer(conn, fonction, args)
+            if conn is not self.conn:
+                conn.close()
+            temps.append(duree)
+            octets_lus.append(lus)
+            octets_disque.append(disque)
+
+        resultat = {"requete": nom, "parametres": list(args), "mode": mode, "lignes": lignes}
+        resultat.update(statistiques(temps))
+        if None in octets_lus:
+            resultat["pages_lues"] = resultat["pages_disque_readahead"] = None
+        else:
+            # Médiane par exécution, en pages de la base
+            resultat["pages_lues"] = round(percentile(octets_lus, 50) / self.page_size, 1)
+            resultat["pages_disque_readahead"] = round(percentile(octets_disque, 50) / self.page_size, 1)
+        pages = (f"{resultat['pages_lues']:>9} pages lues, "
+                 f"{resultat['pages_disque_readahead']} du disque (readahead compris)") \
+            if resultat["pages_lues"] is not None else ""
+        print(f"  [{mode:<5}] {libelle(nom, args):<50} p50 {resultat['p50_ms']:>9.2f} ms   "
+              f"p95 {resultat['p95_ms']:>9.2f} ms   ±{resultat['ecart_type_ms']:.2f}   {lignes} ligne(s) {pages}")
+        return resultat
+
+    # Mesurer le temps d'une requête (médiane, pour les comparaisons des autres scripts)
+    def measure_query(self, query_name: str, query_func, *args, iterations: int = 5) -> float:
+        return self.mesurer(query_name, query_func, *args, iterations=iterations, echauffement=1)["p50_ms"]
+
+    # Exécuter tous les cas d'une suite dans chaque mode
+    def executer_suite(self, suite, phase: str, iterations: int = 10, echauffement: int = 2,
+                       modes=("chaud",)) -> list:
+        resultats = []
+        for mode in modes:
+            for nom, fonction, jeux in suite:
+                for parametres in jeux:
+                    resultat = self.mesurer(nom, fonction, *parametres, iterations=iterations,
+                                            echauffement=echauffement, mode=mode)
+                    resultats.append(dict(resultat, phase=phase))
+        return resultats
 
     # Récupérer la taille de la base de données
     def get_db_size(self) -> float:
-        size_bytes = os.path.getsize(self.db_path)
-        return size_bytes / (1024 * 1024)  # Convertir en MB
+        # Pages utilisées : celles libérées par drop_indexes restent dans le fichier
+        pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        libres = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - libres) * self.page_size / (1024 * 1024)  # Convertir en MB
 
     # Afficher le plan d'exécution
     def explain_query_plan(self, query_name: str, sql: str, params: tuple = ()):
         cur = self.conn.cursor()
         cur.execute(f"EXPLAIN QUERY PLAN {sql}", params)
         plans = cur.fetchall()
-        
+
         print(f"\nPlan d'exécution pour {query_name}:")
         for plan in plans:
             print(f"  {plan}")
 
     # Créer les index
     def create_indexes(self):
-        indexes = [
-            # Index pour chercher par nom
-            ("idx_persons_name", "CREATE INDEX IF NOT EXISTS idx_persons_name ON persons(primaryName)"),
-            
-            # Index pour les clés étrangères (jointures)
-            ("idx_principals_mid", "CREATE INDEX IF NOT EXISTS idx_principals_mid ON principals(mid)"),
-            ("idx_principals_pid", "CREATE INDEX IF NOT EXISTS idx_principals_pid ON principals(pid)"),
-            ("idx_directors_mid", "CREATE INDEX IF NOT EXISTS idx_directors_mid ON directors(mid)"),
-            ("idx_directors_pid", "CREATE INDEX IF NOT EXISTS idx_directors_pid ON directors(pid)"),
-            ("idx_genres_mid", "CREATE INDEX IF NOT EXISTS idx_genres_mid ON genres(mid)"),
-            ("idx_genres_genre", "CREATE INDEX IF NOT EXISTS idx_genres_genre ON genres(genre)"),
-            
-            # Index pour les ratings
-            ("idx_ratings_mid", "CREATE INDEX IF NOT EXISTS idx_ratings_mid ON ratings(mid)"),
-            ("idx_ratings_numVotes", "CREATE INDEX IF NOT EXISTS idx_ratings_numVotes ON ratings(numVotes)"),
-            
-            # Index pour les characters et knownformovies
-            ("idx_characters_mid", "CREATE INDEX IF NOT EXISTS idx_characters_mid ON characters(mid)"),
-            ("idx_characters_pid", "CREATE INDEX IF NOT EXISTS idx_characters_pid ON characters(pid)"),
-            ("idx_knownformovies_pid", "CREATE INDEX IF NOT EXISTS idx_knownformovies_pid ON knownformovies(pid)"),
-            ("idx_knownformovies_mid", "CREATE INDEX IF NOT EXISTS idx_knownformovies_mid ON knownformovies(mid)"),
-        ]
-        
         print("\nCréation des index...")
-        for index_name, sql in indexes:
+        for index_name, sql in INDEX_BENCHMARK:
             self.conn.execute(sql)
             print(f"  OK - {index_name}")
-        
+
         self.conn.commit()
 
-    # Supprimer les index
+    # Supprimer les index créés par create_indexes (les index du schéma restent)
     def drop_indexes(self):
-        cur = self.conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'")
-        indexes = cur.fetchall()
-        
+        presents = set(index_secondaires(self.conn))
+
         print("\nSuppression des index...")
-        for (index_name,) in indexes:
-            self.conn.execute(f"DROP INDEX IF EXISTS {index_name}")
-            print(f"  OK - {index_name} supprimé")
-        
+        for index_name, _ in INDEX_BENCHMARK:
+            if index_name in presents:
+                self.conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+                print(f"  OK - {index_name} supprimé")
+
         self.conn.commit()
 
-    # Lancer le benchmark complet
-    def run_benchmark(self):
-        
-        # SANS INDEX
+    # Lancer le benchmark complet : la suite sans puis avec index
+    def run_benchmark(self, suite=SUITE, iterations: int = 10, echauffement: int = 2, modes=("chaud",)) -> list:
+
+        # SANS INDEX : ceux que crée create_indexes sont retirés s'ils existent déjà
+        # (import_data.py --bulk crée les mêmes), sinon les deux phases mesurent les mêmes index
         print("\n" + "="*70)
         print("BENCHMARK SANS INDEX")
         print("="*70)
-        
+
+        self.drop_indexes()
+        self.index_sans_index = index_secondaires(self.conn)
+        if self.index_sans_index:
+            print(f"\nAutres index présents pendant cette phase : {', '.join(self.index_sans_index)}")
+
         db_size_before = self.get_db_size()
         print(f"\nTaille de la base : {db_size_before:.2f} MB")
-        
-        results_without_index = {}
-        
-        print("\nExécution des requêtes...")
-        
-        results_without_index["Q1 - Filmographie"] = self.measure_query(
-            "Q1 - Filmographie (Tom Hanks)",
-            query_actor_filmography,
-            "Tom Hanks"
-        )
-        
-        results_without_index["Q2 - Top N films"] = self.measure_query(
-            "Q2 - Top 10 films Adventure (1980-1990)",
-            top_n_films,
-            "Adventure", "1980", "1990", 10
-        )
-        
-        results_without_index["Q3 - Acteurs multi-rôles"] = self.measure_query(
-            "Q3 - Acteurs multi-rôles (Tom Hanks)",
-            acteurs_multi_roles,
-            "Tom Hanks"
-        )
-        
-        results_without_index["Q4 - Collaborations"] = self.measure_query(
-            "Q4 - Collaborations (Tom Hanks)",
-            collaborations,
-            "Tom Hanks"
-        )
-        
-        results_without_index["Q5 - Genres populaires"] = self.measure_query(
-            "Q5 - Genres populaires",
-            genres_populaires
-        )
-        
-        results_without_index["Q6 - Classement par genre"] = self.measure_query(
-            "Q6 - Classement par genre",
-            classement_par_genre
-        )
-        
-        results_without_index["Q7 - Carrière propulsée"] = self.measure_query(
-            "Q7 - Carrière propulsée",
-            carriere_propulsee
-        )
-        
-        results_without_index["Q8 - Films par réalisateur"] = self.measure_query(
-            "Q8 - Films par réalisateur (Spielberg)",
-            films_par_realisateur_et_genre,
-            "Steven Spielberg"
-        )
-        
+        print(f"\nExécution des requêtes ({echauffement} d'échauffement, {iterations} mesurées)...")
+        resultats = self.executer_suite(suite, "sans_index", iterations, echauffement, modes)
+
         # AVEC INDEX
         print("\n" + "="*70)
         print("BENCHMARK AVEC INDEX")
         print("="*70)
-        
+
         self.create_indexes()
-        
+
         db_size_after = self.get_db_size()
         print(f"\nTaille après index : {db_size_after:.2f} MB")
         print(f"Augmentation : +{(db_size_after - db_size_before):.2f} MB")
-        
-        results_with_index = {}
-        
-        print("\nExécution des requêtes...")
-        
-        results_with_index["Q1 - Filmographie"] = self.measure_query(
-            "Q1 - Filmographie (Tom Hanks)",
-            query_actor_filmography,
-            "Tom Hanks"
-        )
-        
-        results_with_index["Q2 - Top N films"] = self.measure_query(
-            "Q2 - Top 10 films Adventure (1980-1990)",
-            top_n_films,
-            "Adventure", "1980", "1990", 10
-        )
-        
-        results_with_index["Q3 - Acteurs multi-rôles"] = self.measure_query(
-            "Q3 - Acteurs multi-rôles (Tom Hanks)",
-            acteurs_multi_roles,
-            "Tom Hanks"
-        )
-        
-        results_with_index["Q4 - Collaborations"] = self.measure_query(
-            "Q4 - Collaborations (Tom Hanks)",
-            collaborations,
-            "Tom Hanks"
-        )
-        
-        results_with_index["Q5 - Genres populaires"] = self.measure_query(
-            "Q5 - Genres populaires",
-            genres_populaires
-        )
-        
-        results_with_index["Q6 - Classement par genre"] = self.measure_query(
-            "Q6 - Classement par genre",
-            classement_par_genre
-        )
-        
-        results_with_index["Q7 - Carrière propulsée"] = self.measure_query(
-            "Q7 - Carrière propulsée",
-            carriere_propulsee
-        )
-        
-        results_with_index["Q8 - Films par réalisateur"] = self.measure_query(
-            "Q8 - Films par réalisateur (Spielberg)",
-            films_par_realisateur_et_genre,
-            "Steven Spielberg"
-        )
-        
+        print(f"\nExécution des requêtes ({echauffement} d'échauffement, {iterations} mesurées)...")
+        resultats += self.executer_suite(suite, "avec_index", iterations, echauffement, modes)
+
         # RÉSULTATS
         print("\n" + "="*70)
-        print("RÉSULTATS FINAUX")
+        print("RÉSULTATS FINAUX (p50)")
         print("="*70)
-        
-        print(f"\n{'Requête':<35} {'Sans (ms)':<12} {'Avec (ms)':<12} {'Gain (%)':<10}")
-        print("-" * 70)
-        
+
+        if "froid" in modes and not self.cache_os_vide:
+            print("\nAttention : posix_fadvise indisponible, le mode froid n'a pas vidé le cache du système")
+
+        print(f"\n{'Mode':<6} {'Requête':<50} {'Sans (ms)':<12} {'Avec (ms)':<12} {'Gain (%)':<10} {'Pages lues':>12}")
+        print("-" * 110)
+
+        avec_index = {cle(r): r for r in resultats if r["phase"] == "avec_index"}
         total_before = 0
         total_after = 0
-        
-        for query_name in results_without_index.keys():
-            before = results_without_index[query_name]
-            after = results_with_index[query_name]
+
+        for resultat in resultats:
+            if resultat["phase"] != "sans_index":
+                continue
+            before = resultat["p50_ms"]
+            after = avec_index[cle(dict(resultat, phase="avec_index"))]["p50_ms"]
             gain = ((before - after) / before * 100) if before > 0 else 0
-            
+
             total_before += before
             total_after += after
-            
-            print(f"{query_name:<35} {before:<12.2f} {after:<12.2f} {gain:<10.1f}")
-        
-        print("-" * 70)
+
+            nom = libelle(resultat["requete"], resultat["parametres"])
+            pages = avec_index[cle(dict(resultat, phase="avec_index"))]["pages_lues"]
+            pages = f"{resultat['pages_lues']:g} → {pages:g}" if pages is not None else "-"
+            print(f"{resultat['mode']:<6} {nom:<50} {before:<12.2f} {after:<12.2f} {gain:<10.1f} {pages:>12}")
+
+        print("-" * 110)
         total_gain = ((total_before - total_after) / total_before * 100) if total_before > 0 else 0
-        print(f"{'TOTAL':<35} {total_before:<12.2f} {total_after:<12.2f} {total_gain:<10.1f}")
-        
+        print(f"{'TOTAL':<57} {total_before:<12.2f} {total_after:<12.2f} {total_gain:<10.1f}")
+
         print(f"\nTemps économisé : {(total_before - total_after):.2f} ms")
         print(f"Taille DB : {db_size_before:.2f} MB → {db_size_after:.2f} MB")
-        
+
         self.conn.close()
+        return resultats
+
+
+def cle(resultat):
+    """Identifie un cas d'un export à l'autre : (phase, mode, requête, paramètres)"""
+    # Les exports antérieurs aux modes ne contiennent que des mesures à chaud
+    return resultat["phase"], resultat.get("mode", "chaud"), resultat["requete"], json.dumps(resultat["parametres"])
+
+
+def contexte_execution(db_path, iterations, echauffement, modes, etiquette=None):
+    """Métadonnées d'un export : version du code, de SQLite et de Python, paramètres de mesure"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "etiquette": etiquette or commit,
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "base": os.path.abspath(db_path),
+        "taille_mb": round(os.path.getsize(db_path) / (1024 * 1024), 2),
+        "sqlite": sqlite3.sqlite_version,
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "iterations": iterations,
+        "echauffement": echauffement,
+        "modes": list(modes),
+    }
+
+
+def exporter_json(chemin, resultats, contexte):
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        json.dump({"contexte": contexte, "resultats": resultats}, fichier, ensure_ascii=False, indent=2)
+
+
+def exporter_csv(chemin, resultats):
+    with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+        writer = csv.DictWriter(fichier, fieldnames=COLONNES_CSV)
+        writer.writeheader()
+        for resultat in resultats:
+            writer.writerow({colonne: json.dumps(resultat[colonne], ensure_ascii=False)
+                             if colonne == "parametres" else resultat[colonne] for colonne in COLONNES_CSV})
+
+
+def comparer(resultats, chemin_reference, seuil):
+    """
+    Compare les p50 à un export JSON précédent.
+
+    Returns:
+        list: Cas dont le p50 a augmenté de plus de `seuil` %
+    """
+    with open(chemin_reference, encoding="utf-8") as fichier:
+        reference = json.load(fichier)
+    anciens = {cle(r): r for r in reference["resultats"]}
+
+    print("\n" + "=" * 91)
+    print(f"COMPARAISON AVEC {reference['contexte'].get('etiquette') or chemin_reference} (p50)")
+    print("=" * 91)
+    print(f"\n{'Phase':<11} {'Mode':<6} {'Requête':<50} {'Avant':>8} {'Après':>8} {'Écart':>8}")
+    print("-" * 91)
+    regressions = []
+    for resultat in resultats:
+        ancien = anciens.get(cle(resultat))
+        if ancien is None:
+            continue
+        ecart = ((resultat["p50_ms"] - ancien["p50_ms"]) / ancien["p50_ms"] * 100) if ancien["p50_ms"] > 0 else 0
+        marque = "  RÉGRESSION" if ecart > seuil else ""
+        if ancien["lignes"] != resultat["lignes"]:
+            marque += f"  lignes {ancien['lignes']} → {resultat['lignes']}"
+        if ecart > seuil:
+            regressions.append(dict(resultat, p50_reference_ms=ancien["p50_ms"], ecart_pct=round(ecart, 1)))
+        nom = libelle(resultat["requete"], resultat["parametres"])
+        print(f"{resultat['phase']:<11} {resultat['mode']:<6} {nom:<50} {ancien['p50_ms']:>8.2f} {resultat['p50_ms']:>8.2f} "
+              f"{ecart:>+7.1f}%{marque}")
+    print(f"\n{len(regressions)} régression(s) au-delà de {seuil:.0f} %")
+    return regressions
 
-def __main__():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(script_dir, "..", "..", "data", "csv", "imdb.db")
-    
-    benchmark = BenchmarkDB(db_path)
-    benchmark.run_benchmark()
 
 if __name__ == "__main__":
-    __main__()
\ No newline at end of file
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark des requêtes Q1-Q8 sans puis avec index")
+    parser.add_argument("--db", default=os.path.join(script_dir, "..", "..", "data", "csv", "imdb.db"),
+                        help="Base SQLite")
+    parser.add_argument("--iterations", type=int, default=10, help="Exécutions mesurées par cas")
+    parser.add_argument("--echauffement", type=int, default=2, help="Exécutions non mesurées avant la mesure")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["chaud"],
+                        help="froid (connexion neuve, cache du système vidé), tiede (connexion neuve), "
+                             "chaud (connexion gardée)")
+    parser.add_argument("--requetes", nargs="+", metavar="QN",
+                        help="Requêtes à exécuter (ex: Q1 Q4), toutes par défaut")
+    parser.add_argument("--json", help="Fichier JSON des résultats (avec le contexte d'exécution)")
+    parser.add_argument("--csv", help="Fichier CSV des résultats")
+    parser.add_argument("--etiquette", help="Nom de la version mesurée dans l'export (défaut : commit git)")
+    parser.add_argument("--comparer", metavar="JSON", help="Export JSON de référence pour détecter les régressions")
+    parser.add_argument("--seuil", type=float, default=20.0,
+                        help="Hausse du p50 en %% au-delà de laquelle un cas est une régression")
+    args = parser.parse_args()
+
+    suite = [cas for cas in SUITE if not args.requetes or cas[0].split(" - ")[0] in args.requetes]
+    contexte = contexte_execution(args.db, args.iterations, args.echauffement, args.modes, args.etiquette)
+
+    benchmark = BenchmarkDB(args.db)
+    resultats = benchmark.run_benchmark(suite, args.iterations, args.echauffement, args.modes)
+    contexte["index_sans_index"] = benchmark.index_sans_index
+
+    if args.json:
+        exporter_json(args.json, resultats, contexte)
+        print(f"\nRésultats JSON : {args.json}")
+    if args.csv:
+        exporter_csv(args.csv, resultats)
+        print(f"Résultats CSV : {args.csv}")
+    if args.comparer and comparer(resultats, args.comparer, args.seuil):
+        sys.exit(1)
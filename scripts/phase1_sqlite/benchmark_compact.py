@@ -0,0 +1,67 @@
+#T1.5 : Comparaison clés texte / clés entières
+#
+# Compare la taille et les temps (p50) des requêtes de la suite de benchmark.py
+# entre imdb.db (mid/pid TEXT) et imdb_compact.db (mid/pid INTEGER, construite par convert_compact.py).
+
+import argparse
+import os
+
+from benchmark import BenchmarkDB, SUITE, libelle
+from convert_compact import CHEMIN_DB, CHEMIN_DB_COMPACT, convertir
+
+
+def mesurer(db_path, titre):
+    """Mesure la taille et les temps Q1-Q8 d'une base"""
+    print("\n" + "=" * 70)
+    print(titre)
+    print("=" * 70)
+
+    benchmark = BenchmarkDB(db_path)
+    taille = benchmark.get_db_size()
+    print(f"\nTaille de la base : {taille:.2f} MB")
+
+    print("\nExécution des requêtes...")
+    temps = {}
+    for nom, fonction, jeux in SUITE:
+        for parametres in jeux:
+            temps[libelle(nom, parametres)] = benchmark.measure_query(nom, fonction, *parametres)
+    benchmark.conn.close()
+    return taille, temps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare les schémas à clés texte et à clés entières")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Base à clés texte")
+    parser.add_argument("--compact", default=CHEMIN_DB_COMPACT, help="Base à clés entières")
+    parser.add_argument("--reconstruire", action="store_true",
+                        help="Reconstruire la base compacte même si elle existe")
+    args = parser.parse_args()
+
+    if args.reconstruire or not os.path.exists(args.compact):
+        print("Construction de la base compacte...")
+        convertir(args.db, args.compact)
+
+    taille_texte, temps_texte = mesurer(args.db, "SCHÉMA TEXTE (mid/pid TEXT)")
+    taille_compact, temps_compact = mesurer(args.compact, "SCHÉMA COMPACT (mid/pid INTEGER)")
+
+    print("\n" + "=" * 70)
+    print("RÉSULTATS FINAUX")
+    print("=" * 70)
+
+    print(f"\n{'Requête':<50} {'Texte (ms)':<12} {'Entier (ms)':<12} {'Gain (%)':<10}")
+    print("-" * 85)
+
+    for nom in temps_texte:
+        avant = temps_texte[nom]
+        apres = temps_compact[nom]
+        gain = ((avant - apres) / avant * 100) if avant > 0 else 0
+        print(f"{nom:<50} {avant:<12.2f} {apres:<12.2f} {gain:<10.1f}")
+
+    print("-" * 85)
+    total_texte = sum(temps_texte.values())
+    total_compact = sum(temps_compact.values())
+    gain_total = ((total_texte - total_compact) / total_texte * 100) if total_texte > 0 else 0
+    print(f"{'TOTAL':<50} {total_texte:<12.2f} {total_compact:<12.2f} {gain_total:<10.1f}")
+
+    reduction = ((taille_texte - taille_compact) / taille_texte * 100) if taille_texte > 0 else 0
+    print(f"\nTaille DB : {taille_texte:.2f} MB → {taille_compact:.2f} MB ({reduction:.1f}% en moins)")
@@ -0,0 +1,110 @@
+#T1.7 : Comparaison recherche LIKE / FTS5
+#
+# Construit des échantillons de imdb.db de plusieurs tailles (N premiers films et les
+# titres, notes, personnes associés), indexe chacun en FTS5 puis compare la latence
+# des recherches LIKE '%terme%' et MATCH pour une série de termes.
+
+import argparse
+import os
+import sqlite3
+import tempfile
+
+from benchmark import BenchmarkDB
+from create_schema import CHEMIN_DB, creer_tables, creer_index_secondaires, supprimer_tables
+from recherche_texte import (
+    creer_tables_fts,
+    synchroniser_fts,
+    recherche_films_like,
+    recherche_films_fts,
+    recherche_personnes_like,
+    recherche_personnes_fts
+)
+
+# Tailles d'échantillon en nombre de films (0 = base complète)
+TAILLES = [10_000, 50_000, 100_000, 0]
+
+RECHERCHES = [
+    ("Films - 'love'", recherche_films_like, recherche_films_fts, "love"),
+    ("Films - 'star wars'", recherche_films_like, recherche_films_fts, "star wars"),
+    ("Films - 'godfather'", recherche_films_like, recherche_films_fts, "godfather"),
+    ("Films - 'amelie'", recherche_films_like, recherche_films_fts, "amelie"),
+    ("Personnes - 'hanks'", recherche_personnes_like, recherche_personnes_fts, "hanks"),
+    ("Personnes - 'john'", recherche_personnes_like, recherche_personnes_fts, "john"),
+]
+
+
+def construire_echantillon(chemin_source, chemin_echantillon, nb_films):
+    """
+    Copie les nb_films premiers films de la base source (et leurs titres, notes,
+    principals, personnes) dans une nouvelle base, puis construit ses index FTS5.
+
+    Returns:
+        int: Nombre de films copiés
+    """
+    conn = sqlite3.connect(chemin_echantillon)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    # Schéma créé avant l'ATTACH (les DROP non qualifiés viseraient sinon la source)
+    supprimer_tables(conn)
+    creer_tables(conn)
+
+    conn.execute("ATTACH DATABASE ? AS src", (chemin_source,))
+    conn.execute("INSERT INTO main.movies SELECT * FROM src.movies ORDER BY rowid LIMIT ?",
+                 (nb_films or -1,))
+    for table in ("ratings", "titles", "principals"):
+        conn.execute(f"INSERT INTO main.{table} SELECT * FROM src.{table} "
+                     f"WHERE mid IN (SELECT mid FROM main.movies)")
+    conn.execute("INSERT INTO main.persons SELECT * FROM src.persons "
+                 "WHERE pid IN (SELECT pid FROM main.principals)")
+    conn.commit()
+    conn.execute("DETACH DATABASE src")
+
+    # Mêmes index que imdb.db : le chemin LIKE garde ses index (idx_persons_name, idx_principals_pid)
+    creer_index_secondaires(conn)
+    creer_tables_fts(conn)
+    synchroniser_fts(conn)
+    conn.commit()
+    nombre = conn.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
+    conn.close()
+    return nombre
+
+
+def mesurer(chemin_echantillon, iterations):
+    """Mesure chaque recherche en LIKE puis en FTS5 sur un échantillon"""
+    benchmark = BenchmarkDB(chemin_echantillon)
+    temps = {}
+    for nom, fonction_like, fonction_fts, terme in RECHERCHES:
+        temps[nom] = (
+            benchmark.measure_query(f"{nom} LIKE", fonction_like, terme, iterations=iterations),
+            benchmark.measure_query(f"{nom} FTS5", fonction_fts, terme, iterations=iterations),
+        )
+    benchmark.conn.close()
+    return temps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare la recherche LIKE et FTS5 à plusieurs tailles")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Base source")
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES,
+                        help="Tailles d'échantillon en nombre de films (0 = base complète)")
+    parser.add_argument("--iterations", type=int, default=5, help="Exécutions par requête")
+    args = parser.parse_args()
+
+    resultats = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        for taille in args.tailles:
+            chemin = os.path.join(dossier, f"echantillon_{taille}.db")
+            nombre = construire_echantillon(args.db, chemin, taille)
+            print(f"\nÉchantillon de {nombre:,} films")
+            resultats[nombre] = mesurer(chemin, args.iterations)
+
+    print("\n" + "=" * 78)
+    print("RÉSULTATS FINAUX")
+    print("=" * 78)
+    print(f"\n{'Films':>10}  {'Recherche':<26} {'LIKE (ms)':>10} {'FTS5 (ms)':>10} {'Accélération':>13}")
+    print("-" * 78)
+    for nombre, temps in resultats.items():
+        for nom, (like, fts) in temps.items():
+            acceleration = like / fts if fts > 0 else 0
+            print(f"{nombre:>10,}  {nom:<26} {like:>10.2f} {fts:>10.2f} {acceleration:>12.1f}x")
+        print("-" * 78)
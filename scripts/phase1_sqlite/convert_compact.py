@@ -0,0 +1,121 @@
+#T1.5 : Schéma compact (clés entières)
+#
+# Construit imdb_compact.db à partir de imdb.db : les identifiants texte
+# 'tt0111161' / 'nm0000158' sont stockés sous forme d'entiers (111161 / 158).
+# La conversion est sans perte tant que chaque identifiant s'écrit
+# préfixe + nombre sur au moins 7 chiffres (format IMDb) : on le vérifie avant de copier.
+
+import argparse
+import sqlite3
+import os
+import time
+
+from create_schema import SCHEMA, PREFIXES_IDENTIFIANTS, creer_tables, marquer_import, supprimer_tables
+from recherche_texte import creer_tables_fts, synchroniser_fts
+from statistiques import rafraichir_statistiques
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CHEMIN_DB = os.path.normpath(os.path.join(script_dir, "..", "..", "data", "csv", "imdb.db"))
+CHEMIN_DB_COMPACT = os.path.normpath(os.path.join(script_dir, "..", "..", "data", "csv", "imdb_compact.db"))
+
+
+def expression_colonne(colonne):
+    """Expression SQL de conversion d'une colonne vers le schéma compact"""
+    if colonne in PREFIXES_IDENTIFIANTS:
+        return f"CAST(substr({colonne}, 3) AS INTEGER)"
+    return colonne
+
+
+def verifier_conversion(conn):
+    """
+    Vérifie que tous les identifiants de la base source se reconvertissent à l'identique.
+
+    Returns:
+        list: Liste de tuples (table, colonne, exemple) des identifiants non convertibles
+    """
+    erreurs = []
+    for table, spec in SCHEMA.items():
+        for colonne, _ in spec["colonnes"]:
+            if colonne not in PREFIXES_IDENTIFIANTS:
+                continue
+            prefixe = PREFIXES_IDENTIFIANTS[colonne]
+            row = conn.execute(f"""
+                SELECT {colonne} FROM src.{table}
+                WHERE {colonne} IS NOT NULL
+                  AND printf('{prefixe}%07d', CAST(substr({colonne}, 3) AS INTEGER)) != {colonne}
+                LIMIT 1
+            """).fetchone()
+            if row:
+                erreurs.append((table, colonne, row[0]))
+    return erreurs
+
+
+def convertir(chemin_source, chemin_compact):
+    """
+    Copie imdb.db dans une base au schéma compact, triée sur les clés primaires,
+    puis recrée les mêmes index secondaires que la base source.
+
+    Returns:
+        float: Durée de la conversion en secondes
+    """
+    debut = time.perf_counter()
+    conn = sqlite3.connect(chemin_compact)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    # Schéma créé AVANT l'ATTACH : un DROP TABLE non qualifié viserait sinon la base source
+    supprimer_tables(conn)
+    creer_tables(conn, compact=True)
+
+    conn.execute("ATTACH DATABASE ? AS src", (chemin_source,))
+
+    erreurs = verifier_conversion(conn)
+    if erreurs:
+        conn.close()
+        for table, colonne, exemple in erreurs:
+            print(f"  {table}.{colonne} : identifiant non convertible sans perte ({exemple})")
+        raise ValueError("Conversion compacte impossible sans perte")
+
+    for table, spec in SCHEMA.items():
+        colonnes = [nom for nom, _ in spec["colonnes"]]
+        conn.execute(f"""
+            INSERT OR IGNORE INTO main.{table} ({', '.join(colonnes)})
+            SELECT {', '.join(expression_colonne(c) for c in colonnes)}
+            FROM src.{table}
+            ORDER BY {', '.join(expression_colonne(c) for c in spec['pk'])}
+        """)
+        print(f"  {table} copiée")
+    conn.commit()
+
+    # Mêmes index secondaires que la base source pour une comparaison équitable
+    index_sql = conn.execute(
+        "SELECT sql FROM src.sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        "AND name NOT LIKE 'pk\\_%' ESCAPE '\\'"
+    ).fetchall()
+    for (sql,) in index_sql:
+        conn.execute(sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)
+                        .replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX IF NOT EXISTS", 1))
+    conn.commit()
+
+    conn.execute("DETACH DATABASE src")
+
+    # Index plein texte reconstruits sur les rowid de la base compacte
+    creer_tables_fts(conn)
+    synchroniser_fts(conn)
+    marquer_import(conn, "compact")
+    rafraichir_statistiques(conn)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return time.perf_counter() - debut
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit la base au schéma compact (clés INTEGER)")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Base source (clés texte)")
+    parser.add_argument("--compact", default=CHEMIN_DB_COMPACT, help="Base compacte à créer")
+    args = parser.parse_args()
+
+    print(f"Conversion de {args.db} vers {args.compact}")
+    duree = convertir(args.db, args.compact)
+    print(f"Conversion terminée en {duree:.2f}s")
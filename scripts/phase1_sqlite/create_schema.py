@@ -2,215 +2,264 @@
 
 #1
 
-import pandas as pd
+import argparse
 import sqlite3
 import os
+import uuid
+from datetime import datetime
 
-print("Création des tables dans la base de données SQLite")
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CHEMIN_DB = os.path.normpath(os.path.join(script_dir, "..", "..", "data", "csv", "imdb.db"))
 
-chemin_db = "../../data/csv/imdb.db"
-if not os.path.exists(os.path.dirname(chemin_db)):
-    os.makedirs(os.path.dirname(chemin_db))
-
-conn = sqlite3.connect(chemin_db)
-cur = conn.cursor()
+# Tables à supprimer (ordre : dépendances d'abord)
+tables_a_supprimer = [
+    "stats_snapshot", "movies_fts", "persons_fts", "episodes", "ratings", "titles", "movie_writers", "movie_directors",
+    "character_actors", "movie_genres", "writers",
+    "directors", "genres", "characters", "persons",
+    "professions", "principals", "knownformovies", "movies"
+]
 
+# Schéma (3NF) : colonnes, clé primaire, clés étrangères (colonne, table, colonne)
+# et index propres à la table (nom, colonnes) de chaque table
+SCHEMA = {
+    "movies": {
+        "colonnes": [("mid", "TEXT"), ("titleType", "TEXT"), ("primaryTitle", "TEXT"),
+                     ("originalTitle", "TEXT"), ("isAdult", "BOOLEAN"), ("startYear", "INTEGER"),
+                     ("endYear", "INTEGER"), ("runtimeMinutes", "INTEGER")],
+        "pk": ("mid",),
+        "fk": [],
+        # Pagination par clé (tri titre / année, départage par mid) de la liste des films
+        "index": [("idx_movies_type_title", ("titleType", "primaryTitle", "mid")),
+                  ("idx_movies_type_year", ("titleType", "startYear", "mid"))],
+    },
+    "persons": {
+        "colonnes": [("pid", "TEXT"), ("primaryName", "TEXT"), ("birthYear", "INTEGER"),
+                     ("deathYear", "INTEGER")],
+        "pk": ("pid",),
+        "fk": [],
+    },
+    "characters": {
+        "colonnes": [("mid", "TEXT"), ("pid", "TEXT"), ("name", "TEXT")],
+        "pk": ("mid", "pid", "name"),
+        "fk": [("mid", "movies", "mid"), ("pid", "persons", "pid")],
+    },
+    "directors": {
+        "colonnes": [("mid", "TEXT"), ("pid", "TEXT")],
+        "pk": ("mid", "pid"),
+        "fk": [("mid", "movies", "mid"), ("pid", "persons", "pid")],
+    },
+    "genres": {
+        "colonnes": [("mid", "TEXT"), ("genre", "TEXT")],
+        "pk": ("mid", "genre"),
+        "fk": [("mid", "movies", "mid")],
+    },
+    "knownformovies": {
+        "colonnes": [("pid", "TEXT"), ("mid", "TEXT")],
+        "pk": ("pid", "mid"),
+        "fk": [("pid", "persons", "pid"), ("mid", "movies", "mid")],
+    },
+    "principals": {
+        "colonnes": [("mid", "TEXT"), ("ordering", "INTEGER"), ("pid", "TEXT"),
+                     ("category", "TEXT"), ("job", "TEXT"), ("characters", "TEXT")],
+        "pk": ("mid", "ordering", "pid", "category"),
+        "fk": [("mid", "movies", "mid"), ("pid", "persons", "pid")],
+    },
+    "professions": {
+        "colonnes": [("pid", "TEXT"), ("jobName", "TEXT")],
+        "pk": ("pid", "jobName"),
+        "fk": [("pid", "persons", "pid")],
+    },
+    "ratings": {
+        "colonnes": [("mid", "TEXT"), ("averageRating", "REAL"), ("numVotes", "INTEGER")],
+        "pk": ("mid",),
+        "fk": [("mid", "movies", "mid")],
+        "index": [("idx_ratings_rating", ("averageRating", "mid"))],
+    },
+    "titles": {
+        "colonnes": [("mid", "TEXT"), ("ordering", "INTEGER"), ("title", "TEXT"),
+                     ("region", "TEXT"), ("language", "TEXT"), ("types", "TEXT"),
+                     ("attributes", "TEXT"), ("isOriginalTitle", "BOOLEAN")],
+        "pk": ("mid", "ordering"),
+        "fk": [("mid", "movies", "mid")],
+    },
+    "writers": {
+        "colonnes": [("mid", "TEXT"), ("pid", "TEXT")],
+        "pk": ("mid", "pid"),
+        "fk": [("mid", "movies", "mid"), ("pid", "persons", "pid")],
+    },
+    "episodes": {
+        "colonnes": [("mid", "TEXT"), ("parentMid", "TEXT"), ("seasonNumber", "INTEGER"),
+                     ("episodeNumber", "INTEGER")],
+        "pk": ("mid",),
+        "fk": [("mid", "movies", "mid"), ("parentMid", "movies", "mid")],
+        # Index couvrant : les épisodes d'une série sont lus par un seul parcours d'intervalle,
+        # déjà triés par saison et épisode, sans retour à la table.
+        # (Pas de WITHOUT ROWID sur cette clé : saison/épisode peuvent être NULL.)
+        "index": [("idx_episodes_parent", ("parentMid", "seasonNumber", "episodeNumber", "mid"))],
+    },
+}
 
-#Suppression des tables si elles existent déjà
+# Colonnes identifiants IMDb ('tt0111161', 'nm0000158') et leur préfixe.
+# Dans le schéma compact, seules les parties numériques sont stockées (INTEGER).
+PREFIXES_IDENTIFIANTS = {"mid": "tt", "pid": "nm", "parentMid": "tt"}
 
-tables_a_supprimer = [
-    "ratings", "titles", "movie_writers", "movie_directors", 
-    "character_actors", "movie_genres", "writers", 
-    "directors", "genres", "characters", "persons", 
-    "professions", "principals", "knownformovies", "movies"
+# Index secondaires utiles aux jointures (les préfixes des clés primaires sont déjà indexés)
+INDEX_SECONDAIRES = [
+    ("idx_persons_name", "persons", ("primaryName",)),
+    ("idx_principals_pid", "principals", ("pid",)),
+    ("idx_directors_pid", "directors", ("pid",)),
+    ("idx_writers_pid", "writers", ("pid",)),
+    ("idx_characters_pid", "characters", ("pid",)),
+    ("idx_genres_genre", "genres", ("genre",)),
+    ("idx_knownformovies_mid", "knownformovies", ("mid",)),
+    ("idx_ratings_numVotes", "ratings", ("numVotes",)),
 ]
 
-for table in tables_a_supprimer:
-    cur.execute(f"DROP TABLE IF EXISTS {table}")
-conn.commit()
-print("Tables supprimées")
 
+def ddl_table(table, avec_cle_primaire=True, compact=False):
+    """
+    Génère le CREATE TABLE d'une table du schéma.
+    Sans clé primaire (chargement en masse), la clé est créée plus tard
+    sous forme d'index unique par creer_index_cles_primaires().
+    En mode compact, les colonnes mid/pid sont des INTEGER (partie numérique de l'identifiant).
+    """
+    spec = SCHEMA[table]
+    lignes = [f"{nom} {'INTEGER' if compact and nom in PREFIXES_IDENTIFIANTS else type_sql}"
+              for nom, type_sql in spec["colonnes"]]
+    if avec_cle_primaire:
+        if len(spec["pk"]) == 1:
+            lignes[0] += " PRIMARY KEY"
+        else:
+            lignes.append(f"PRIMARY KEY ({', '.join(spec['pk'])})")
+    for colonne, table_ref, colonne_ref in spec["fk"]:
+        lignes.append(f"FOREIGN KEY ({colonne}) REFERENCES {table_ref}({colonne_ref}) ON DELETE CASCADE")
+    corps = ",\n        ".join(lignes)
+    return f"CREATE TABLE IF NOT EXISTS {table}(\n        {corps}\n    )"
 
 
-#Création des tables (3NF)
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS movies(
-        mid TEXT PRIMARY KEY,
-        titleType TEXT,
-        primaryTitle TEXT,
-        originalTitle TEXT,
-        isAdult BOOLEAN,
-        startYear INTEGER,
-        endYear INTEGER,
-        runtimeMinutes INTEGER
-    )
-"""
-)
-
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS persons(
-        pid TEXT PRIMARY KEY,
-        primaryName TEXT,
-        birthYear INTEGER,
-        deathYear INTEGER
-    )
-"""
-)
-
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS characters(
-        mid TEXT,
-        pid TEXT,
-        name TEXT,
-        PRIMARY KEY (mid, pid, name),
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE, 
-        FOREIGN KEY (pid) REFERENCES persons(pid) ON DELETE CASCADE
-    )
-"""
-)
-
-cur.execute("""
-    CREATE TABLE IF NOT EXISTS directors(
-        mid TEXT,
-        pid TEXT,
-        PRIMARY KEY (mid, pid),
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE,
-        FOREIGN KEY (pid) REFERENCES persons(pid) ON DELETE CASCADE
-    )    
-"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS genres(
-        mid TEXT,
-        genre TEXT,
-        PRIMARY KEY (mid, genre),
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE
-    )
-"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS knownformovies(
-        pid TEXT,
-        mid TEXT,
-        PRIMARY KEY (pid, mid),
-        FOREIGN KEY (pid) REFERENCES persons(pid) ON DELETE CASCADE,
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE
-    )"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS principals(
-        mid TEXT,
-        ordering INTEGER,
-        pid TEXT,
-        category TEXT,
-        job TEXT,
-        characters TEXT,
-        PRIMARY KEY (mid, ordering, pid, category),
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE,
-        FOREIGN KEY (pid) REFERENCES persons(pid) ON DELETE CASCADE
-    )    
-"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS professions(
-        pid TEXT,
-        jobName TEXT,
-        PRIMARY KEY (pid, jobName),
-        FOREIGN KEY (pid) REFERENCES persons(pid) ON DELETE CASCADE
-    )
-"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS ratings(
-        mid TEXT PRIMARY KEY,
-        averageRating REAL,
-        numVotes INTEGER,
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE
+def marquer_import(conn, mode):
+    """
+    Enregistre une nouvelle génération d'import dans import_meta (sans commit).
+    L'application compare cette génération pour invalider ses caches (comptages, statistiques).
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS import_meta (cle TEXT PRIMARY KEY, valeur TEXT)")
+    conn.executemany(
+        "INSERT OR REPLACE INTO import_meta (cle, valeur) VALUES (?, ?)",
+        [("generation", uuid.uuid4().hex), ("date_import", datetime.now().isoformat(timespec="seconds")),
+         ("mode", mode)]
     )
-"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS titles(
-        mid TEXT,
-        ordering INTEGER,
-        title TEXT,
-        region TEXT,
-        language TEXT,
-        types TEXT,
-        attributes TEXT,
-        isOriginalTitle BOOLEAN,
-        PRIMARY KEY (mid, ordering),
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE
-    )
-"""
-)
-
-cur.execute(
-"""
-    CREATE TABLE IF NOT EXISTS writers(
-        mid TEXT,
-        pid TEXT,
-        PRIMARY KEY (mid, pid),
-        FOREIGN KEY (mid) REFERENCES movies(mid) ON DELETE CASCADE,
-        FOREIGN KEY (pid) REFERENCES persons(pid) ON DELETE CASCADE
-    )    
-"""
-)
-
-conn.commit()
-print("Tables créées")
-
-
-#Affichage du digramme E/R
-print("DIAGRAMME ENTITÉ-RELATION (ER)")
-
-cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-tables = cur.fetchall()
-
-# Afficher chaque table avec ses colonnes
-print("\nENTITÉS (Tables) :\n")
-
-for table in tables:
-    table_name = table[0]
-    cur.execute(f"PRAGMA table_info({table_name})")
-    columns = cur.fetchall()
-    
-    print(f"┌{'─' * 50}┐")
-    print(f"│ {table_name.upper():^48} │")
-    print(f"├{'─' * 50}┤")
-    
-    for col in columns:
-        col_name, col_type, _, _, pk = col[1], col[2], col[3], col[4], col[5]
-        pk_str = " 🔑 PK" if pk else ""
-        line = f"  {col_name} ({col_type}) {pk_str}"
-        print(f"│ {line:<48} │")
-    
-    print(f"└{'─' * 50}┘\n")
-
-# Afficher les relations (clés étrangères)
-print("\nRELATIONS (Clés étrangères) ──────► (Clé principale) :\n")
-
-for table in tables:
-    table_name = table[0]
-    cur.execute(f"PRAGMA foreign_key_list({table_name})")
-    fks = cur.fetchall()
-    
-    for fk in fks:
-        ref_table = fk[2]
-        from_col = fk[3]
-        to_col = fk[4]
-        print(f"  {table_name}.{from_col} ──────► {ref_table}.{to_col}")
-
-conn.close()
\ No newline at end of file
+
+
+def supprimer_tables(conn):
+    """Supprime les tables si elles existent déjà"""
+    for table in tables_a_supprimer:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.commit()
+
+
+def creer_index_tables(conn):
+    """Crée les index qui font partie du schéma d'une table (clé "index" de SCHEMA)"""
+    for table, spec in SCHEMA.items():
+        for nom, colonnes in spec.get("index", []):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {nom} ON {table}({', '.join(colonnes)})")
+    conn.commit()
+
+
+def creer_tables(conn, avec_cle_primaire=True, compact=False):
+    """Crée toutes les tables du schéma (et leurs index, sauf en chargement en masse)"""
+    for table in SCHEMA:
+        conn.execute(ddl_table(table, avec_cle_primaire, compact))
+    conn.commit()
+    if avec_cle_primaire:
+        creer_index_tables(conn)
+
+
+def creer_index_cles_primaires(conn):
+    """Crée les index uniques qui remplacent les clés primaires différées (chargement en masse)"""
+    for table, spec in SCHEMA.items():
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS pk_{table} ON {table}({', '.join(spec['pk'])})")
+    conn.commit()
+    creer_index_tables(conn)
+
+
+def creer_index_secondaires(conn):
+    """Crée les index secondaires"""
+    for nom, table, colonnes in INDEX_SECONDAIRES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {nom} ON {table}({', '.join(colonnes)})")
+    conn.commit()
+
+
+def afficher_diagramme(cur):
+    """Affiche le diagramme E/R (tables, colonnes et clés étrangères)"""
+    print("DIAGRAMME ENTITÉ-RELATION (ER)")
+
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    tables = cur.fetchall()
+
+    # Afficher chaque table avec ses colonnes
+    print("\nENTITÉS (Tables) :\n")
+
+    for table in tables:
+        table_name = table[0]
+        cur.execute(f"PRAGMA table_info({table_name})")
+        columns = cur.fetchall()
+
+        print(f"┌{'─' * 50}┐")
+        print(f"│ {table_name.upper():^48} │")
+        print(f"├{'─' * 50}┤")
+
+        for col in columns:
+            col_name, col_type, _, _, pk = col[1], col[2], col[3], col[4], col[5]
+            pk_str = " 🔑 PK" if pk else ""
+            line = f"  {col_name} ({col_type}) {pk_str}"
+            print(f"│ {line:<48} │")
+
+        print(f"└{'─' * 50}┘\n")
+
+    # Afficher les relations (clés étrangères)
+    print("\nRELATIONS (Clés étrangères) ──────► (Clé principale) :\n")
+
+    for table in tables:
+        table_name = table[0]
+        cur.execute(f"PRAGMA foreign_key_list({table_name})")
+        fks = cur.fetchall()
+
+        for fk in fks:
+            ref_table = fk[2]
+            from_col = fk[3]
+            to_col = fk[4]
+            print(f"  {table_name}.{from_col} ──────► {ref_table}.{to_col}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Création du schéma SQLite")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Chemin de la base SQLite")
+    parser.add_argument("--compact", action="store_true",
+                        help="Clés mid/pid en INTEGER (voir convert_compact.py)")
+    args = parser.parse_args()
+
+    print("Création des tables dans la base de données SQLite")
+
+    chemin_db = args.db
+    if os.path.dirname(chemin_db) and not os.path.exists(os.path.dirname(chemin_db)):
+        os.makedirs(os.path.dirname(chemin_db))
+
+    conn = sqlite3.connect(chemin_db)
+    cur = conn.cursor()
+
+    #Suppression des tables si elles existent déjà
+    supprimer_tables(conn)
+    print("Tables supprimées")
+
+    #Création des tables (3NF)
+    creer_tables(conn, compact=args.compact)
+    print("Tables créées")
+
+    #Affichage du digramme E/R
+    afficher_diagramme(cur)
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
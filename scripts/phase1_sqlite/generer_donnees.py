@@ -0,0 +1,445 @@
+#T1.9 : Données synthétiques au format IMDb
+#
+# Génère les CSV lus par import_data.py (movies, persons, principals, characters, genres,
+# ratings, titles, directors, writers, knownformovies, professions, episodes) à une échelle
+# donnée : --echelle 1 reproduit les volumes de la base du projet (README, section 9),
+# 10 et 100 servent aux benchmarks de montée en charge.
+#
+# Distributions inspirées du vrai jeu de données :
+# - votes en loi de Pareto (quelques films concentrent l'essentiel des votes),
+#   note moyenne légèrement corrélée au nombre de votes et dépendant des genres ;
+# - activité des personnes en loi de Pareto : la plupart n'ont qu'un ou deux films,
+#   quelques acteurs et réalisateurs en ont des centaines ;
+# - genres en longue traîne, loi de Zipf sur leur rang (Drama, Comedy... Film-Noir) ;
+# - années concentrées sur les décennies récentes, 10 personnes au plus par film.
+#
+# Tout est vectorisé avec NumPy, par blocs de films (mémoire bornée) ; les identifiants
+# 'tt0000001' / 'nm0000001' sont formatés par des opérations sur tableaux d'octets.
+#
+#   python generer_donnees.py --echelle 10 --sortie ../../data/csv/synthetique_x10
+#   python import_data.py --bulk --csv ../../data/csv/synthetique_x10 --db ../../data/csv/imdb_x10.db
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from import_data import COLONNES
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CHEMIN_SORTIE = os.path.normpath(os.path.join(script_dir, "..", "..", "data", "csv", "synthetique"))
+
+# Volumes à l'échelle 1 (base du projet)
+NB_FILMS = 291_238
+NB_PERSONNES = 632_324
+
+# Films générés et écrits ensemble
+TAILLE_BLOC = 200_000
+
+TYPES_TITRES = {"movie": 0.78, "short": 0.05, "tvMovie": 0.05, "tvSeries": 0.03, "tvEpisode": 0.09}
+
+# Genres IMDb, du plus au moins fréquent (tirés selon une loi de Zipf sur ce rang)
+GENRES = [
+    "Drama", "Comedy", "Documentary", "Romance", "Action", "Thriller", "Crime", "Horror",
+    "Adventure", "Family", "Mystery", "Biography", "Fantasy", "History", "Music", "Sci-Fi",
+    "Animation", "War", "Musical", "Sport", "Western", "Adult", "Short", "Reality-TV",
+    "News", "Talk-Show", "Game-Show", "Film-Noir",
+]
+NB_GENRES_PAR_FILM = [0.42, 0.36, 0.22]  # probabilité de 1, 2, 3 genres
+# Écart de note moyenne par genre (documentaires mieux notés, films d'horreur moins bien...)
+ECARTS_NOTES = {
+    "Documentary": 1.6, "Biography": 1.2, "History": 1.1, "News": 1.2, "Music": 0.8,
+    "War": 0.3, "Animation": 0.3, "Film-Noir": 0.4, "Sci-Fi": -0.4, "Thriller": -0.3,
+    "Horror": -1.0, "Adult": -0.5, "Reality-TV": -0.4,
+}
+
+# Métier principal des personnes (définit les viviers où les rôles sont tirés)
+METIERS = {
+    "actor": 0.38, "actress": 0.25, "writer": 0.09, "producer": 0.08, "director": 0.07,
+    "composer": 0.04, "cinematographer": 0.03, "editor": 0.03, "self": 0.03,
+}
+
+# Catégorie des principals selon leur rang dans le générique (ordering 1-4 puis 5-10)
+CATEGORIES_TETE = {"actor": 0.55, "actress": 0.37, "self": 0.08}
+CATEGORIES_SUITE = {
+    "actor": 0.22, "actress": 0.15, "self": 0.05, "director": 0.12, "writer": 0.14,
+    "producer": 0.16, "composer": 0.07, "cinematographer": 0.05, "editor": 0.04,
+}
+JOBS = {"writer": ["screenplay", "story", "novel", "written by"], "producer": ["producer", "executive producer"]}
+
+# Activité des personnes : loi de Pareto décalée (Lomax) d'indice ALPHA_ACTIVITE, plus
+# ACTIVITE_MIN pour que chacune ait une chance d'être tirée (plus l'indice est petit,
+# plus les personnes les plus actives dominent)
+ALPHA_ACTIVITE = 3.0
+ACTIVITE_MIN = 0.02
+# Exposants de Zipf (plus ils sont grands, plus les premiers rangs sont tirés)
+EXPOSANT_REGIONS = 1.0
+EXPOSANT_GENRES = 1.1
+EXPOSANT_SERIES = 1.2
+
+# Personnes connues placées en tête de leur vivier (paramètres de la suite de benchmark.py)
+CELEBRITES = {"actor": ["Tom Hanks"], "actress": ["Meryl Streep"],
+              "director": ["Steven Spielberg", "Christopher Nolan"]}
+
+PRENOMS_H = ["James", "John", "Robert", "Michael", "William", "David", "Richard", "Joseph", "Thomas",
+             "Charles", "Daniel", "Matthew", "Anthony", "Mark", "Paul", "Steven", "Andrew", "Kevin",
+             "Brian", "George", "Pierre", "Jean", "Luca", "Hans", "Kenji", "Rahul", "Carlos", "Ivan"]
+PRENOMS_F = ["Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Barbara", "Susan", "Jessica",
+             "Sarah", "Karen", "Nancy", "Lisa", "Emma", "Olivia", "Sophie", "Claire", "Marie", "Anna",
+             "Yuki", "Priya", "Lucia", "Elena", "Ingrid", "Fatima", "Grace", "Julia", "Alice", "Nora"]
+NOMS = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Martin",
+        "Bernard", "Dubois", "Moreau", "Laurent", "Rossi", "Russo", "Müller", "Schmidt", "Tanaka",
+        "Suzuki", "Kumar", "Singh", "Ivanov", "Silva", "Santos", "Kowalski", "Nielsen", "Berg",
+        "O'Brien", "Walsh", "Clarke", "Turner", "Parker", "Evans", "Hughes", "Reed", "Cole"]
+MOTS_TITRES = [
+    ["The", "A", "Last", "Dark", "Lost", "Silent", "Broken", "Red", "Secret", "Final", "Little",
+     "Golden", "Wild", "Blue", "Eternal", "Hidden"],
+    ["Night", "City", "River", "House", "Road", "Heart", "Game", "Dream", "Island", "Storm",
+     "Empire", "Garden", "Mirror", "Train", "Winter", "Summer", "Shadow", "War", "Love", "Star"],
+    ["", " of Fire", " of Time", " in Paris", " Returns", " II", " Rising", " of Glass",
+     " at Dawn", " Forever", " of the North", " Story"],
+]
+REGIONS = ["US", "GB", "FR", "DE", "IT", "ES", "JP", "CA", "BR", "IN", "AU", "MX", "SE", "RU",
+           "NL", "KR", "AR", "PL", "TR", "FI"]
+LANGUES = ["en", "fr", "de", "es", "ja", "it", "pt", "hi", "ru", "ko"]
+TYPES_AKAS = {None: 0.3, "imdbDisplay": 0.5, "alternative": 0.1, "working": 0.05, "festival": 0.05}
+
+
+def identifiants(prefixe, numeros):
+    """
+    Identifiants IMDb ('tt0000001', au moins 7 chiffres) d'un tableau de numéros,
+    écrits octet par octet dans un tableau (aucune chaîne formatée en Python).
+    """
+    numeros = np.asarray(numeros, dtype=np.int64)
+    largeurs = 7 + (numeros >= 10 ** 7) + (numeros >= 10 ** 8) + (numeros >= 10 ** 9)
+    largeur_max = int(largeurs.max()) if len(numeros) else 7
+    # Octets nuls en fin de ligne : retirés par la conversion en chaîne
+    octets = np.zeros((len(numeros), 2 + largeur_max), dtype=np.uint8)
+    octets[:, 0], octets[:, 1] = ord(prefixe[0]), ord(prefixe[1])
+    reste = numeros.copy()
+    lignes = np.arange(len(numeros))
+    for rang in range(largeur_max):  # chiffre des unités d'abord
+        ecrit = rang < largeurs
+        octets[lignes[ecrit], (1 + largeurs - rang)[ecrit]] = 48 + reste[ecrit] % 10
+        reste //= 10
+    return octets.view(f"S{2 + largeur_max}").ravel().astype(f"U{2 + largeur_max}")
+
+
+def numeros_creux(rng, nombre):
+    """Numéros croissants avec des trous, comme les identifiants IMDb"""
+    return np.cumsum(rng.integers(1, 4, nombre, dtype=np.int64))
+
+
+def tirer(rng, probabilites, taille):
+    """Indices tirés selon un dictionnaire {valeur: probabilité} (dans l'ordre des clés)"""
+    p = np.array(list(probabilites.values()), dtype=np.float64)
+    return rng.choice(len(p), size=taille, p=p / p.sum())
+
+
+def repeter(nombres):
+    """(indice du parent, rang 0..n-1) de chaque ligne fille, pour nombres[i] lignes par parent i"""
+    parents = np.repeat(np.arange(len(nombres)), nombres)
+    debuts = np.cumsum(nombres) - nombres
+    return parents, np.arange(len(parents)) - np.repeat(debuts, nombres)
+
+
+def entiers(valeurs, absentes):
+    """Colonne d'entiers nullable (écrite '95' et non '95.0'), vide là où `absentes` est vrai"""
+    colonne = pd.array(np.asarray(valeurs, dtype=np.int64), dtype="Int64")
+    colonne[np.asarray(absentes)] = pd.NA
+    return colonne
+
+
+def texte(codes, categories):
+    """Colonne de chaînes à partir de codes dans un petit vocabulaire (-1 : valeur absente)"""
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+class Vivier:
+    """Valeurs tirées avec une probabilité proportionnelle à leur poids (membres[0] : la plus tirée)"""
+
+    def __init__(self, rng, membres, poids):
+        self.rng = rng
+        ordre = np.argsort(-poids, kind="stable")
+        self.membres = np.asarray(membres)[ordre]
+        cumul = np.cumsum(poids[ordre])
+        self.cumul = cumul / cumul[-1]
+
+    @classmethod
+    def zipf(cls, rng, membres, exposant):
+        """Poids 1 / rang^exposant, dans l'ordre donné des membres"""
+        return cls(rng, membres, 1.0 / np.arange(1, len(membres) + 1) ** exposant)
+
+    @classmethod
+    def pareto(cls, rng, membres, alpha=ALPHA_ACTIVITE):
+        """Poids tirés d'une loi de Pareto décalée, attribués au hasard"""
+        return cls(rng, membres, rng.pareto(alpha, len(membres)) + ACTIVITE_MIN)
+
+    def tirer(self, taille):
+        rangs = np.searchsorted(self.cumul, self.rng.random(taille))
+        return self.membres[np.minimum(rangs, len(self.membres) - 1)]
+
+
+def uniques(*colonnes):
+    """Masque de la première occurrence de chaque combinaison de colonnes entières"""
+    cle = np.zeros(len(colonnes[0]), dtype=np.int64)
+    for colonne in colonnes:
+        cle = cle * (int(colonne.max()) + 1 if len(colonne) else 1) + colonne
+    _, premieres = np.unique(cle, return_index=True)
+    masque = np.zeros(len(cle), dtype=bool)
+    masque[premieres] = True
+    return masque
+
+
+class Generateur:
+    """Génère les tables d'une échelle donnée et les écrit en CSV dans un dossier"""
+
+    def __init__(self, echelle, sortie, graine=42):
+        self.rng = np.random.default_rng(graine)
+        self.sortie = sortie
+        self.nb_films = max(int(round(NB_FILMS * echelle)), 10)
+        self.nb_personnes = max(int(round(NB_PERSONNES * echelle)), 100)
+        self.fichiers = {}
+        self.lignes = {}
+
+    def ecrire(self, table, donnees):
+        """Ajoute des lignes au CSV d'une table (en-tête au format des CSV du projet)"""
+        if table not in self.fichiers:
+            self.fichiers[table] = open(os.path.join(self.sortie, f"{table}.csv"), "w", newline="",
+                                        encoding="utf-8")
+            self.fichiers[table].write(",".join(f"\"('{colonne}',)\"" for colonne in COLONNES[table]) + "\n")
+            self.lignes[table] = 0
+        pd.DataFrame(donnees, columns=COLONNES[table]).to_csv(self.fichiers[table], header=False, index=False)
+        self.lignes[table] += len(next(iter(donnees.values())))
+
+    def generer(self, taille_bloc=TAILLE_BLOC):
+        """Génère toutes les tables ; retourne {table: lignes écrites}"""
+        os.makedirs(self.sortie, exist_ok=True)
+        try:
+            self.generer_personnes()
+            rng = self.rng
+            self.numeros_films = numeros_creux(rng, self.nb_films)
+            self.types_films = tirer(rng, TYPES_TITRES, self.nb_films)
+            series = np.flatnonzero(self.types_films == list(TYPES_TITRES).index("tvSeries"))
+            self.series = Vivier.zipf(rng, rng.permutation(series), EXPOSANT_SERIES) if len(series) else None
+            # Titres connus par personne (4 au plus, les premiers rencontrés)
+            self.connus = np.zeros(self.nb_personnes, dtype=np.int8)
+            for debut in range(0, self.nb_films, taille_bloc):
+                self.generer_films(debut, min(debut + taille_bloc, self.nb_films))
+        finally:
+            for fichier in self.fichiers.values():
+                fichier.close()
+        return self.lignes
+
+    def generer_personnes(self):
+        rng = self.rng
+        n = self.nb_personnes
+        self.numeros_personnes = numeros_creux(rng, n)
+        metiers = tirer(rng, METIERS, n)
+        noms_metiers = list(METIERS)
+        self.viviers = {metier: Vivier.pareto(rng, np.flatnonzero(metiers == i))
+                        for i, metier in enumerate(noms_metiers)}
+
+        # Noms : prénom selon le métier (actrices : prénoms féminins) + nom de famille
+        prenoms = PRENOMS_H + PRENOMS_F
+        feminin = (metiers == noms_metiers.index("actress")) | (rng.random(n) < 0.25)
+        prenom = np.where(feminin, len(PRENOMS_H) + rng.integers(0, len(PRENOMS_F), n),
+                          rng.integers(0, len(PRENOMS_H), n))
+        codes = prenom * len(NOMS) + rng.integers(0, len(NOMS), n)
+        categories = [f"{p} {nom}" for p in prenoms for nom in NOMS]
+        for metier, celebrites in CELEBRITES.items():
+            for rang, nom in enumerate(celebrites):
+                codes[self.viviers[metier].membres[rang]] = len(categories)
+                categories.append(nom)
+
+        naissance_connue = rng.random(n) < 0.45
+        naissance = np.clip(rng.normal(1965, 20, n), 1880, 2015).astype(np.int64)
+        deces_connu = naissance_connue & (naissance < 1950) & (rng.random(n) < 0.6)
+        deces = np.minimum(naissance + np.clip(rng.normal(75, 12, n), 20, 105).astype(np.int64), 2025)
+        self.ecrire("persons", {
+            "pid": identifiants("nm", self.numeros_personnes),
+            "primaryName": texte(codes, categories),
+            "birthYear": entiers(naissance, ~naissance_connue),
+            "deathYear": entiers(deces, ~deces_connu),
+        })
+
+        # Métiers : le principal, plus 0 à 2 autres
+        supplementaires = rng.choice(3, size=n, p=[0.5, 0.35, 0.15])
+        personnes, _ = repeter(supplementaires)
+        toutes = np.concatenate([np.arange(n), personnes])
+        metier = np.concatenate([metiers, tirer(rng, METIERS, len(personnes))])
+        garder = uniques(toutes, metier)
+        ordre = np.argsort(toutes[garder], kind="stable")
+        self.ecrire("professions", {
+            "pid": identifiants("nm", self.numeros_personnes[toutes[garder][ordre]]),
+            "jobName": texte(metier[garder][ordre], noms_metiers),
+        })
+
+    def generer_films(self, debut, fin):
+        rng = self.rng
+        films = np.arange(debut, fin)
+        n = len(films)
+        types = self.types_films[debut:fin]
+        mids = identifiants("tt", self.numeros_films[debut:fin])
+        noms_types = list(TYPES_TITRES)
+        est = {nom: types == i for i, nom in enumerate(noms_types)}
+
+        # movies : années concentrées sur les décennies récentes
+        annee = np.clip(2025 - rng.exponential(22, n), 1894, 2025).astype(np.int64)
+        duree = np.where(est["short"], rng.integers(3, 40, n),
+                         np.where(est["tvEpisode"], rng.integers(20, 60, n),
+                                  np.clip(rng.normal(96, 20, n), 45, 240))).astype(np.int64)
+        fin_serie = np.minimum(annee + rng.integers(0, 15, n), 2025)
+        nb_mots = [len(mots) for mots in MOTS_TITRES]
+        suffixe = np.where(rng.random(n) < 0.5, 0, rng.integers(1, nb_mots[2], n))  # la moitié sans suffixe
+        code_titre = (rng.integers(0, nb_mots[0], n) * nb_mots[1] + rng.integers(0, nb_mots[1], n)) * nb_mots[2] \
+            + suffixe
+        titres = [f"{a} {b}{c}" for a in MOTS_TITRES[0] for b in MOTS_TITRES[1] for c in MOTS_TITRES[2]]
+        original = np.where(rng.random(n) < 0.85, code_titre, rng.integers(0, len(titres), n))
+        self.ecrire("movies", {
+            "mid": mids,
+            "titleType": texte(types, noms_types),
+            "primaryTitle": texte(code_titre, titres),
+            "originalTitle": texte(original, titres),
+            "isAdult": (rng.random(n) < 0.01).astype(np.int64),
+            "startYear": entiers(annee, rng.random(n) < 0.02),
+            "endYear": entiers(fin_serie, ~est["tvSeries"] | (rng.random(n) < 0.4)),
+            "runtimeMinutes": entiers(duree, rng.random(n) < 0.25),
+        })
+
+        # genres : 1 à 3 par film, en longue traîne
+        parents, _ = repeter(rng.choice(3, size=n, p=NB_GENRES_PAR_FILM) + 1)
+        genre = Vivier.zipf(rng, np.arange(len(GENRES)), EXPOSANT_GENRES).tirer(len(parents))
+        garder = uniques(parents, genre)
+        self.ecrire("genres", {"mid": mids[parents[garder]], "genre": texte(genre[garder], GENRES)})
+
+        # ratings : 86 % des films, votes en loi de Pareto, écart moyen des genres du film
+        ecarts = np.array([ECARTS_NOTES.get(g, 0.0) for g in GENRES])
+        ecart = (np.bincount(parents[garder], ecarts[genre[garder]], minlength=n)
+                 / np.maximum(np.bincount(parents[garder], minlength=n), 1))
+        notes = np.flatnonzero(rng.random(n) < 0.86)
+        votes = np.minimum(5 * (1 + rng.pareto(1.0, len(notes))), 3_000_000).astype(np.int64)
+        moyenne = rng.normal(6.1, 1.2, len(notes)) + 0.25 * np.log10(votes) + ecart[notes]
+        moyenne = np.clip(moyenne, 1, 10).round(1)
+        self.ecrire("ratings", {"mid": mids[notes], "averageRating": moyenne, "numVotes": votes})
+
+        # titles : titres alternatifs (le premier est le titre original)
+        parents, rang = repeter(1 + rng.poisson(5.5, n))
+        m = len(parents)
+        traduit = (rang > 0) & (rng.random(m) < 0.4)
+        region = np.where(rang == 0, -1, Vivier.zipf(rng, np.arange(len(REGIONS)), EXPOSANT_REGIONS).tirer(m))
+        langue = np.where((rang > 0) & (rng.random(m) < 0.2), rng.integers(0, len(LANGUES), m), -1)
+        types_akas = tirer(rng, TYPES_AKAS, m) - 1  # -1 : aucun type
+        self.ecrire("titles", {
+            "mid": mids[parents],
+            "ordering": rang + 1,
+            "title": texte(np.where(traduit, rng.integers(0, len(titres), m), code_titre[parents]), titres),
+            "region": texte(region, REGIONS),
+            "language": texte(langue, LANGUES),
+            "types": texte(types_akas, list(TYPES_AKAS)[1:]),
+            "attributes": texte(np.where(rng.random(m) < 0.03, 0, -1), ["literal title"]),
+            "isOriginalTitle": (rang == 0).astype(np.int64),
+        })
+
+        # directors et writers
+        parents, _ = repeter(1 + (rng.random(n) < 0.12))
+        realisateur = self.viviers["director"].tirer(len(parents))
+        garder = uniques(parents, realisateur)
+        parents, realisateur = parents[garder], realisateur[garder]
+        self.ecrire("directors", {"mid": mids[parents], "pid": identifiants("nm", self.numeros_personnes[realisateur])})
+        premier_realisateur = np.full(n, -1)
+        premier_realisateur[parents[::-1]] = realisateur[::-1]
+
+        parents, _ = repeter(np.minimum(rng.poisson(1.6, n), 5))
+        scenariste = self.viviers["writer"].tirer(len(parents))
+        garder = uniques(parents, scenariste)
+        parents, scenariste = parents[garder], scenariste[garder]
+        self.ecrire("writers", {"mid": mids[parents], "pid": identifiants("nm", self.numeros_personnes[scenariste])})
+        premier_scenariste = np.full(n, -1)
+        premier_scenariste[parents[::-1]] = scenariste[::-1]
+
+        # principals : 10 personnes au plus par film, acteurs en tête du générique
+        parents, rang = repeter(np.minimum(1 + rng.poisson(9.5, n), 10))
+        m = len(parents)
+        # Les catégories de tête sont les premières de CATEGORIES_SUITE (mêmes codes)
+        categories = list(CATEGORIES_SUITE)
+        categorie = np.where(rang < 4, tirer(rng, CATEGORIES_TETE, m), tirer(rng, CATEGORIES_SUITE, m))
+        personne = np.empty(m, dtype=np.int64)
+        for i, nom in enumerate(categories):
+            lignes = np.flatnonzero(categorie == i)
+            vivier = self.viviers["actor" if nom == "self" else nom]
+            personne[lignes] = vivier.tirer(len(lignes))
+        # Réalisateur et scénariste du générique : ceux des tables directors / writers
+        for nom, premier in (("director", premier_realisateur), ("writer", premier_scenariste)):
+            lignes = np.flatnonzero((categorie == categories.index(nom)) & (premier[parents] >= 0))
+            personne[lignes] = premier[parents[lignes]]
+        garder = uniques(parents, personne, categorie)
+        parents, rang, categorie, personne = parents[garder], rang[garder], categorie[garder], personne[garder]
+        m = len(parents)
+        pids = identifiants("nm", self.numeros_personnes[personne])
+        jobs = [job for nom in JOBS for job in JOBS[nom]]
+        job = np.full(m, -1)
+        decalage = 0
+        for nom, valeurs in JOBS.items():
+            lignes = np.flatnonzero(categorie == categories.index(nom))
+            job[lignes] = decalage + rng.integers(0, len(valeurs), len(lignes))
+            decalage += len(valeurs)
+        self.ecrire("principals", {
+            "mid": mids[parents], "ordering": rang + 1, "pid": pids,
+            "category": texte(categorie, categories), "job": texte(job, jobs),
+        })
+
+        # characters : 75 % des rôles d'acteurs (« Self » pour les apparitions)
+        joue = np.isin(categorie, [categories.index(nom) for nom in CATEGORIES_TETE]) & (rng.random(m) < 0.75)
+        lignes = np.flatnonzero(joue)
+        prenoms = PRENOMS_H + PRENOMS_F
+        roles = ["Self"] + prenoms + [f"{p} {nom}" for p in prenoms for nom in NOMS]
+        code_role = np.where(rng.random(len(lignes)) < 0.5, 1 + rng.integers(0, len(prenoms), len(lignes)),
+                             1 + len(prenoms) + rng.integers(0, len(prenoms) * len(NOMS), len(lignes)))
+        code_role[categorie[lignes] == categories.index("self")] = 0
+        self.ecrire("characters", {"mid": mids[parents[lignes]], "pid": pids[lignes],
+                                   "name": texte(code_role, roles)})
+
+        # knownformovies : les 4 premiers films rencontrés de chaque personne (une fois par film)
+        ordre = np.flatnonzero(uniques(personne, parents))
+        ordre = ordre[np.argsort(personne[ordre], kind="stable")]
+        tries = personne[ordre]
+        debut_groupe = np.r_[0, np.flatnonzero(tries[1:] != tries[:-1]) + 1]
+        rang_personne = np.arange(len(tries)) - np.repeat(debut_groupe, np.diff(np.r_[debut_groupe, len(tries)]))
+        garder = ordre[rang_personne + self.connus[tries] < 4]
+        np.add.at(self.connus, personne[garder], 1)
+        self.ecrire("knownformovies", {"pid": pids[garder], "mid": mids[parents[garder]]})
+
+        # episodes : rattachés à une série, les séries à succès ont le plus d'épisodes
+        episodes = np.flatnonzero(est["tvEpisode"])
+        if self.series is not None and len(episodes):
+            e = len(episodes)
+            self.ecrire("episodes", {
+                "mid": mids[episodes],
+                "parentMid": identifiants("tt", self.numeros_films[self.series.tirer(e)]),
+                "seasonNumber": entiers(1 + rng.poisson(1.5, e), rng.random(e) < 0.05),
+                "episodeNumber": entiers(1 + rng.integers(0, 24, e), rng.random(e) < 0.05),
+            })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère des CSV synthétiques au format IMDb")
+    parser.add_argument("--echelle", type=float, default=1.0,
+                        help="Facteur d'échelle (1 = volumes de la base du projet, 10, 100...)")
+    parser.add_argument("--sortie", default=None, help="Dossier des CSV (défaut data/csv/synthetique_x<échelle>)")
+    parser.add_argument("--graine", type=int, default=42, help="Graine aléatoire (mêmes CSV à graine égale)")
+    parser.add_argument("--bloc", type=int, default=TAILLE_BLOC, help="Films générés par bloc (mémoire)")
+    args = parser.parse_args()
+
+    sortie = args.sortie or f"{CHEMIN_SORTIE}_x{args.echelle:g}"
+    debut = time.perf_counter()
+    lignes = Generateur(args.echelle, sortie, args.graine).generer(args.bloc)
+    duree = time.perf_counter() - debut
+
+    print(f"\nCSV générés dans {sortie} (échelle {args.echelle:g})")
+    for table, nombre in lignes.items():
+        print(f"  {table:<16} {nombre:>14,} lignes")
+    total = sum(lignes.values())
+    print(f"  {'TOTAL':<16} {total:>14,} lignes en {duree:.1f}s ({total / duree:,.0f} lignes/s)")
@@ -1,98 +1,146 @@
 #T1.2 : Import des données
 
+import argparse
 import pandas as pd
 import sqlite3
 import os
+import sys
+import time
+import resource
+import multiprocessing
+import queue
 from datetime import datetime
 
-print("Import des données dans la base de données SQLite")
-temps = datetime.now()
+from create_schema import (
+    SCHEMA,
+    supprimer_tables,
+    creer_tables,
+    creer_index_cles_primaires,
+    creer_index_secondaires,
+    marquer_import
+)
+from recherche_texte import creer_tables_fts, synchroniser_fts
+from statistiques import rafraichir_statistiques
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-chemin_db = os.path.join(script_dir, "..", "..", "data", "csv", "imdb.db")
-chemin_csv = os.path.join(script_dir, "..", "..", "data", "csv") + os.sep
+CHEMIN_DB = os.path.normpath(os.path.join(script_dir, "..", "..", "data", "csv", "imdb.db"))
+CHEMIN_CSV = os.path.normpath(os.path.join(script_dir, "..", "..", "data", "csv")) + os.sep
 
-chemin_db = os.path.normpath(chemin_db)
-chemin_csv = os.path.normpath(chemin_csv) + os.sep
+# Colonnes de chaque fichier CSV (dans l'ordre du fichier)
+COLONNES = {
+    "movies": ['mid', 'titleType', 'primaryTitle', 'originalTitle',
+               'isAdult', 'startYear', 'endYear', 'runtimeMinutes'],
+    "persons": ['pid', 'primaryName', 'birthYear', 'deathYear'],
+    "genres": ['mid', 'genre'],
+    "ratings": ['mid', 'averageRating', 'numVotes'],
+    "titles": ['mid', 'ordering', 'title', 'region', 'language',
+               'types', 'attributes', 'isOriginalTitle'],
+    "professions": ['pid', 'jobName'],
+    "directors": ['mid', 'pid'],
+    "writers": ['mid', 'pid'],
+    "characters": ['mid', 'pid', 'name'],
+    "principals": ['mid', 'ordering', 'pid', 'category', 'job'],
+    "knownformovies": ['pid', 'mid'],
+    "episodes": ['mid', 'parentMid', 'seasonNumber', 'episodeNumber'],
+}
 
-stats = {"succes": {}, "erreurs": 0, "filtrees": {}}
+# Clés étrangères à vérifier pour chaque table : (colonne(s) mid, colonne pid)
+CLES_ETRANGERES = {
+    "genres": ('mid', None),
+    "ratings": ('mid', None),
+    "titles": ('mid', None),
+    "professions": (None, 'pid'),
+    "directors": ('mid', 'pid'),
+    "writers": ('mid', 'pid'),
+    "characters": ('mid', 'pid'),
+    "principals": ('mid', 'pid'),
+    "knownformovies": ('mid', 'pid'),
+    "episodes": (('mid', 'parentMid'), None),
+}
+
+# Ordre d'insertion (tables principales d'abord)
+ORDRE_INSERTION = [
+    "movies", "persons", "genres", "ratings", "titles", "professions",
+    "directors", "writers", "characters", "principals", "knownformovies", "episodes",
+]
+
+
+def lire_csv(chemin_csv, table, **kwargs):
+    """Lit le CSV d'une table en renommant les colonnes (kwargs passés à pd.read_csv)"""
+    return pd.read_csv(chemin_csv + f"{table}.csv", header=0, names=COLONNES[table],
+                       low_memory=False, **kwargs)
+
+
+def filter_fk(df, table_name, stats, valid_mids, valid_pids, mid_col=None, pid_col=None):
+    """Filtre les lignes avec clés étrangères invalides (mid_col peut être un tuple de colonnes)"""
+    original_len = len(df)
+    for col in ((mid_col,) if isinstance(mid_col, str) else mid_col or ()):
+        if col in df.columns:
+            df = df[df[col].isin(valid_mids)]
+    if pid_col and pid_col in df.columns:
+        df = df[df[pid_col].isin(valid_pids)]
+    filtered = original_len - len(df)
+    if filtered > 0:
+        stats["filtrees"][table_name] = stats["filtrees"].get(table_name, 0) + filtered
+    return df
+
+
+def preparer_chunk(chunk, table, stats, valid_mids, valid_pids):
+    """
+    Applique filter_fk (si la table a des clés étrangères) et la suppression des doublons à un chunk.
+
+    Returns:
+        tuple: (liste de tuples prêts pour executemany, nombre de doublons supprimés)
+    """
+    if table in CLES_ETRANGERES:
+        mid_col, pid_col = CLES_ETRANGERES[table]
+        chunk = filter_fk(chunk, table, stats, valid_mids, valid_pids,
+                          mid_col=mid_col, pid_col=pid_col)
+    rows_avant = len(chunk)
+    chunk = chunk.drop_duplicates()
+    lignes = list(chunk.astype(object).where(pd.notnull(chunk), None)
+                  .itertuples(index=False, name=None))
+    return lignes, rows_avant - len(lignes)
+
+
+def pic_memoire_mo():
+    """Pic de mémoire résidente (RSS) du processus, en Mo"""
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS et en kilo-octets sous Linux
+    if sys.platform == "darwin":
+        return pic / (1024 * 1024)
+    return pic / 1024
+
+
+def taille_chunk(chemin_csv, table, memoire_max_mo):
+    """
+    Estime le nombre de lignes par chunk pour rester sous le plafond mémoire.
+    On mesure l'empreinte pandas d'un échantillon, multipliée par 4 pour couvrir
+    les copies (filtrage, conversion en tuples) faites sur chaque chunk.
+    """
+    echantillon = lire_csv(chemin_csv, table, nrows=10000)
+    if len(echantillon) == 0:
+        return 10000
+    octets_par_ligne = echantillon.memory_usage(deep=True, index=False).sum() / len(echantillon)
+    return max(1000, int(memoire_max_mo * 1024 * 1024 / (octets_par_ligne * 4)))
 
-try:
-    conn = sqlite3.connect(chemin_db)
-    conn.execute("PRAGMA foreign_keys = ON")
-    cur = conn.cursor()
 
+def import_complet(conn, chemin_csv, stats):
+    """Import historique : chaque CSV est chargé entièrement en mémoire puis inséré avec to_sql"""
     # Chargement des CSV
-    movies_df = pd.read_csv(chemin_csv + "movies.csv", low_memory=False)
-    persons_df = pd.read_csv(chemin_csv + "persons.csv", low_memory=False)
-    characters_df = pd.read_csv(chemin_csv + "characters.csv", low_memory=False)
-    directors_df = pd.read_csv(chemin_csv + "directors.csv", low_memory=False)
-    genres_df = pd.read_csv(chemin_csv + "genres.csv", low_memory=False)
-    knownformovies_df = pd.read_csv(chemin_csv + "knownformovies.csv", low_memory=False)
-    principals_df = pd.read_csv(chemin_csv + "principals.csv", low_memory=False)
-    professions_df = pd.read_csv(chemin_csv + "professions.csv", low_memory=False)
-    ratings_df = pd.read_csv(chemin_csv + "ratings.csv", low_memory=False)
-    titles_df = pd.read_csv(chemin_csv + "titles.csv", low_memory=False)
-    writers_df = pd.read_csv(chemin_csv + "writers.csv", low_memory=False)
-
-    # Renommer les colonnes
-    movies_df.columns = ['mid', 'titleType', 'primaryTitle', 'originalTitle', 
-                         'isAdult', 'startYear', 'endYear', 'runtimeMinutes']
-    persons_df.columns = ['pid', 'primaryName', 'birthYear', 'deathYear']
-    genres_df.columns = ['mid', 'genre']
-    ratings_df.columns = ['mid', 'averageRating', 'numVotes']
-    titles_df.columns = ['mid', 'ordering', 'title', 'region', 'language', 
-                         'types', 'attributes', 'isOriginalTitle']
-    professions_df.columns = ['pid', 'jobName']
-    directors_df.columns = ['mid', 'pid']
-    writers_df.columns = ['mid', 'pid']
-    characters_df.columns = ['mid', 'pid', 'name']
-    principals_df.columns = ['mid', 'ordering', 'pid', 'category', 'job']
-    knownformovies_df.columns = ['pid', 'mid']
+    tables_df = {table: lire_csv(chemin_csv, table) for table in ORDRE_INSERTION}
 
     # Sets des clés primaires valides
-    valid_mids = set(movies_df['mid'].dropna().unique())
-    valid_pids = set(persons_df['pid'].dropna().unique())
-
-    def filter_fk(df, table_name, mid_col=None, pid_col=None):
-        """Filtre les lignes avec clés étrangères invalides"""
-        original_len = len(df)
-        if mid_col and mid_col in df.columns:
-            df = df[df[mid_col].isin(valid_mids)]
-        if pid_col and pid_col in df.columns:
-            df = df[df[pid_col].isin(valid_pids)]
-        filtered = original_len - len(df)
-        if filtered > 0:
-            stats["filtrees"][table_name] = filtered
-        return df
+    valid_mids = set(tables_df["movies"]['mid'].dropna().unique())
+    valid_pids = set(tables_df["persons"]['pid'].dropna().unique())
 
     # Filtrer les tables avec FK
-    directors_df = filter_fk(directors_df, "directors", mid_col='mid', pid_col='pid')
-    writers_df = filter_fk(writers_df, "writers", mid_col='mid', pid_col='pid')
-    characters_df = filter_fk(characters_df, "characters", mid_col='mid', pid_col='pid')
-    principals_df = filter_fk(principals_df, "principals", mid_col='mid', pid_col='pid')
-    knownformovies_df = filter_fk(knownformovies_df, "knownformovies", mid_col='mid', pid_col='pid')
-    genres_df = filter_fk(genres_df, "genres", mid_col='mid')
-    ratings_df = filter_fk(ratings_df, "ratings", mid_col='mid')
-    titles_df = filter_fk(titles_df, "titles", mid_col='mid')
-    professions_df = filter_fk(professions_df, "professions", pid_col='pid')
-
-    # Ordre d'insertion (tables principales d'abord)
-    tables_df = [
-        ("movies", movies_df),
-        ("persons", persons_df),
-        ("genres", genres_df),
-        ("ratings", ratings_df),
-        ("titles", titles_df),
-        ("professions", professions_df),
-        ("directors", directors_df),
-        ("writers", writers_df),
-        ("characters", characters_df),
-        ("principals", principals_df),
-        ("knownformovies", knownformovies_df),
-    ]
-
-    for table, df in tables_df:
+    for table, (mid_col, pid_col) in CLES_ETRANGERES.items():
+        tables_df[table] = filter_fk(tables_df[table], table, stats, valid_mids, valid_pids,
+                                     mid_col=mid_col, pid_col=pid_col)
+
+    for table in ORDRE_INSERTION:
+        df = tables_df[table]
         try:
             df = df.where(pd.notnull(df), None)
             rows_avant = len(df)
@@ -113,8 +161,488 @@ try:
 
     conn.commit()
 
-    # Stats
-    temps = (datetime.now() - temps).total_seconds()
+
+def import_streaming(conn, chemin_csv, stats, memoire_max_mo=256, chunksize=None,
+                     lignes_par_transaction=500_000):
+    """
+    Import en flux : chaque CSV est lu par chunks de taille bornée.
+    Le filtrage FK (filter_fk) et la suppression des doublons sont appliqués par chunk,
+    puis les lignes sont insérées avec executemany dans de grosses transactions.
+    Les doublons entre chunks sont écartés par INSERT OR IGNORE (clé primaire).
+
+    Args:
+        conn: Connexion SQLite (tables déjà créées par create_schema.py)
+        chemin_csv: Dossier des CSV (terminé par un séparateur)
+        stats: Dictionnaire de statistiques à compléter
+        memoire_max_mo: Plafond mémoire visé pour un chunk (Mo)
+        chunksize: Nombre de lignes par chunk (calculé depuis memoire_max_mo si None)
+        lignes_par_transaction: Nombre de lignes insérées entre deux COMMIT
+    """
+    valid_mids = set()
+    valid_pids = set()
+    cur = conn.cursor()
+
+    for table in ORDRE_INSERTION:
+        colonnes = COLONNES[table]
+        sql = (f"INSERT OR IGNORE INTO {table} ({', '.join(colonnes)}) "
+               f"VALUES ({', '.join('?' * len(colonnes))})")
+        taille = chunksize or taille_chunk(chemin_csv, table, memoire_max_mo)
+        lues = inserees = duplicatas = 0
+        en_attente = 0
+        debut = time.perf_counter()
+
+        try:
+            for chunk in lire_csv(chemin_csv, table, chunksize=taille):
+                lues += len(chunk)
+                if table == "movies":
+                    valid_mids.update(chunk['mid'].dropna())
+                elif table == "persons":
+                    valid_pids.update(chunk['pid'].dropna())
+
+                lignes, doublons = preparer_chunk(chunk, table, stats, valid_mids, valid_pids)
+
+                cur.executemany(sql, lignes)
+                inserees += cur.rowcount
+                duplicatas += doublons + len(lignes) - cur.rowcount
+
+                en_attente += len(lignes)
+                if en_attente >= lignes_par_transaction:
+                    conn.commit()
+                    en_attente = 0
+
+            conn.commit()
+            duree = time.perf_counter() - debut
+            debit = inserees / duree if duree > 0 else 0
+            print(f"Insertion réussie dans la table {table} : {inserees} lignes insérées "
+                  f"({debit:,.0f} lignes/s, chunks de {taille:,} lignes, "
+                  f"pic mémoire {pic_memoire_mo():.0f} Mo).")
+            stats["succes"][table] = {
+                "lignes_inserees": inserees,
+                "duplicatas": duplicatas,
+                "lignes_lues": lues,
+                "duree_s": round(duree, 2),
+                "lignes_par_s": round(debit),
+                "pic_memoire_mo": round(pic_memoire_mo(), 1),
+            }
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'insertion dans la table {table} : {e}")
+            conn.rollback()
+            stats["erreurs"] += 1
+
+
+def pragmas_chargement(conn, cache_mo=1024):
+    """
+    Réglages SQLite pour un chargement en masse : pas de journal ni de fsync,
+    gros cache de pages et tables temporaires (tris des index) en mémoire.
+    La base n'est pas protégée en cas de crash pendant le chargement.
+    """
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(f"PRAGMA cache_size = -{cache_mo * 1024}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def pragmas_normaux(conn):
+    """Rétablit les réglages par défaut après un chargement en masse"""
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("PRAGMA synchronous = FULL")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+def import_bulk(conn, chemin_csv, stats, cache_mo=1024, index_secondaires=True):
+    """
+    Chargement en masse : les tables sont recréées sans clé primaire, les lignes
+    sont insérées triées sur la clé, puis les index (clés primaires sous forme
+    d'index uniques, puis index secondaires) sont construits en une passe.
+    Les clés étrangères sont vérifiées une seule fois à la fin (PRAGMA foreign_key_check).
+    Les durées de chaque phase sont ajoutées dans stats["phases"].
+    """
+    phases = stats.setdefault("phases", {})
+
+    debut = time.perf_counter()
+    pragmas_chargement(conn, cache_mo)
+    supprimer_tables(conn)
+    creer_tables(conn, avec_cle_primaire=False)
+    phases["creation_tables"] = time.perf_counter() - debut
+
+    # Lecture et filtrage des CSV
+    debut = time.perf_counter()
+    tables_df = {table: lire_csv(chemin_csv, table) for table in ORDRE_INSERTION}
+    valid_mids = set(tables_df["movies"]['mid'].dropna().unique())
+    valid_pids = set(tables_df["persons"]['pid'].dropna().unique())
+    for table, (mid_col, pid_col) in CLES_ETRANGERES.items():
+        tables_df[table] = filter_fk(tables_df[table], table, stats, valid_mids, valid_pids,
+                                     mid_col=mid_col, pid_col=pid_col)
+    phases["lecture_csv"] = time.perf_counter() - debut
+
+    # Insertion triée sur la clé primaire, dans une seule transaction
+    debut = time.perf_counter()
+    cur = conn.cursor()
+    for table in ORDRE_INSERTION:
+        cle = list(SCHEMA[table]["pk"])
+        colonnes = COLONNES[table]
+        df = tables_df.pop(table)
+        rows_avant = len(df)
+        # Une clé en double empêcherait la création de l'index unique : on garde la première ligne.
+        # L'index unique tient les NULL pour distincts : les lignes à clé incomplète sont gardées
+        # (dédoublonnées sur toute la ligne, comme dans les autres modes)
+        complete = df[cle].notna().all(axis=1)
+        df = pd.concat([df[complete].drop_duplicates(subset=cle),
+                        df[~complete].drop_duplicates()]).sort_values(cle)
+        df = df.astype(object).where(pd.notnull(df), None)
+        cur.executemany(
+            f"INSERT INTO {table} ({', '.join(colonnes)}) VALUES ({', '.join('?' * len(colonnes))})",
+            df.itertuples(index=False, name=None)
+        )
+        print(f"Insertion réussie dans la table {table} : {len(df)} lignes insérées.")
+        stats["succes"][table] = {
+            "lignes_inserees": len(df),
+            "duplicatas": rows_avant - len(df)
+        }
+    conn.commit()
+    phases["insertion"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    creer_index_cles_primaires(conn)
+    phases["index_primaires"] = time.perf_counter() - debut
+
+    if index_secondaires:
+        debut = time.perf_counter()
+        creer_index_secondaires(conn)
+        phases["index_secondaires"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    phases["verification_fk"] = time.perf_counter() - debut
+    stats["violations_fk"] = len(violations)
+    if violations:
+        print(f"Attention : {len(violations)} violations de clés étrangères détectées")
+
+    pragmas_normaux(conn)
+
+
+# Contexte d'un processus de parsing (rempli par _init_worker)
+_contexte_worker = {}
+
+
+def _init_worker(file_lots, chemin_csv, memoire_max_mo, chunksize, valid_mids, valid_pids):
+    """Initialise un processus du pool (les sets de clés ne sont transmis qu'une fois)"""
+    _contexte_worker.update({
+        "file_lots": file_lots,
+        "chemin_csv": chemin_csv,
+        "memoire_max_mo": memoire_max_mo,
+        "chunksize": chunksize,
+        "valid_mids": valid_mids,
+        "valid_pids": valid_pids,
+    })
+
+
+def _parser_table(table):
+    """
+    Tâche d'un worker : lit un CSV par chunks, le nettoie et le filtre (FK + doublons),
+    puis envoie chaque lot prêt à insérer au writer via la file.
+    Le temps d'attente sur la file pleine n'est pas compté dans la durée de parsing.
+    """
+    ctx = _contexte_worker
+    file_lots = ctx["file_lots"]
+    stats_locales = {"filtrees": {}}
+    lues = duplicatas = 0
+    duree_parse = 0.0
+
+    try:
+        taille = ctx["chunksize"] or taille_chunk(ctx["chemin_csv"], table, ctx["memoire_max_mo"])
+        debut = time.perf_counter()
+        for chunk in lire_csv(ctx["chemin_csv"], table, chunksize=taille):
+            lues += len(chunk)
+            lot, doublons = preparer_chunk(chunk, table, stats_locales,
+                                           ctx["valid_mids"], ctx["valid_pids"])
+            duplicatas += doublons
+            duree_parse += time.perf_counter() - debut
+
+            file_lots.put(("lot", table, lot))
+            debut = time.perf_counter()
+        duree_parse += time.perf_counter() - debut
+
+        file_lots.put(("fin", table, {
+            "lignes_lues": lues,
+            "duplicatas": duplicatas,
+            "filtrees": stats_locales["filtrees"].get(table, 0),
+            "duree_parse_s": duree_parse,
+        }))
+    except Exception as e:
+        file_lots.put(("erreur", table, str(e)))
+
+
+# Attente maximale sur la file avant de vérifier l'état des workers (secondes)
+DELAI_FILE_S = 5
+
+
+def _verifier_workers(resultat, pids_pool, termine):
+    """
+    Appelée quand la file reste vide : lève RuntimeError si une tâche a échoué,
+    si un worker du pool a disparu (OOM-killer, segfault : le pool le remplace
+    mais sa tâche est perdue et map_async ne se termine jamais) ou si le pool
+    a fini sans envoyer les messages attendus.
+
+    Args:
+        resultat: AsyncResult du map_async des workers
+        pids_pool: pids des workers présents au démarrage du writer
+        termine: True si le pool était déjà terminé à la vérification précédente
+
+    Returns:
+        bool: True si le pool est terminé (un dernier délai est laissé aux messages en transit)
+    """
+    if resultat.ready():
+        if not resultat.successful():
+            try:
+                resultat.get()
+            except Exception as e:
+                raise RuntimeError(f"un worker de parsing a échoué : {e}") from e
+        if termine:
+            raise RuntimeError("le pool de parsing s'est terminé sans envoyer la fin de toutes les tables")
+        return True
+    disparus = pids_pool - {p.pid for p in multiprocessing.active_children()}
+    if disparus:
+        raise RuntimeError(f"worker(s) de parsing arrêté(s) en cours de tâche : pid {sorted(disparus)}")
+    return False
+
+
+def _ecrire_lots(conn, file_lots, tables, stats, lignes_par_transaction, resultat,
+                 valid_mids=None, valid_pids=None):
+    """
+    Writer unique : consomme les lots envoyés par les workers et les insère
+    jusqu'à avoir reçu la fin (ou l'erreur) de chaque table.
+    Si valid_mids/valid_pids sont fournis, les clés de movies/persons y sont collectées.
+    La file est lue avec un délai : si un worker meurt ou que le pool se termine
+    sans ses messages, la transaction en cours est annulée et RuntimeError est levée
+    au lieu d'attendre indéfiniment.
+    """
+    cur = conn.cursor()
+    restantes = set(tables)
+    # Les workers d'un pool ne s'arrêtent pas avant sa fermeture : une disparition est un crash
+    pids_pool = {p.pid for p in multiprocessing.active_children()}
+    termine = False
+    en_attente = 0
+    insertion = {table: {"inserees": 0, "duree": 0.0} for table in tables}
+
+    while restantes:
+        try:
+            message, table, contenu = file_lots.get(timeout=DELAI_FILE_S)
+        except queue.Empty:
+            try:
+                termine = _verifier_workers(resultat, pids_pool, termine)
+            except RuntimeError:
+                conn.rollback()
+                raise
+            continue
+
+        if message == "lot":
+            colonnes = COLONNES[table]
+            debut = time.perf_counter()
+            try:
+                cur.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(colonnes)}) "
+                    f"VALUES ({', '.join('?' * len(colonnes))})",
+                    contenu
+                )
+            except sqlite3.Error as e:
+                print(f"Erreur lors de l'insertion dans la table {table} : {e}")
+                stats["erreurs"] += 1
+                continue
+            insertion[table]["inserees"] += cur.rowcount
+            insertion[table]["duree"] += time.perf_counter() - debut
+            # Doublons écartés par la clé primaire (entre deux lots)
+            insertion[table]["ignorees"] = insertion[table].get("ignorees", 0) + len(contenu) - cur.rowcount
+            if table == "movies" and valid_mids is not None:
+                valid_mids.update(row[0] for row in contenu if row[0] is not None)
+            elif table == "persons" and valid_pids is not None:
+                valid_pids.update(row[0] for row in contenu if row[0] is not None)
+
+            en_attente += len(contenu)
+            if en_attente >= lignes_par_transaction:
+                conn.commit()
+                en_attente = 0
+
+        elif message == "fin":
+            restantes.discard(table)
+            if contenu["filtrees"]:
+                stats["filtrees"][table] = contenu["filtrees"]
+            inserees = insertion[table]["inserees"]
+            stats["succes"][table] = {
+                "lignes_inserees": inserees,
+                "duplicatas": contenu["duplicatas"] + insertion[table].get("ignorees", 0),
+                "lignes_lues": contenu["lignes_lues"],
+                "duree_parse_s": round(contenu["duree_parse_s"], 2),
+                "duree_insertion_s": round(insertion[table]["duree"], 2),
+            }
+            print(f"Insertion réussie dans la table {table} : {inserees} lignes insérées "
+                  f"(parsing {contenu['duree_parse_s']:.2f}s, insertion {insertion[table]['duree']:.2f}s).")
+
+        else:
+            restantes.discard(table)
+            print(f"Erreur lors du parsing de la table {table} : {contenu}")
+            stats["erreurs"] += 1
+
+    conn.commit()
+
+
+def import_parallele(conn, chemin_csv, stats, workers=4, memoire_max_mo=256, chunksize=None,
+                     lignes_par_transaction=500_000):
+    """
+    Import avec parsing parallèle : un pool de processus lit, nettoie et filtre les CSV
+    en parallèle, et le processus principal est le seul à écrire dans SQLite.
+    movies et persons sont traités en premier (leurs clés servent au filtrage FK),
+    puis les neuf autres fichiers sont répartis entre les workers.
+    La file est bornée : un writer trop lent freine les workers et la mémoire reste bornée.
+
+    Args:
+        conn: Connexion SQLite (tables déjà créées par create_schema.py)
+        chemin_csv: Dossier des CSV (terminé par un séparateur)
+        stats: Dictionnaire de statistiques à compléter
+        workers: Nombre de processus de parsing
+        memoire_max_mo: Plafond mémoire visé pour un chunk (Mo)
+        chunksize: Nombre de lignes par chunk (calculé depuis memoire_max_mo si None)
+        lignes_par_transaction: Nombre de lignes insérées entre deux COMMIT
+    """
+    contexte = multiprocessing.get_context()
+    file_lots = contexte.Queue(maxsize=2 * workers)
+    valid_mids, valid_pids = set(), set()
+
+    # Étape 1 : tables principales
+    tables_principales = ["movies", "persons"]
+    with contexte.Pool(min(workers, len(tables_principales)), initializer=_init_worker,
+                       initargs=(file_lots, chemin_csv, memoire_max_mo, chunksize, None, None)) as pool:
+        resultat = pool.map_async(_parser_table, tables_principales)
+        _ecrire_lots(conn, file_lots, tables_principales, stats, lignes_par_transaction, resultat,
+                     valid_mids=valid_mids, valid_pids=valid_pids)
+        resultat.wait()
+
+    # Étape 2 : tables avec clés étrangères
+    tables_liees = [table for table in ORDRE_INSERTION if table not in tables_principales]
+    with contexte.Pool(workers, initializer=_init_worker,
+                       initargs=(file_lots, chemin_csv, memoire_max_mo, chunksize,
+                                 valid_mids, valid_pids)) as pool:
+        resultat = pool.map_async(_parser_table, tables_liees)
+        _ecrire_lots(conn, file_lots, tables_liees, stats, lignes_par_transaction, resultat)
+        resultat.wait()
+
+
+def import_delta(conn, chemin_csv, stats, memoire_max_mo=256, chunksize=None):
+    """
+    Import incrémental : compare un nouvel instantané des CSV à la base existante
+    au lieu de tout supprimer et recharger.
+
+    Chaque CSV est chargé par chunks (filtrage FK et doublons comme en streaming) dans
+    une table temporaire indexée sur la clé primaire. La différence avec la table
+    réelle est ensuite appliquée dans UNE seule transaction :
+      - suppressions : clés absentes du nouvel instantané (tables filles d'abord)
+      - mises à jour : même clé mais contenu différent (comparaison colonne par colonne)
+      - insertions   : nouvelles clés (tables principales d'abord)
+    Les lecteurs (application Django) voient l'ancienne ou la nouvelle version, jamais un état partiel.
+
+    Args:
+        conn: Connexion SQLite sur la base existante (schéma de create_schema.py)
+        chemin_csv: Dossier du nouvel instantané CSV
+        stats: Dictionnaire de statistiques à compléter (stats["delta"] par table)
+        memoire_max_mo: Plafond mémoire visé pour un chunk (Mo)
+        chunksize: Nombre de lignes par chunk (calculé depuis memoire_max_mo si None)
+    """
+    valid_mids, valid_pids = set(), set()
+    delta = stats.setdefault("delta", {})
+    debut = time.perf_counter()
+
+    # 1. Chargement de l'instantané dans des tables temporaires
+    for table in ORDRE_INSERTION:
+        colonnes = COLONNES[table]
+        types = dict(SCHEMA[table]["colonnes"])
+        cle = SCHEMA[table]["pk"]
+        conn.execute(f"DROP TABLE IF EXISTS temp.delta_{table}")
+        conn.execute(
+            f"CREATE TEMP TABLE delta_{table} ("
+            f"{', '.join(f'{c} {types[c]}' for c in colonnes)}, PRIMARY KEY ({', '.join(cle)}))"
+        )
+        sql = (f"INSERT OR IGNORE INTO temp.delta_{table} ({', '.join(colonnes)}) "
+               f"VALUES ({', '.join('?' * len(colonnes))})")
+        taille = chunksize or taille_chunk(chemin_csv, table, memoire_max_mo)
+        for chunk in lire_csv(chemin_csv, table, chunksize=taille):
+            if table == "movies":
+                valid_mids.update(chunk['mid'].dropna())
+            elif table == "persons":
+                valid_pids.update(chunk['pid'].dropna())
+            lignes, _ = preparer_chunk(chunk, table, stats, valid_mids, valid_pids)
+            conn.executemany(sql, lignes)
+        conn.commit()
+        delta[table] = {"insertions": 0, "mises_a_jour": 0, "suppressions": 0}
+    stats.setdefault("phases", {})["chargement_instantane"] = time.perf_counter() - debut
+
+    # 2. Application de la différence en une transaction (index plein texte compris)
+    creer_tables_fts(conn)
+    debut_diff = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Jointures sur la clé avec IS : les clés composites acceptent NULL, et une ligne
+        # dont une colonne de clé est NULL ne doit pas être supprimée puis réinsérée à chaque delta
+        for table in reversed(ORDRE_INSERTION):
+            jointure = " AND ".join(f"d.{c} IS {table}.{c}" for c in SCHEMA[table]["pk"])
+            cur = conn.execute(
+                f"DELETE FROM {table} WHERE NOT EXISTS "
+                f"(SELECT 1 FROM temp.delta_{table} d WHERE {jointure})"
+            )
+            delta[table]["suppressions"] = cur.rowcount
+
+        for table in ORDRE_INSERTION:
+            cle = SCHEMA[table]["pk"]
+            jointure = " AND ".join(f"d.{c} IS {table}.{c}" for c in cle)
+            valeurs = [c for c in COLONNES[table] if c not in cle]
+            if valeurs:
+                cur = conn.execute(
+                    f"UPDATE {table} SET {', '.join(f'{c} = d.{c}' for c in valeurs)} "
+                    f"FROM temp.delta_{table} d WHERE {jointure} "
+                    f"AND ({' OR '.join(f'd.{c} IS NOT {table}.{c}' for c in valeurs)})"
+                )
+                delta[table]["mises_a_jour"] = cur.rowcount
+
+            colonnes = ", ".join(COLONNES[table])
+            absente = " AND ".join(f"t.{c} IS d.{c}" for c in cle)
+            cur = conn.execute(
+                f"INSERT INTO {table} ({colonnes}) "
+                f"SELECT {', '.join(f'd.{c}' for c in COLONNES[table])} FROM temp.delta_{table} d "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {absente})"
+            )
+            delta[table]["insertions"] = cur.rowcount
+            stats["succes"][table] = {"lignes_inserees": cur.rowcount, "duplicatas": 0}
+
+        stats["fts"] = synchroniser_fts(conn)
+        marquer_import(conn, "delta")
+        # Instantané des statistiques : seules les sections touchées par le delta sont recalculées
+        modifiees = [table for table, d in delta.items() if any(d.values())]
+        modifiees += [table for table, f in stats["fts"].items() if any(f.values())]
+        stats["statistiques"] = rafraichir_statistiques(conn, modifiees)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        for table in ORDRE_INSERTION:
+            conn.execute(f"DROP TABLE IF EXISTS temp.delta_{table}")
+
+    stats["phases"]["application_delta"] = time.perf_counter() - debut_diff
+    stats["phases"]["delta_total"] = time.perf_counter() - debut
+
+
+def indexer_plein_texte(conn, stats):
+    """Construit / resynchronise les tables FTS5 de recherche après un import complet"""
+    debut = time.perf_counter()
+    creer_tables_fts(conn)
+    stats["fts"] = synchroniser_fts(conn)
+    conn.commit()
+    stats.setdefault("phases", {})["index_plein_texte"] = time.perf_counter() - debut
+
+
+def afficher_stats(stats, temps):
+    """Affiche le résumé de l'import"""
     total_rows = sum(t["lignes_inserees"] for t in stats["succes"].values())
     total_duplicatas = sum(t["duplicatas"] for t in stats["succes"].values())
     total_filtrees = sum(stats["filtrees"].values())
@@ -126,14 +654,115 @@ try:
     print(f"Lignes filtrées (FK): {total_filtrees:,}")
     print(f"Erreurs             : {stats['erreurs']}")
     print(f"Temps d'exécution   : {temps:.2f}s")
+    print(f"Pic mémoire (RSS)   : {pic_memoire_mo():.0f} Mo")
 
     if stats["filtrees"]:
         print("\nLignes filtrées par table (clés étrangères invalides) :")
         for table, count in stats["filtrees"].items():
             print(f"  {table:<15} : {count:>6} lignes")
 
-except sqlite3.Error as e:
-    print(f"Erreur lors de l'import des données : {e}")
-    conn.rollback()
-finally:
-    conn.close()
+    if any("lignes_par_s" in t for t in stats["succes"].values()):
+        print("\nDébit par table :")
+        for table, t in stats["succes"].items():
+            print(f"  {table:<15} : {t['lignes_par_s']:>10,} lignes/s | "
+                  f"{t['duree_s']:>7.2f}s | pic {t['pic_memoire_mo']:>6.0f} Mo")
+
+    if any("duree_parse_s" in t for t in stats["succes"].values()):
+        print("\nDurées par fichier :")
+        for table, t in stats["succes"].items():
+            print(f"  {table:<15} : parsing {t['duree_parse_s']:>7.2f}s | "
+                  f"insertion {t['duree_insertion_s']:>7.2f}s")
+
+    if stats.get("delta"):
+        print("\nLignes modifiées par table :")
+        print(f"  {'Table':<15} {'Insertions':>11} {'Mises à jour':>13} {'Suppressions':>13}")
+        for table, d in stats["delta"].items():
+            print(f"  {table:<15} {d['insertions']:>11,} {d['mises_a_jour']:>13,} {d['suppressions']:>13,}")
+
+    if stats.get("phases"):
+        print("\nDurée par phase :")
+        for phase, duree in stats["phases"].items():
+            print(f"  {phase:<22} : {duree:>8.2f}s")
+        if "fts" in stats:
+            for table, compteurs in stats["fts"].items():
+                print(f"Index {table:<13}: {compteurs['insertions']:,} insertions, "
+                      f"{compteurs['suppressions']:,} suppressions")
+        if "statistiques" in stats:
+            print(f"Statistiques        : {', '.join(stats['statistiques']) or 'aucune section recalculée'}")
+        if "violations_fk" in stats:
+            print(f"Violations FK       : {stats['violations_fk']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import des CSV IMDb dans SQLite")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Chemin de la base SQLite")
+    parser.add_argument("--csv", default=CHEMIN_CSV, help="Dossier contenant les CSV")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Lire les CSV par chunks (mémoire bornée) au lieu de tout charger")
+    parser.add_argument("--memoire-max", type=int, default=256,
+                        help="Plafond mémoire visé par chunk en Mo (mode streaming)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Nombre de lignes par chunk (remplace --memoire-max)")
+    parser.add_argument("--transaction", type=int, default=500_000,
+                        help="Nombre de lignes par transaction (mode streaming)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser les CSV en parallèle avec N processus (un seul writer SQLite)")
+    parser.add_argument("--delta", action="store_true",
+                        help="Import incrémental : n'applique que les différences avec la base existante")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Chargement en masse : recrée les tables, index et contrôle FK à la fin")
+    parser.add_argument("--cache-mo", type=int, default=1024,
+                        help="Taille du cache SQLite pendant le chargement en masse (Mo)")
+    parser.add_argument("--sans-index-secondaires", action="store_true",
+                        help="Ne pas créer les index secondaires (mode bulk)")
+    args = parser.parse_args()
+
+    chemin_csv = os.path.normpath(args.csv) + os.sep
+
+    print("Import des données dans la base de données SQLite")
+    temps = datetime.now()
+
+    stats = {"succes": {}, "erreurs": 0, "filtrees": {}}
+
+    conn = sqlite3.connect(args.db)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+        if args.delta:
+            import_delta(conn, chemin_csv, stats, memoire_max_mo=args.memoire_max,
+                         chunksize=args.chunksize)
+        elif args.bulk:
+            import_bulk(conn, chemin_csv, stats, cache_mo=args.cache_mo,
+                        index_secondaires=not args.sans_index_secondaires)
+        elif args.workers:
+            import_parallele(conn, chemin_csv, stats, workers=args.workers,
+                             memoire_max_mo=args.memoire_max, chunksize=args.chunksize,
+                             lignes_par_transaction=args.transaction)
+        elif args.streaming:
+            import_streaming(conn, chemin_csv, stats, memoire_max_mo=args.memoire_max,
+                             chunksize=args.chunksize, lignes_par_transaction=args.transaction)
+        else:
+            import_complet(conn, chemin_csv, stats)
+
+        if not args.delta:
+            indexer_plein_texte(conn, stats)
+            mode = "bulk" if args.bulk else "workers" if args.workers else "streaming" if args.streaming else "complet"
+            marquer_import(conn, mode)
+            debut = time.perf_counter()
+            stats["statistiques"] = rafraichir_statistiques(conn)
+            stats.setdefault("phases", {})["statistiques"] = time.perf_counter() - debut
+            conn.commit()
+
+        # Stats
+        temps = (datetime.now() - temps).total_seconds()
+        afficher_stats(stats, temps)
+
+    except (sqlite3.Error, RuntimeError) as e:
+        print(f"Erreur lors de l'import des données : {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#T1.7 : Recherche plein texte (FTS5)
+#
+# Tables virtuelles FTS5 pour la recherche de titres (titre principal, titre original
+# et titres alternatifs de la table titles) et de noms de personnes.
+# Le rowid de chaque ligne FTS est celui de la ligne movies/persons correspondante :
+# la jointure se fait par rowid, quel que soit le type des clés (schéma texte ou compact).
+#
+# Les tables sont remplies / resynchronisées par import_data.py en fin d'import.
+
+import argparse
+import re
+import sqlite3
+import time
+
+from create_schema import CHEMIN_DB
+
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Table FTS : colonnes (les UNINDEXED servent au classement) et requête source (rowid AS id)
+TABLES_FTS = {
+    "movies_fts": {
+        "colonnes": ["primaryTitle", "originalTitle", "autresTitres", "numVotes UNINDEXED"],
+        # Les épisodes ne sont pas indexés : la recherche ne les retourne pas
+        "source": """
+            SELECT m.rowid AS id, m.primaryTitle, m.originalTitle,
+                   (SELECT group_concat(title, ' | ') FROM (
+                        SELECT DISTINCT t.title FROM titles t
+                        WHERE t.mid = m.mid
+                          AND t.title IS NOT m.primaryTitle
+                          AND t.title IS NOT m.originalTitle
+                        ORDER BY t.title)) AS autresTitres,
+                   COALESCE(r.numVotes, 0) AS numVotes
+            FROM movies m
+            LEFT JOIN ratings r ON r.mid = m.mid
+            WHERE m.titleType IS NOT 'tvEpisode'
+        """,
+    },
+    "persons_fts": {
+        "colonnes": ["primaryName", "nbFilms UNINDEXED"],
+        "source": """
+            SELECT p.rowid AS id, p.primaryName, COALESCE(c.nb, 0) AS nbFilms
+            FROM persons p
+            LEFT JOIN (SELECT pid, COUNT(*) AS nb FROM principals GROUP BY pid) c ON c.pid = p.pid
+        """,
+    },
+}
+
+# Poids bm25 des colonnes indexées et poids de la popularité (ln du nombre de votes / films).
+# Seule définition du classement : l'application Django (movies/sqlite_service.py) les importe
+POIDS_BM25 = {"movies_fts": (10.0, 5.0, 1.0), "persons_fts": (1.0,)}
+POIDS_POPULARITE = 0.5
+
+
+def nom_colonne(colonne):
+    """Nom d'une colonne FTS sans son option (UNINDEXED)"""
+    return colonne.split()[0]
+
+
+def poids_bm25(table):
+    """Arguments de bm25() après le nom de la table : "10.0, 5.0, 1.0" pour movies_fts"""
+    return ", ".join(str(p) for p in POIDS_BM25[table])
+
+
+def creer_tables_fts(conn):
+    """Crée les tables FTS5 (index de préfixes de 2 et 3 caractères pour la saisie progressive)"""
+    for table, spec in TABLES_FTS.items():
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+            f"{', '.join(spec['colonnes'])}, tokenize = '{TOKENIZER}', prefix = '2 3')"
+        )
+    conn.commit()
+
+
+def synchroniser_fts(conn):
+    """
+    Met les tables FTS en accord avec movies/titles/ratings/persons/principals.
+    Seules les lignes absentes, supprimées ou modifiées sont réécrites : sur une table FTS vide
+    c'est une construction complète, après un import delta seules les différences sont appliquées.
+    Ne valide pas la transaction : l'appelant commit (import_delta synchronise dans sa transaction).
+
+    Returns:
+        dict: {table: {"suppressions": n, "insertions": n}}
+    """
+    resultat = {}
+    for table, spec in TABLES_FTS.items():
+        colonnes = [nom_colonne(c) for c in spec["colonnes"]]
+        conn.execute("DROP TABLE IF EXISTS temp.source_fts")
+        conn.execute(f"CREATE TEMP TABLE source_fts AS {spec['source']}")
+        conn.execute("CREATE UNIQUE INDEX temp.idx_source_fts ON source_fts(id)")
+
+        # Lignes disparues, puis lignes dont le contenu a changé (réinsérées ensuite)
+        supprimees = conn.execute(
+            f"DELETE FROM {table} WHERE rowid NOT IN (SELECT id FROM temp.source_fts)"
+        ).rowcount
+        differences = " OR ".join(f"f.{c} IS NOT s.{c}" for c in colonnes)
+        supprimees += conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN ("
+            f"SELECT s.id FROM temp.source_fts s JOIN {table} f ON f.rowid = s.id WHERE {differences})"
+        ).rowcount
+        inserees = conn.execute(
+            f"INSERT INTO {table} (rowid, {', '.join(colonnes)}) "
+            f"SELECT id, {', '.join(colonnes)} FROM temp.source_fts s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table} f WHERE f.rowid = s.id)"
+        ).rowcount
+
+        conn.execute("DROP TABLE temp.source_fts")
+        resultat[table] = {"suppressions": supprimees, "insertions": inserees}
+    return resultat
+
+
+def requete_fts(texte):
+    """
+    Transforme une saisie utilisateur en requête FTS5 sûre : chaque mot entre guillemets
+    (pas d'opérateurs injectés), le dernier en préfixe pour la saisie progressive.
+
+    Returns:
+        str: Requête MATCH, ou None si la saisie ne contient aucun mot
+    """
+    mots = re.findall(r"\w+", texte)
+    if not mots:
+        return None
+    return " ".join([f'"{mot}"' for mot in mots[:-1]] + [f'"{mots[-1]}"*'])
+
+
+def recherche_films_like(conn, texte, limit=20):
+    """Recherche de films par LIKE (ancienne méthode, parcours complet de movies)"""
+    motif = f"%{texte}%"
+    return conn.execute("""
+        SELECT m.mid, m.primaryTitle, r.averageRating, r.numVotes
+        FROM movies m
+        LEFT JOIN ratings r ON m.mid = r.mid
+        WHERE (m.primaryTitle LIKE ? OR m.originalTitle LIKE ?)
+          AND m.titleType NOT IN ('tvEpisode')
+        ORDER BY r.averageRating DESC NULLS LAST
+        LIMIT ?
+    """, (motif, motif, limit)).fetchall()
+
+
+def recherche_films_fts(conn, texte, limit=20):
+    """Recherche de films par FTS5, classée par bm25 et nombre de votes"""
+    requete = requete_fts(texte)
+    if requete is None:
+        return []
+    return conn.execute(f"""
+        SELECT m.mid, m.primaryTitle, r.averageRating, r.numVotes
+        FROM movies_fts f
+        JOIN movies m ON m.rowid = f.rowid
+        LEFT JOIN ratings r ON m.mid = r.mid
+        WHERE movies_fts MATCH ?
+        ORDER BY bm25(movies_fts, {poids_bm25("movies_fts")}) - {POIDS_POPULARITE} * ln(1 + f.numVotes)
+        LIMIT ?
+    """, (requete, limit)).fetchall()
+
+
+def recherche_personnes_like(conn, texte, limit=20):
+    """Recherche de personnes par LIKE (ancienne méthode)"""
+    return conn.execute("""
+        SELECT p.pid, p.primaryName,
+               (SELECT COUNT(*) FROM principals pr WHERE pr.pid = p.pid) as film_count
+        FROM persons p
+        WHERE p.primaryName LIKE ?
+        ORDER BY film_count DESC
+        LIMIT ?
+    """, (f"%{texte}%", limit)).fetchall()
+
+
+def recherche_personnes_fts(conn, texte, limit=20):
+    """Recherche de personnes par FTS5, classée par bm25 et nombre de films"""
+    requete = requete_fts(texte)
+    if requete is None:
+        return []
+    return conn.execute(f"""
+        SELECT p.pid, p.primaryName, f.nbFilms
+        FROM persons_fts f
+        JOIN persons p ON p.rowid = f.rowid
+        WHERE persons_fts MATCH ?
+        ORDER BY bm25(persons_fts, {poids_bm25("persons_fts")}) - {POIDS_POPULARITE} * ln(1 + f.nbFilms)
+        LIMIT ?
+    """, (requete, limit)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit ou resynchronise les index plein texte (FTS5)")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Chemin de la base SQLite")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    debut = time.perf_counter()
+    creer_tables_fts(conn)
+    resultat = synchroniser_fts(conn)
+    conn.commit()
+    conn.close()
+
+    for table, compteurs in resultat.items():
+        print(f"  {table:<12} : {compteurs['insertions']} insertions, {compteurs['suppressions']} suppressions")
+    print(f"Index plein texte à jour en {time.perf_counter() - debut:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
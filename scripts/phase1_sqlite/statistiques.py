@@ -0,0 +1,170 @@
+#T1.8 : Instantané des statistiques (pages /stats/ et accueil de Django)
+#
+# Les agrégats affichés par l'application (comptages globaux, films par genre, par décennie,
+# distribution des notes, top acteurs, lignes par table) sont calculés à l'import et stockés
+# dans la table stats_snapshot (une ligne JSON par section). Django les lit en une requête
+# au lieu de relancer les COUNT / GROUP BY à chaque affichage.
+#
+# Après un import --delta, seules les sections dont une table source a changé sont recalculées
+# (et, pour la section "tables", seuls les comptages des tables modifiées).
+
+import argparse
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+from create_schema import CHEMIN_DB
+
+# Acteurs conservés dans l'instantané (la page /stats/ en affiche 10)
+NB_TOP_ACTEURS = 50
+
+
+def calculer_global(conn):
+    """Nombre de films, personnes, réalisateurs et acteurs distincts (page d'accueil)"""
+    return {
+        "movies_count": conn.execute("SELECT COUNT(*) FROM movies").fetchone()[0],
+        "persons_count": conn.execute("SELECT COUNT(*) FROM persons").fetchone()[0],
+        "directors_count": conn.execute("SELECT COUNT(DISTINCT pid) FROM directors").fetchone()[0],
+        "actors_count": conn.execute(
+            "SELECT COUNT(DISTINCT pid) FROM principals WHERE category IN ('actor', 'actress')"
+        ).fetchone()[0],
+    }
+
+
+def calculer_genres(conn):
+    """Nombre de films par genre, du plus fréquent au moins fréquent"""
+    return [[genre, nombre] for genre, nombre in conn.execute("""
+        SELECT g.genre, COUNT(*) AS count
+        FROM genres g
+        JOIN movies m ON g.mid = m.mid
+        WHERE m.titleType = 'movie' AND g.genre IS NOT NULL
+        GROUP BY g.genre
+        ORDER BY count DESC
+    """)]
+
+
+def calculer_distributions(conn):
+    """
+    Films par décennie et par dixième de note (0 à 100), en un seul parcours groupé.
+    L'application regroupe les dixièmes selon la largeur de tranche demandée.
+    """
+    decennies, dixiemes = {}, [0] * 101
+    for decennie, dixieme, nombre in conn.execute("""
+        SELECT (m.startYear / 10) * 10, CAST(ROUND(r.averageRating * 10) AS INTEGER), COUNT(*)
+        FROM movies m
+        LEFT JOIN ratings r ON m.mid = r.mid
+        WHERE m.titleType = 'movie'
+        GROUP BY 1, 2
+    """):
+        if decennie:
+            decennies[str(decennie)] = decennies.get(str(decennie), 0) + nombre
+        if dixieme is not None and 0 <= dixieme <= 100:
+            dixiemes[dixieme] += nombre
+    return {"decennies": dict(sorted(decennies.items(), key=lambda d: int(d[0]))), "dixiemes": dixiemes}
+
+
+def calculer_top_acteurs(conn):
+    """Acteurs ayant joué dans le plus de films"""
+    return [list(ligne) for ligne in conn.execute("""
+        SELECT p.pid, p.primaryName, COUNT(DISTINCT pr.mid) AS film_count
+        FROM persons p
+        JOIN principals pr ON p.pid = pr.pid
+        WHERE pr.category IN ('actor', 'actress')
+        GROUP BY p.pid, p.primaryName
+        ORDER BY film_count DESC
+        LIMIT ?
+    """, (NB_TOP_ACTEURS,))]
+
+
+def calculer_tables(conn, precedent=None, tables_modifiees=None):
+    """Nombre de lignes par table ; seules les tables modifiées sont recomptées si précédent existe"""
+    tables = [nom for (nom,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'stats_snapshot'"
+    )]
+    comptages = {}
+    for table in tables:
+        # Une table modifiée entraîne ses tables annexes (tables internes FTS5 movies_fts_data...)
+        modifiee = tables_modifiees is None or any(
+            table == t or table.startswith(f"{t}_") for t in tables_modifiees)
+        if precedent and table in precedent and not modifiee:
+            comptages[table] = precedent[table]
+        else:
+            comptages[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    return comptages
+
+
+# Section : fonction de calcul et tables dont elle dépend
+SECTIONS = {
+    "global": (calculer_global, {"movies", "persons", "directors", "principals"}),
+    "genres": (calculer_genres, {"genres", "movies"}),
+    "distributions": (calculer_distributions, {"movies", "ratings"}),
+    "top_acteurs": (calculer_top_acteurs, {"persons", "principals"}),
+    "tables": (calculer_tables, None),
+}
+
+
+def creer_table_statistiques(conn):
+    """Crée la table de l'instantané (section, valeur JSON, date et durée du calcul)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stats_snapshot (
+            section TEXT PRIMARY KEY,
+            valeur TEXT,
+            date_calcul TEXT,
+            duree_s REAL
+        )
+    """)
+
+
+def rafraichir_statistiques(conn, tables_modifiees=None):
+    """
+    Recalcule l'instantané des statistiques (sans commit : import_delta l'écrit dans sa transaction).
+
+    Args:
+        conn: Connexion SQLite
+        tables_modifiees: Tables modifiées depuis le dernier calcul (None = tout recalculer)
+
+    Returns:
+        dict: {section: durée du calcul en secondes} des sections recalculées
+    """
+    creer_table_statistiques(conn)
+    existantes = {section: json.loads(valeur) for section, valeur in
+                  conn.execute("SELECT section, valeur FROM stats_snapshot")}
+    durees = {}
+    for section, (calcul, sources) in SECTIONS.items():
+        if tables_modifiees is not None and section in existantes:
+            if sources is not None and not sources & set(tables_modifiees):
+                continue
+            if sources is None and not tables_modifiees:
+                continue
+        debut = time.perf_counter()
+        if section == "tables":
+            valeur = calcul(conn, existantes.get(section),
+                            None if tables_modifiees is None else set(tables_modifiees))
+        else:
+            valeur = calcul(conn)
+        durees[section] = time.perf_counter() - debut
+        conn.execute(
+            "INSERT OR REPLACE INTO stats_snapshot (section, valeur, date_calcul, duree_s) VALUES (?, ?, ?, ?)",
+            (section, json.dumps(valeur), datetime.now().isoformat(timespec="seconds"), durees[section])
+        )
+    return durees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcule l'instantané des statistiques de l'application")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Chemin de la base SQLite")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    durees = rafraichir_statistiques(conn)
+    conn.commit()
+    conn.close()
+
+    for section, duree in durees.items():
+        print(f"  {section:<14} : {duree:>7.2f}s")
+    print(f"Instantané des statistiques calculé en {sum(durees.values()):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import uuid
+from datetime import datetime
+
+
+def marquer_migration(db, source):
+    """
+    Enregistre une nouvelle génération de migration dans la collection migration_meta.
+    L'application Django relit cette génération pour vider son cache des films
+    (détail et films similaires) : à appeler après chaque écriture de movies / movies_complete.
+    """
+    generation = uuid.uuid4().hex
+    db.migration_meta.replace_one(
+        {"_id": "generation"},
+        {"_id": "generation", "valeur": generation,
+         "date_migration": datetime.now().isoformat(timespec="seconds"), "source": source},
+        upsert=True
+    )
+    print(f"Nouvelle génération de migration : {generation} ({source})")
+    return generation
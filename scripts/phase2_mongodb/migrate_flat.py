@@ -3,6 +3,8 @@ import sqlite3
 import os
 from datetime import datetime
 
+from meta_migration import marquer_migration
+
 def migrate_flat():
     try: 
         uri = "mongodb://localhost:27017"
@@ -49,6 +51,9 @@ def migrate_flat():
         duree = (datetime.now() - temps).total_seconds()
         print(f"Migration terminée en {duree} secondes")
 
+        #invalider le cache des films de l'application Django
+        marquer_migration(db, "migrate_flat")
+
 
         #vérifier les comptages
         print("Vérification des comptages :")
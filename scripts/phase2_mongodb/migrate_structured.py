@@ -1,7 +1,10 @@
+import argparse
 import time
 import sys
 from pymongo import MongoClient
 
+from meta_migration import marquer_migration
+
 def print_progress(current, total, start_time):
     """Affiche une barre de progression."""
     percent = 100 * current / total
@@ -177,7 +180,8 @@ def create_movies_complete(db):
                                     }
                                 },
                                 "as": "char",
-                                "in": "$$char.character"
+                                # la table characters de SQLite stocke le personnage dans "name"
+                                "in": "$$char.name"
                             }
                         }
                     }
@@ -252,10 +256,60 @@ def create_movies_complete(db):
     
     print_progress(total_processed, total_movies, start)
     print(f"\n{total_processed} films créés")
+    marquer_migration(db, "migrate_structured")
     print(f"Temps: {time.time() - start:.2f}s")
     return total_processed
 
 
+def corriger_personnages(db):
+    """
+    Recalcule cast.characters des documents existants de movies_complete depuis la
+    collection characters, sans relancer toute la migration (documents créés avant la
+    correction du champ "name"). Les autres champs des documents ne sont pas modifiés.
+    """
+    print("Correction des personnages de movies_complete")
+    start = time.time()
+
+    db.movies_complete.aggregate([
+        {"$match": {"cast.0": {"$exists": True}}},
+        {"$lookup": {
+            "from": "characters",
+            "localField": "_id",
+            "foreignField": "mid",
+            "as": "characters_data"
+        }},
+        {"$project": {
+            "cast": {
+                "$map": {
+                    "input": "$cast",
+                    "as": "p",
+                    "in": {"$mergeObjects": ["$$p", {
+                        "characters": {
+                            "$map": {
+                                "input": {
+                                    "$filter": {
+                                        "input": "$characters_data",
+                                        "as": "c",
+                                        "cond": {"$eq": ["$$c.pid", "$$p.person_id"]}
+                                    }
+                                },
+                                "as": "char",
+                                "in": "$$char.name"
+                            }
+                        }
+                    }]}
+                }
+            }
+        }},
+        # Remplace uniquement le champ cast des documents existants
+        {"$merge": {"into": "movies_complete", "on": "_id",
+                    "whenMatched": "merge", "whenNotMatched": "discard"}}
+    ], allowDiskUse=True)
+
+    marquer_migration(db, "migrate_structured --personnages")
+    print(f"Temps: {time.time() - start:.2f}s")
+
+
 def compare_storage(db):
     """Compare la taille des collections."""
     print("\nTAILLE DE STOCKAGE")
@@ -333,10 +387,20 @@ def compare_code():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crée la collection dénormalisée movies_complete")
+    parser.add_argument("--personnages", action="store_true",
+                        help="Corrige seulement les personnages de movies_complete existante")
+    args = parser.parse_args()
+
     uri = "mongodb://localhost:27017/"
     client = MongoClient(uri)
     db = client["cineexplorer"]
-    
+
+    if args.personnages:
+        corriger_personnages(db)
+        client.close()
+        sys.exit(0)
+
     # Créer la collection
     create_movies_complete(db)
     
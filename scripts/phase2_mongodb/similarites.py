@@ -0,0 +1,377 @@
+# Films similaires précalculés (champ "similaires" des documents movies_complete)
+#
+# Pour chaque film, les K films les plus proches selon un Jaccard pondéré sur ses genres,
+# réalisateurs et acteurs principaux :
+#
+#   score(a, b) = poids des caractéristiques communes / poids de l'union
+#
+# Le poids d'une caractéristique est celui de son type multiplié par son IDF (log(N / nb de
+# films qui l'ont)) : partager un réalisateur compte plus que partager le genre Drama.
+#
+# Calcul par lots avec NumPy : le produit creux X_lot · Xᵀ (matrices films × caractéristiques
+# stockées en CSR) est fait sur les personnes, dont les listes de films sont courtes. Les genres,
+# partagés par des dizaines de milliers de films, sont traités par combinaison de genres : les
+# films qui n'ont qu'un genre en commun avec le film courant sont pris parmi les meilleurs
+# candidats de sa combinaison. Une personne présente dans plus de --df-max films ne propose
+# comme candidats que ses --df-max films les plus votés, mais elle compte toujours dans le score.
+# Les films proposés sont notés (au moins --votes-min votes).
+#
+# La page d'un film lit ainsi ses films similaires dans le même document, sans requête $in.
+# À relancer après migrate_structured.py (qui recrée movies_complete).
+
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+from pymongo import MongoClient, UpdateOne
+
+from meta_migration import marquer_migration
+
+CHEMIN_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "csv", "imdb.db")
+
+# Poids de chaque type de caractéristique (multiplié par l'IDF de la caractéristique)
+POIDS_TYPES = {"genre": 1.0, "realisateur": 3.0, "acteur": 1.5}
+
+REQUETES_PERSONNES = {
+    "realisateur": "SELECT mid, pid FROM directors",
+    "acteur": "SELECT mid, pid FROM principals WHERE category IN ('actor', 'actress')",
+}
+
+K_SIMILAIRES = 12
+VOTES_MIN = 100
+DF_MAX = 200
+TAILLE_LOT = 2000
+
+
+def identifiant_film(cle):
+    """Identifiant IMDb du film (les bases au schéma compact stockent la partie numérique)"""
+    return cle if isinstance(cle, str) else f"tt{cle:07d}"
+
+
+def csr(lignes, colonnes, nb_lignes):
+    """Matrice creuse binaire au format CSR : (indptr, indices) triés par ligne"""
+    ordre = np.lexsort((colonnes, lignes))
+    indptr = np.zeros(nb_lignes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lignes, minlength=nb_lignes), out=indptr[1:])
+    return indptr, colonnes[ordre]
+
+
+def charger_donnees(conn, votes_min):
+    """
+    Films, genres et personnes de la base SQLite.
+
+    Returns:
+        dict: identifiants, infos d'affichage, masques de genres, couples film × personne,
+              poids par film et films candidats (notés, au moins votes_min votes)
+    """
+    films = conn.execute("""
+        SELECT m.mid, m.primaryTitle, m.startYear, r.averageRating, r.numVotes
+        FROM movies m
+        LEFT JOIN ratings r ON r.mid = m.mid
+    """).fetchall()
+    index = {ligne[0]: i for i, ligne in enumerate(films)}
+    nb_films = len(films)
+    votes = np.array([ligne[4] or 0 for ligne in films], dtype=np.int64)
+    cible = np.array([ligne[3] is not None and (ligne[4] or 0) >= votes_min for ligne in films])
+
+    # Genres : un bit par genre, masque par film
+    noms_genres, masques, genres_films = {}, np.zeros(nb_films, dtype=np.int64), {}
+    for mid, genre in conn.execute("SELECT mid, genre FROM genres WHERE genre IS NOT NULL"):
+        i = index.get(mid)
+        if i is None:
+            continue
+        bit = noms_genres.setdefault(genre, len(noms_genres))
+        if bit >= 63:
+            raise ValueError("Plus de 63 genres distincts : masque sur 64 bits insuffisant")
+        masques[i] |= 1 << bit
+        genres_films.setdefault(i, []).append(genre)
+    bits = np.array([1 << b for b in range(len(noms_genres))], dtype=np.int64)
+    df_genres = np.array([np.count_nonzero(masques & bit) for bit in bits], dtype=np.float64)
+    poids_genres = POIDS_TYPES["genre"] * np.log(nb_films / np.maximum(df_genres, 1))
+
+    # Personnes : une caractéristique par (type, personne)
+    lignes, colonnes, poids_types, caracteristiques = [], [], [], {}
+    for type_personne, requete in REQUETES_PERSONNES.items():
+        for mid, pid in conn.execute(requete):
+            i = index.get(mid)
+            if i is None:
+                continue
+            cle = (type_personne, pid)
+            if cle not in caracteristiques:
+                caracteristiques[cle] = len(caracteristiques)
+                poids_types.append(POIDS_TYPES[type_personne])
+            lignes.append(i)
+            colonnes.append(caracteristiques[cle])
+    lignes = np.array(lignes, dtype=np.int64)
+    colonnes = np.array(colonnes, dtype=np.int64)
+    # Un film peut citer deux fois la même personne (plusieurs catégories) : couples uniques
+    couples = np.unique(lignes * len(caracteristiques) + colonnes)
+    lignes, colonnes = couples // max(len(caracteristiques), 1), couples % max(len(caracteristiques), 1)
+    df_personnes = np.bincount(colonnes, minlength=len(caracteristiques))
+    poids_personnes = np.array(poids_types) * np.log(nb_films / np.maximum(df_personnes, 1))
+
+    # Poids total de chaque film (dénominateur du Jaccard)
+    poids_films = np.bincount(lignes, weights=poids_personnes[colonnes], minlength=nb_films)
+    for bit, poids in zip(bits, poids_genres):
+        poids_films[(masques & bit) != 0] += poids
+
+    return {
+        "films": films, "votes": votes, "cible": cible, "genres_films": genres_films,
+        "masques": masques, "bits": bits, "poids_genres": poids_genres,
+        "lignes": lignes, "colonnes": colonnes, "poids_personnes": poids_personnes,
+        "poids_films": poids_films,
+    }
+
+
+class CalculSimilaires:
+    """Structures du calcul (CSR films -> personnes, listes de films par personne, combinaisons)"""
+
+    def __init__(self, donnees, k, df_max=DF_MAX):
+        self.k = k
+        self.votes = donnees["votes"]
+        self.poids_films = donnees["poids_films"]
+        nb_films = len(donnees["films"])
+        nb_personnes = len(donnees["poids_personnes"])
+        self.nb_films = nb_films
+        self.nb_personnes = nb_personnes
+        self.poids_personnes = donnees["poids_personnes"]
+        lignes, colonnes = donnees["lignes"], donnees["colonnes"]
+
+        # X (films × personnes) en CSR
+        self.indptr_films, self.personnes_films = csr(lignes, colonnes, nb_films)
+
+        # Xᵀ restreinte aux films candidats (listes de films par personne), limitée aux df_max
+        # films les plus votés des personnes les plus prolifiques
+        est_cible = donnees["cible"][lignes]
+        cibles, personnes = lignes[est_cible], colonnes[est_cible]
+        ordre = np.lexsort((-self.votes[cibles], personnes))
+        cibles, personnes = cibles[ordre], personnes[ordre]
+        df_cibles = np.bincount(personnes, minlength=nb_personnes)
+        debuts = np.cumsum(df_cibles) - df_cibles
+        garder = np.arange(len(personnes)) - debuts[personnes] < df_max
+        self.indptr_personnes, self.films_personnes = csr(personnes[garder], cibles[garder], nb_personnes)
+
+        # Les personnes plafonnées ne sont pas comptées par le produit creux (liste incomplète) :
+        # leur poids est ajouté en cherchant (cible, personne) dans les couples film × personne
+        self.plafonnee = df_cibles > df_max
+        self.poids_listes = np.where(self.plafonnee, 0.0, self.poids_personnes)
+        est_plafonnee = self.plafonnee[colonnes]
+        self.indptr_plafonnees, self.plafonnees_films = csr(
+            lignes[est_plafonnee], colonnes[est_plafonnee], nb_films)
+        self.cles_plafonnees = np.sort(lignes[est_plafonnee] * nb_personnes + colonnes[est_plafonnee])
+
+        # Combinaisons de genres : poids commun entre deux combinaisons (matrice G)
+        combinaisons, self.combinaison = np.unique(donnees["masques"], return_inverse=True)
+        appartient = (combinaisons[:, None] & donnees["bits"][None, :]) != 0
+        ponderee = appartient * donnees["poids_genres"]
+        self.G = ponderee @ appartient.T.astype(np.float64)
+        self.candidats_genres = self.preparer_candidats_genres(donnees["cible"], len(combinaisons))
+
+    def preparer_candidats_genres(self, cible, nb_combinaisons):
+        """
+        Pour chaque combinaison de genres, 2k films candidats qui ne partagent que des genres :
+        à genres communs égaux, le Jaccard est plus élevé pour un film de poids faible, on garde
+        donc les k plus légers de chaque combinaison puis les 2k meilleurs pour un film de poids
+        médian de la combinaison. Le score exact de chaque candidat est calculé ensuite.
+
+        Returns:
+            tuple: CSR (indptr, films) des candidats par combinaison
+        """
+        cibles = np.flatnonzero(cible)
+        ordre = np.lexsort((-self.votes[cibles], self.poids_films[cibles], self.combinaison[cibles]))
+        cibles = cibles[ordre]
+        combinaison_cibles = self.combinaison[cibles]
+        debuts = np.searchsorted(combinaison_cibles, np.arange(nb_combinaisons))
+        rang = np.arange(len(cibles)) - debuts[combinaison_cibles]
+        legers = cibles[rang < self.k]
+        combinaison_legers = self.combinaison[legers]
+
+        medianes = np.zeros(nb_combinaisons)
+        ordre = np.argsort(self.combinaison, kind="stable")
+        bornes = np.searchsorted(self.combinaison[ordre], np.arange(nb_combinaisons + 1))
+        for c in range(nb_combinaisons):
+            if bornes[c + 1] > bornes[c]:
+                medianes[c] = np.median(self.poids_films[ordre[bornes[c]:bornes[c + 1]]])
+
+        indptr, candidats = [0], []
+        for c in range(nb_combinaisons):
+            commun = self.G[c, combinaison_legers]
+            score = commun / np.maximum(medianes[c] + self.poids_films[legers] - commun, 1e-9)
+            score[commun <= 0] = -1
+            meilleurs = np.argsort(-score, kind="stable")[:2 * self.k]
+            meilleurs = meilleurs[score[meilleurs] > 0]
+            candidats.append(legers[meilleurs])
+            indptr.append(indptr[-1] + len(meilleurs))
+        return np.array(indptr, dtype=np.int64), np.concatenate(candidats) if candidats else np.array([], np.int64)
+
+    def lot(self, debut, fin):
+        """
+        Top k des films similaires des films [debut, fin).
+
+        Returns:
+            tuple: (films sources, films similaires, scores), triés par source puis score décroissant
+        """
+        # Produit creux X_lot · Xᵀ : un couple (source, cible) par personne commune, poids sommés
+        a, b = self.indptr_films[debut], self.indptr_films[fin]
+        sources = np.repeat(np.arange(debut, fin), np.diff(self.indptr_films[debut:fin + 1]))
+        personnes = self.personnes_films[a:b]
+        longueurs = self.indptr_personnes[personnes + 1] - self.indptr_personnes[personnes]
+        total = int(longueurs.sum())
+        positions = np.repeat(self.indptr_personnes[personnes] - (np.cumsum(longueurs) - longueurs), longueurs)
+        cibles = self.films_personnes[positions + np.arange(total)]
+        sources = np.repeat(sources, longueurs)
+        cles = sources * self.nb_films + cibles
+        ordre = np.argsort(cles, kind="stable")
+        cles = cles[ordre]
+        if len(cles):
+            debuts = np.flatnonzero(np.r_[True, cles[1:] != cles[:-1]])
+            commun = np.add.reduceat(np.repeat(self.poids_listes[personnes], longueurs)[ordre], debuts)
+            cles = cles[debuts]
+        else:
+            commun = np.zeros(0)
+
+        # Candidats ne partageant que des genres (liste de la combinaison de chaque source)
+        lot = np.arange(debut, fin)
+        indptr, candidats = self.candidats_genres
+        combinaisons = self.combinaison[lot]
+        nombres = indptr[combinaisons + 1] - indptr[combinaisons]
+        positions = np.repeat(indptr[combinaisons] - (np.cumsum(nombres) - nombres), nombres)
+        cles_genres = np.repeat(lot, nombres) * self.nb_films + candidats[positions + np.arange(int(nombres.sum()))]
+
+        # Union des deux ensembles de couples (les couples déjà trouvés par les personnes sont gardés)
+        if len(cles):
+            rangs = np.minimum(np.searchsorted(cles, cles_genres), len(cles) - 1)
+            cles_genres = cles_genres[cles[rangs] != cles_genres]
+        cles = np.concatenate([cles, cles_genres])
+        commun = np.concatenate([commun, np.zeros(len(cles_genres))])
+        sources, cibles = cles // self.nb_films, cles % self.nb_films
+        garder = sources != cibles
+        sources, cibles, commun = sources[garder], cibles[garder], commun[garder]
+
+        # Personnes plafonnées communes : chaque personne plafonnée de la source est cherchée chez la cible
+        nombres = self.indptr_plafonnees[sources + 1] - self.indptr_plafonnees[sources]
+        if nombres.any():
+            couples = np.repeat(np.arange(len(sources)), nombres)
+            positions = np.repeat(self.indptr_plafonnees[sources] - (np.cumsum(nombres) - nombres), nombres)
+            personnes = self.plafonnees_films[positions + np.arange(int(nombres.sum()))]
+            cles_cibles = cibles[couples] * self.nb_personnes + personnes
+            rangs = np.minimum(np.searchsorted(self.cles_plafonnees, cles_cibles), len(self.cles_plafonnees) - 1)
+            trouvees = self.cles_plafonnees[rangs] == cles_cibles
+            commun = commun + np.bincount(couples[trouvees], weights=self.poids_personnes[personnes[trouvees]],
+                                          minlength=len(sources))
+
+        # Jaccard pondéré : intersection / (poids source + poids cible - intersection)
+        commun = commun + self.G[self.combinaison[sources], self.combinaison[cibles]]
+        scores = commun / np.maximum(self.poids_films[sources] + self.poids_films[cibles] - commun, 1e-9)
+        garder = scores > 0
+        sources, cibles, scores = sources[garder], cibles[garder], scores[garder]
+
+        # k meilleurs par source (à score égal, le film le plus voté d'abord)
+        ordre = np.lexsort((-self.votes[cibles], -scores, sources))
+        sources, cibles, scores = sources[ordre], cibles[ordre], scores[ordre]
+        debuts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]]) if len(sources) else np.zeros(0, np.int64)
+        rang = np.arange(len(sources)) - np.repeat(debuts, np.diff(np.r_[debuts, len(sources)]))
+        garder = rang < self.k
+        return sources[garder], cibles[garder], scores[garder]
+
+
+def resume_film(donnees, i, score):
+    """Film similaire au format des listes de films de l'application (id, titre, note...)"""
+    mid, titre, annee, note, votes = donnees["films"][i]
+    return {
+        "id": identifiant_film(mid),
+        "title": titre,
+        "year": annee,
+        "rating": {"average": note, "votes": votes} if note is not None else None,
+        "genres": donnees["genres_films"].get(i, []),
+        "score": round(float(score), 4),
+    }
+
+
+def calculer_similaires(conn, k=K_SIMILAIRES, votes_min=VOTES_MIN, taille_lot=TAILLE_LOT, df_max=DF_MAX):
+    """
+    Films similaires de tous les films de la base SQLite.
+
+    Returns:
+        tuple: (données chargées, {indice film: [(indice similaire, score)]}, durées par phase)
+    """
+    durees = {}
+    debut = time.perf_counter()
+    donnees = charger_donnees(conn, votes_min)
+    durees["chargement"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    calcul = CalculSimilaires(donnees, k, df_max)
+    durees["preparation"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    resultats = {}
+    for lot in range(0, calcul.nb_films, taille_lot):
+        sources, cibles, scores = calcul.lot(lot, min(lot + taille_lot, calcul.nb_films))
+        for source, cible, score in zip(sources.tolist(), cibles.tolist(), scores.tolist()):
+            resultats.setdefault(source, []).append((cible, score))
+    durees["calcul"] = time.perf_counter() - debut
+    return donnees, resultats, durees
+
+
+def ecrire_similaires(db, donnees, resultats, taille_lot=1000):
+    """
+    Écrit le champ similaires de chaque document movies_complete (liste vide si aucun film proche).
+
+    Returns:
+        int: Nombre de documents modifiés
+    """
+    modifies, operations = 0, []
+    for i, ligne in enumerate(donnees["films"]):
+        similaires = [resume_film(donnees, cible, score) for cible, score in resultats.get(i, [])]
+        operations.append(UpdateOne({"_id": identifiant_film(ligne[0])}, {"$set": {"similaires": similaires}}))
+        if len(operations) >= taille_lot:
+            modifies += db.movies_complete.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        modifies += db.movies_complete.bulk_write(operations, ordered=False).modified_count
+    return modifies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Précalcule les films similaires de movies_complete")
+    parser.add_argument("--db", default=CHEMIN_DB, help="Base SQLite source (genres, réalisateurs, acteurs)")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/", help="URI MongoDB")
+    parser.add_argument("--k", type=int, default=K_SIMILAIRES, help="Films similaires gardés par film")
+    parser.add_argument("--votes-min", type=int, default=VOTES_MIN,
+                        help="Votes minimum d'un film pour être proposé")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="Films calculés par lot")
+    parser.add_argument("--df-max", type=int, default=DF_MAX,
+                        help="Films candidats proposés au plus par une même personne")
+    parser.add_argument("--sans-ecriture", action="store_true",
+                        help="Calcule et affiche le débit sans écrire dans MongoDB")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    donnees, resultats, durees = calculer_similaires(conn, args.k, args.votes_min, args.lot, args.df_max)
+    conn.close()
+
+    nb_films = len(donnees["films"])
+    print(f"{nb_films:,} films, {sum(map(len, resultats.values())):,} couples similaires")
+    for phase, duree in durees.items():
+        print(f"  {phase:<12} : {duree:>7.2f}s")
+    print(f"Débit du calcul : {nb_films / max(durees['calcul'], 1e-9):,.0f} films/s")
+
+    if args.sans_ecriture:
+        return
+
+    client = MongoClient(args.uri)
+    db = client["cineexplorer"]
+    debut = time.perf_counter()
+    modifies = ecrire_similaires(db, donnees, resultats)
+    duree = time.perf_counter() - debut
+    print(f"{modifies:,} documents movies_complete modifiés en {duree:.2f}s "
+          f"({nb_films / max(duree, 1e-9):,.0f} films/s)")
+    marquer_migration(db, "similarites")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()